@@ -9,12 +9,13 @@ from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from dotenv import load_dotenv
+from app.services.database import RoutingSession, configure_database, install_sqlite_pragmas
 
 # Load environment variables
 load_dotenv()
 
 # Initialize extensions
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 jwt = JWTManager()
 
@@ -29,15 +30,48 @@ def create_app(config=None):
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['JWT_ACCESS_TOKEN_EXPIRES'] = 86400  # 24 hours
     
+    # AI warm-up: 'background' loads the brains on a thread at startup, 'eager'
+    # blocks startup until they are loaded, 'lazy' waits for the first chat
+    app.config['AI_WARMUP'] = os.getenv('AI_WARMUP', 'background')
+    # Chat requests before warm-up finishes: '503' or 'fallback' (simple coach)
+    app.config['AI_NOT_READY'] = os.getenv('AI_NOT_READY', '503')
+    # Background chat archiving interval; 0 leaves it to `flask archive-chat`
+    app.config['CHAT_ARCHIVE_INTERVAL_HOURS'] = float(os.getenv('CHAT_ARCHIVE_INTERVAL_HOURS', 0))
+    # Buffered last_active writes: seconds between batched flushes (0 = write through)
+    app.config['ACTIVITY_FLUSH_SECONDS'] = float(os.getenv('ACTIVITY_FLUSH_SECONDS', 15))
+    # gzip/brotli response compression (thresholds and levels: see services/compression.py)
+    app.config['COMPRESSION_ENABLED'] = os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    # Per-route latency and SQL query metrics at /metrics
+    app.config['METRICS_ENABLED'] = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    # Bearer token required by /metrics (unset = unauthenticated)
+    app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN', '')
+    
     # Custom config
     if config:
         app.config.update(config)
     
+    # Engine tuning (DB_PROFILE) and the optional read-only bind (DATABASE_READ_URL)
+    configure_database(app)
+    
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
     
+    # WAL, busy timeout and cache pragmas on every SQLite connection
+    with app.app_context():
+        install_sqlite_pragmas(db.engines.values(), app.config['DB_PROFILE'])
+    
+    # Request latency and SQL query counts, exported at /metrics. Registered
+    # before compression so its after_request hook runs last and includes it.
+    from app.services.metrics import init_metrics
+    with app.app_context():
+        init_metrics(app, db.engines.values())
+    
+    # JWT user loader (current_user) backed by the user snapshot cache
+    with app.app_context():
+        from app.services import user_cache  # noqa: F401
+    
     # CORS
     CORS(app, resources={
         r"/*": {
@@ -49,6 +83,10 @@ def create_app(config=None):
         }
     })
     
+    # Compress JSON, NDJSON/CSV exports and SSE streams for clients that accept it
+    from app.services.compression import compression_metrics, init_compression
+    init_compression(app)
+    
     # Add AI path to sys.path
     ai_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'ai'))
     if ai_path not in sys.path:
@@ -56,19 +94,50 @@ def create_app(config=None):
     
     # Register blueprints
     with app.app_context():
-        from app.routes import auth, chat, workouts, profile
+        from app.routes import auth, chat, workouts, profile, export
         
         app.register_blueprint(auth.bp, url_prefix='/api/auth')
         app.register_blueprint(chat.bp, url_prefix='/api/chat')
         app.register_blueprint(workouts.bp, url_prefix='/api/workouts')
         app.register_blueprint(profile.bp, url_prefix='/api/profile')
+        app.register_blueprint(export.bp, url_prefix='/api/export')
         
         # Create tables
         db.create_all()
     
+    # CLI commands
+    from app.cli import register_commands
+    register_commands(app)
+    
+    # Start loading the AI brains
+    from app.services.ai_service import ai_coach
+    if app.config['AI_WARMUP'] == 'eager':
+        ai_coach.warm_up()
+    elif app.config['AI_WARMUP'] == 'background':
+        ai_coach.start_warmup()
+    
+    # Move old chat messages into the compressed archive periodically
+    from app.services.chat_archive import start_archiver
+    start_archiver(app, app.config['CHAT_ARCHIVE_INTERVAL_HOURS'])
+    
+    # Write buffered last_active times back periodically and on shutdown
+    from app.services.activity import init_activity
+    init_activity(app)
+    
     # Health check
     @app.route('/health')
     def health():
         return {'status': 'healthy', 'service': 'fitness-api'}, 200
     
+    # Readiness check (AI brains loaded)
+    @app.route('/ready')
+    def ready():
+        status = ai_coach.get_status()
+        return status, 200 if status['ready'] else 503
+    
+    # Bytes saved and CPU time spent on response compression
+    @app.route('/compression/stats')
+    def compression_stats():
+        return compression_metrics.get_stats(), 200
+    
     return app
@@ -0,0 +1,62 @@
+"""
+CLI Commands
+"""
+import click
+from app import db
+
+
+def register_commands(app):
+    """Register custom `flask` CLI commands"""
+    
+    @app.cli.command('rebuild-workout-stats')
+    @click.option('--user-id', type=int, default=None, help='Only rebuild this user')
+    def rebuild_workout_stats(user_id):
+        """Rebuild per-user workout summaries from the workouts table"""
+        from app.services.workout_stats import rebuild_user_stats
+        
+        count = rebuild_user_stats(user_id)
+        db.session.commit()
+        
+        click.echo(f"✅ Rebuilt workout stats for {count} user(s)")
+    
+    @app.cli.command('archive-chat')
+    @click.option('--older-than-days', type=int, default=None, help='Archive messages older than this (default: CHAT_ARCHIVE_AFTER_DAYS)')
+    @click.option('--user-id', type=int, default=None, help='Only archive this user')
+    def archive_chat(older_than_days, user_id):
+        """Move old chat messages into compressed monthly archive batches"""
+        from app.services.chat_archive import archive_old_messages
+        
+        report = archive_old_messages(older_than_days, user_id)
+        
+        click.echo(f"✅ Archived {report['messages']} message(s) for {report['users']} user(s) "
+                   f"in {report['batches']} batch(es), {report['merged']} merged into existing ones ({report['codec']})")
+        click.echo(f"   {report['raw_bytes']} -> {report['compressed_bytes']} bytes, "
+                   f"saved {report['bytes_saved']} ({report['compression_ratio']}x)")
+        if report['skipped_users']:
+            click.echo(f"⚠️ Skipped {report['skipped_users']} user(s) archived concurrently by another process")
+    
+    @app.cli.command('seed')
+    @click.option('--users', type=int, default=100, show_default=True)
+    @click.option('--workouts', type=int, default=10000, show_default=True, help='Total across all users')
+    @click.option('--messages', type=int, default=20000, show_default=True, help='Total chat messages')
+    @click.option('--progress', type=int, default=5000, show_default=True, help='Total progress logs')
+    @click.option('--days', type=int, default=365, show_default=True, help='Length of the generated history')
+    @click.option('--seed', 'seed_value', type=int, default=42, show_default=True, help='Same seed, same data')
+    @click.option('--processes', type=int, default=1, show_default=True, help='Generate blocks of users in parallel')
+    @click.option('--prefix', default='seed', show_default=True, help='Seeded users are user<N>@<prefix>.example')
+    @click.option('--password', default='password', show_default=True, help='Password of every seeded user')
+    @click.option('--chunk-size', type=int, default=None, help='Rows per INSERT (default: SEED_CHUNK_SIZE)')
+    def seed(users, workouts, messages, progress, days, seed_value, processes, prefix, password, chunk_size):
+        """Generate synthetic users, workouts, chat messages and progress logs"""
+        from app.services.seed import seed_database
+        
+        try:
+            report = seed_database(users, workouts, messages, progress, seed=seed_value, days=days,
+                                   processes=processes, prefix=prefix, password=password, chunk_size=chunk_size)
+        except ValueError as e:
+            raise click.UsageError(str(e))
+        
+        click.echo(f"✅ Seeded {report['users']} user(s), {report['workouts']} workout(s), "
+                   f"{report['chat_messages']} chat message(s), {report['progress_logs']} progress log(s)")
+        click.echo(f"   {report['seconds']}s, {report['rows_per_minute']:,} rows/minute "
+                   f"({report['processes']} process(es), seed {report['seed']})")
@@ -2,8 +2,8 @@
 Database Models for Fitness App
 """
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
 from app import db
+from app.services.password_hasher import password_hasher
 
 
 class User(db.Model):
@@ -27,19 +27,25 @@ class User(db.Model):
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    last_active = db.Column(db.DateTime, default=datetime.utcnow)
+    last_active = db.Column(db.DateTime, default=datetime.utcnow)  # written behind by services/activity.py
     
     # Relationships
     workouts = db.relationship('Workout', backref='user', lazy=True, cascade='all, delete-orphan')
     chat_messages = db.relationship('ChatMessage', backref='user', lazy=True, cascade='all, delete-orphan')
+    chat_archives = db.relationship('ChatArchive', backref='user', lazy=True, cascade='all, delete-orphan')
+    workout_stats = db.relationship('UserWorkoutStats', backref='user', uselist=False, cascade='all, delete-orphan')
     
     def set_password(self, password):
         """Hash and set password"""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password):
         """Check password against hash"""
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        """True if the stored hash uses outdated algorithm/cost settings"""
+        return password_hasher.needs_rehash(self.password_hash)
     
     def to_dict(self):
         """Convert to dictionary"""
@@ -62,9 +68,16 @@ class User(db.Model):
 class Workout(db.Model):
     """Workout session model"""
     __tablename__ = 'workouts'
+    __table_args__ = (
+        db.Index('ix_workouts_user_status_created', 'user_id', 'status', 'created_at'),
+        db.Index('ix_workouts_user_created', 'user_id', 'created_at'),
+        db.Index('uq_workouts_user_external_id', 'user_id', 'external_id', unique=True),
+        db.Index('ix_workouts_user_updated', 'user_id', 'updated_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    external_id = db.Column(db.String(64))  # client-supplied id, makes bulk retries idempotent
     
     # Workout details
     workout_type = db.Column(db.String(50), nullable=False)  # chest, legs, cardio, etc.
@@ -84,12 +97,14 @@ class Workout(db.Model):
     scheduled_for = db.Column(db.DateTime)
     completed_at = db.Column(db.DateTime)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     def to_dict(self):
         """Convert to dictionary"""
         return {
             'id': self.id,
             'user_id': self.user_id,
+            'external_id': self.external_id,
             'workout_type': self.workout_type,
             'duration_minutes': self.duration_minutes,
             'calories_burned': self.calories_burned,
@@ -100,13 +115,55 @@ class Workout(db.Model):
             'notes': self.notes,
             'scheduled_for': self.scheduled_for.isoformat() if self.scheduled_for else None,
             'completed_at': self.completed_at.isoformat() if self.completed_at else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+
+class UserWorkoutStats(db.Model):
+    """Per-user workout totals, kept in sync by the workout routes"""
+    __tablename__ = 'user_workout_stats'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    
+    # Counts by status
+    total_workouts = db.Column(db.Integer, nullable=False, default=0)
+    completed_workouts = db.Column(db.Integer, nullable=False, default=0)
+    planned_workouts = db.Column(db.Integer, nullable=False, default=0)
+    skipped_workouts = db.Column(db.Integer, nullable=False, default=0)
+    
+    # Totals over completed workouts only
+    total_minutes = db.Column(db.Integer, nullable=False, default=0)
+    total_calories = db.Column(db.Integer, nullable=False, default=0)
+    
+    # Workouts created since week_start (reset when the week rolls over)
+    week_start = db.Column(db.DateTime)
+    workouts_this_week = db.Column(db.Integer, nullable=False, default=0)
+    
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        """Convert to dictionary"""
+        return {
+            'user_id': self.user_id,
+            'total_workouts': self.total_workouts or 0,
+            'completed_workouts': self.completed_workouts or 0,
+            'planned_workouts': self.planned_workouts or 0,
+            'skipped_workouts': self.skipped_workouts or 0,
+            'total_minutes': self.total_minutes or 0,
+            'total_calories': self.total_calories or 0,
+            'week_start': self.week_start.isoformat() if self.week_start else None,
+            'workouts_this_week': self.workouts_this_week or 0,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
 
 class ChatMessage(db.Model):
     """Chat message model"""
     __tablename__ = 'chat_messages'
+    __table_args__ = (
+        db.Index('ix_chat_messages_user_created', 'user_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -124,10 +181,15 @@ class ChatMessage(db.Model):
     # Processing info
     brains_used = db.Column(db.String(100))  # JSON string: ["NLP", "ML", "Logic", "Personality"]
     processing_time_ms = db.Column(db.Float)
+    brain_times_ms = db.Column(db.Text)  # JSON string: {"NLP": 12.4, "ML": 30.1, ...}
     
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Truncated text, only loaded when a query asks for it (?fields=summary)
+    message_preview = db.query_expression()
+    response_preview = db.query_expression()
+    
     def to_dict(self):
         """Convert to dictionary"""
         return {
@@ -141,16 +203,65 @@ class ChatMessage(db.Model):
             'confidence_score': self.confidence_score,
             'brains_used': self.brains_used,
             'processing_time_ms': self.processing_time_ms,
+            'brain_times_ms': self.brain_times_ms,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
 
+class ChatArchive(db.Model):
+    """Compressed batch of archived chat messages (one user, one month)"""
+    __tablename__ = 'chat_archives'
+    __table_args__ = (
+        db.Index('ix_chat_archives_user_last', 'user_id', 'last_created_at', 'last_message_id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    period = db.Column(db.String(7), nullable=False)  # YYYY-MM
+    
+    # Range of the archived messages, used to page through batches by cursor
+    message_count = db.Column(db.Integer, nullable=False)
+    first_created_at = db.Column(db.DateTime, nullable=False)
+    last_created_at = db.Column(db.DateTime, nullable=False)
+    first_message_id = db.Column(db.Integer, nullable=False)
+    last_message_id = db.Column(db.Integer, nullable=False)
+    
+    # JSON list of ChatMessage.to_dict() rows, compressed with `codec`
+    codec = db.Column(db.String(10), nullable=False)  # zlib, zstd
+    payload = db.Column(db.LargeBinary, nullable=False)
+    raw_bytes = db.Column(db.Integer, nullable=False)
+    compressed_bytes = db.Column(db.Integer, nullable=False)
+    
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        """Convert to dictionary (without the payload)"""
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'period': self.period,
+            'message_count': self.message_count,
+            'first_created_at': self.first_created_at.isoformat() if self.first_created_at else None,
+            'last_created_at': self.last_created_at.isoformat() if self.last_created_at else None,
+            'codec': self.codec,
+            'raw_bytes': self.raw_bytes,
+            'compressed_bytes': self.compressed_bytes,
+            'archived_at': self.archived_at.isoformat() if self.archived_at else None
+        }
+
+
 class ProgressLog(db.Model):
     """User progress tracking"""
     __tablename__ = 'progress_logs'
+    __table_args__ = (
+        db.Index('ix_progress_logs_user_logged', 'user_id', 'logged_at'),
+        db.Index('uq_progress_logs_user_external_id', 'user_id', 'external_id', unique=True),
+        db.Index('ix_progress_logs_user_updated', 'user_id', 'updated_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    external_id = db.Column(db.String(64))  # client-supplied id, makes bulk retries idempotent
     
     # Measurements
     weight = db.Column(db.Float)
@@ -162,19 +273,22 @@ class ProgressLog(db.Model):
     mood = db.Column(db.String(50))
     energy_level = db.Column(db.Integer)  # 1-100
     
-    # Timestamp
+    # Timestamps
     logged_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     def to_dict(self):
         """Convert to dictionary"""
         return {
             'id': self.id,
             'user_id': self.user_id,
+            'external_id': self.external_id,
             'weight': self.weight,
             'body_fat_percentage': self.body_fat_percentage,
             'muscle_mass': self.muscle_mass,
             'notes': self.notes,
             'mood': self.mood,
             'energy_level': self.energy_level,
-            'logged_at': self.logged_at.isoformat() if self.logged_at else None
+            'logged_at': self.logged_at.isoformat() if self.logged_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
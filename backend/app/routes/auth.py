@@ -2,10 +2,12 @@
 Authentication Routes
 """
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from datetime import datetime
+from flask_jwt_extended import create_access_token, current_user, jwt_required, get_jwt_identity
 from app import db
 from app.models import User
+from app.services.activity import activity_buffer
+from app.services.password_hasher import HasherBusy
+from app.services.user_cache import user_cache
 
 bp = Blueprint('auth', __name__)
 
@@ -54,6 +56,9 @@ def register():
             'user': user.to_dict()
         }), 201
         
+    except HasherBusy as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -75,9 +80,13 @@ def login():
         if not user or not user.check_password(data['password']):
             return jsonify({'error': 'Invalid email or password'}), 401
         
-        # Update last active
-        user.last_active = datetime.utcnow()
-        db.session.commit()
+        # Upgrade hashes made with outdated parameters while we have the password
+        if user.password_needs_rehash():
+            user.set_password(data['password'])
+            db.session.commit()
+        
+        # Update last active (buffered, written back in batches)
+        activity_buffer.touch(user)
         
         # Create access token
         access_token = create_access_token(identity=user.id)
@@ -88,6 +97,8 @@ def login():
             'user': user.to_dict()
         }), 200
         
+    except HasherBusy as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -97,11 +108,7 @@ def login():
 def get_current_user():
     """Get current user info"""
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
+        user = current_user
         
         return jsonify({'user': user.to_dict()}), 200
         
@@ -121,3 +128,16 @@ def refresh():
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/cache/stats', methods=['GET'])
+@jwt_required()
+def get_user_cache_stats():
+    """Get user lookup cache statistics"""
+    try:
+        stats = user_cache.get_stats()
+        stats['last_active_buffer'] = activity_buffer.get_stats()
+        return jsonify(stats), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,13 +1,21 @@
 """
 Chat Routes - AI Coach Interaction
 """
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from flask_jwt_extended import current_user, jwt_required, get_jwt_identity
 from datetime import datetime
 import json
+import time
 from app import db
-from app.models import User, ChatMessage
-from app.services.ai_service import ai_coach
+from app.models import ChatMessage
+from app.services.activity import activity_buffer
+from app.services.ai_service import STATUS_FAILED, ai_coach
+from app.services.ai_service_simple import ai_coach as fallback_coach
+from app.services.chat_archive import archived_count, archived_page
+from app.services.database import use_read_bind
+from app.services.fieldsets import CHAT_FIELDS, InvalidFields
+from app.services.pagination import InvalidCursor, decode_cursor, encode_cursor, page_args, paginate
+from app.services.streaming import sse_event, stream_metrics
 
 bp = Blueprint('chat', __name__)
 
@@ -17,11 +25,7 @@ bp = Blueprint('chat', __name__)
 def send_message():
     """Send message to AI Coach"""
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
+        user = current_user
         
         data = request.get_json()
         message = data.get('message', '').strip()
@@ -29,51 +33,36 @@ def send_message():
         if not message:
             return jsonify({'error': 'Message required'}), 400
         
+        coach = _get_coach()
+        if coach is None and ai_coach.status == STATUS_FAILED:
+            # Retrying will not help until the brains are fixed and the app restarted
+            return jsonify({
+                'error': 'AI Coach is unavailable',
+                'status': ai_coach.status
+            }), 503
+        if coach is None:
+            return jsonify({
+                'error': 'AI Coach is warming up, please try again shortly',
+                'status': ai_coach.status
+            }), 503, {'Retry-After': '5'}
+        
         # Prepare user data for AI
-        user_data = {
-            'user_id': user.id,
-            'age': user.age,
-            'weight': user.weight,
-            'height': user.height,
-            'gender': user.gender,
-            'fitness_level': user.fitness_level,
-            'fitness_goal': user.fitness_goal
-        }
+        user_data = _build_user_data(user)
+        
+        if request.args.get('stream', '').lower() in ('1', 'true', 'yes'):
+            return _stream_response(coach, user, message, user_data)
         
         # Get AI response
-        ai_response = ai_coach.chat(message, user_data)
-        
-        # Save chat message
-        chat_msg = ChatMessage(
-            user_id=user.id,
-            message=message,
-            response=ai_response.get('response', ''),
-            emotion_detected=ai_response.get('emotion_detected'),
-            intent_detected=ai_response.get('intent_detected'),
-            energy_level=ai_response.get('energy_level'),
-            confidence_score=ai_response.get('confidence_score'),
-            brains_used=json.dumps(ai_response.get('brains_used', [])),
-            processing_time_ms=ai_response.get('processing_time_ms')
-        )
-        db.session.add(chat_msg)
+        ai_response = coach.chat(message, user_data)
         
-        # Update user last active
-        user.last_active = datetime.utcnow()
-        db.session.commit()
+        chat_msg = _save_chat_message(user, message, ai_response)
         
         return jsonify({
             'message_id': chat_msg.id,
             'response': ai_response.get('response'),
             'workout_recommendation': ai_response.get('workout_recommendation'),
             'safety_status': ai_response.get('safety_status'),
-            'metadata': {
-                'emotion': ai_response.get('emotion_detected'),
-                'intent': ai_response.get('intent_detected'),
-                'energy_level': ai_response.get('energy_level'),
-                'confidence': ai_response.get('confidence_score'),
-                'brains_used': ai_response.get('brains_used', []),
-                'processing_time_ms': ai_response.get('processing_time_ms')
-            }
+            'metadata': _response_metadata(ai_response)
         }), 200
         
     except Exception as e:
@@ -81,26 +70,187 @@ def send_message():
         return jsonify({'error': str(e)}), 500
 
 
+def _get_coach():
+    """
+    The AI Coach to answer with, or None if it is still warming up or failed
+    
+    With AI_NOT_READY=fallback, requests that arrive before warm-up finishes
+    (or after it failed) are answered by the simple keyword-based coach
+    instead of a 503.
+    """
+    if ai_coach.is_available:
+        return ai_coach
+    
+    # Lazy warm-up starts on the first chat request
+    ai_coach.start_warmup()
+    
+    if current_app.config.get('AI_NOT_READY') == 'fallback':
+        return fallback_coach
+    return None
+
+
+def _build_user_data(user):
+    """Profile fields passed to the AI Coach"""
+    return {
+        'user_id': user.id,
+        'age': user.age,
+        'weight': user.weight,
+        'height': user.height,
+        'gender': user.gender,
+        'fitness_level': user.fitness_level,
+        'fitness_goal': user.fitness_goal
+    }
+
+
+def _response_metadata(ai_response):
+    """Metadata block returned alongside the AI response"""
+    return {
+        'emotion': ai_response.get('emotion_detected'),
+        'intent': ai_response.get('intent_detected'),
+        'energy_level': ai_response.get('energy_level'),
+        'confidence': ai_response.get('confidence_score'),
+        'brains_used': ai_response.get('brains_used', []),
+        'processing_time_ms': ai_response.get('processing_time_ms')
+    }
+
+
+def _save_chat_message(user, message, ai_response):
+    """Persist a chat turn and update the user's last activity"""
+    brain_times = (ai_response.get('metadata') or {}).get('brain_times_ms')
+    chat_msg = ChatMessage(
+        user_id=user.id,
+        message=message,
+        response=ai_response.get('response', ''),
+        emotion_detected=ai_response.get('emotion_detected'),
+        intent_detected=ai_response.get('intent_detected'),
+        energy_level=ai_response.get('energy_level'),
+        confidence_score=ai_response.get('confidence_score'),
+        brains_used=json.dumps(ai_response.get('brains_used', [])),
+        processing_time_ms=ai_response.get('processing_time_ms'),
+        brain_times_ms=json.dumps(brain_times) if brain_times else None
+    )
+    db.session.add(chat_msg)
+    db.session.commit()
+    
+    # Update user last active (buffered, written back in batches)
+    activity_buffer.touch(user)
+    
+    return chat_msg
+
+
+def _stream_response(coach, user, message, user_data):
+    """
+    Stream the AI Coach reply as Server-Sent Events
+    
+    Events: `start` immediately, `metadata` per brain result, `token` for each
+    chunk of response text, then `done` once the turn has been saved (or
+    `error` if anything fails). Time to first byte is measured at the first
+    event produced by the coach, not at `start`.
+    """
+    started = time.perf_counter()
+    
+    def elapsed_ms():
+        return (time.perf_counter() - started) * 1000
+    
+    def generate():
+        stream_metrics.started()
+        ttfb_ms = None
+        first_token_ms = None
+        
+        try:
+            yield sse_event('start', {'status': 'processing'})
+            
+            ai_response = {}
+            for event, data in coach.chat_stream(message, user_data):
+                if ttfb_ms is None:
+                    ttfb_ms = elapsed_ms()
+                if event == 'result':
+                    ai_response = data
+                    continue
+                if event == 'token' and first_token_ms is None:
+                    first_token_ms = elapsed_ms()
+                yield sse_event(event, data)
+            
+            chat_msg = _save_chat_message(user, message, ai_response)
+            stream_metrics.record(ttfb_ms, first_token_ms, elapsed_ms())
+            
+            yield sse_event('done', {
+                'message_id': chat_msg.id,
+                'response': ai_response.get('response'),
+                'workout_recommendation': ai_response.get('workout_recommendation'),
+                'safety_status': ai_response.get('safety_status'),
+                'metadata': _response_metadata(ai_response),
+                'time_to_first_byte_ms': round(ttfb_ms, 2),
+                'time_to_first_token_ms': round(first_token_ms, 2) if first_token_ms is not None else None
+            })
+            
+        except Exception as e:
+            db.session.rollback()
+            stream_metrics.failed()
+            yield sse_event('error', {'error': str(e)})
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+
 @bp.route('/history', methods=['GET'])
 @jwt_required()
+@use_read_bind
 def get_chat_history():
     """Get user's chat history"""
     try:
         user_id = get_jwt_identity()
-        limit = request.args.get('limit', 50, type=int)
-        offset = request.args.get('offset', 0, type=int)
+        args = page_args(default_limit=50)
+        fields = CHAT_FIELDS.parse()
         
-        messages = ChatMessage.query.filter_by(user_id=user_id)\
-            .order_by(ChatMessage.created_at.desc())\
-            .limit(limit)\
-            .offset(offset)\
-            .all()
+        query = ChatMessage.query.filter_by(user_id=user_id)
+        messages, next_cursor = paginate(
+            CHAT_FIELDS.apply(query, fields, required=[ChatMessage.created_at]),
+            ChatMessage.created_at, ChatMessage.id,
+            limit=args['limit'], cursor=args['cursor'], offset=args['offset']
+        )
         
-        return jsonify({
-            'messages': [msg.to_dict() for msg in messages],
-            'total': ChatMessage.query.filter_by(user_id=user_id).count()
-        }), 200
+        page = [CHAT_FIELDS.serialize(msg, fields) for msg in messages]
+        
+        # Past the end of the hot table, continue into the compressed archive
+        if next_cursor is None:
+            skip = 0
+            if messages:
+                before = (messages[-1].created_at, messages[-1].id)
+            elif args['cursor']:
+                before = decode_cursor(args['cursor'])
+            else:
+                # An offset beyond the hot table carries on into the archive
+                before = None
+                if args['offset']:
+                    skip = max(args['offset'] - query.count(), 0)
+            
+            archived, has_more = archived_page(user_id, before, args['limit'] - len(messages), skip=skip)
+            page += [CHAT_FIELDS.serialize_dict(row, fields) for row in archived]
+            
+            if has_more:
+                last = (datetime.fromisoformat(archived[-1]['created_at']), archived[-1]['id']) if archived else before
+                next_cursor = encode_cursor(*last)
+        
+        result = {
+            'messages': page,
+            'next_cursor': next_cursor
+        }
+        
+        # Counting the whole history is opt-in (legacy offset clients still get it)
+        if args['include_total'] or args['offset'] is not None:
+            result['total'] = query.count() + archived_count(user_id)
+        
+        return jsonify(result), 200
         
+    except (InvalidCursor, InvalidFields) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -111,6 +261,7 @@ def get_ai_stats():
     """Get AI Coach statistics"""
     try:
         stats = ai_coach.get_stats()
+        stats['streaming'] = stream_metrics.get_stats()
         return jsonify(stats), 200
         
     except Exception as e:
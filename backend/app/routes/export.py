@@ -0,0 +1,41 @@
+"""
+Export Routes - Download a user's full history
+"""
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from datetime import datetime
+from app.services.database import use_read_bind
+from app.services.export import EXPORT_FORMATS, export_stream, parse_resources
+
+bp = Blueprint('export', __name__)
+
+
+@bp.route('/', methods=['GET'], strict_slashes=False)
+@jwt_required()
+@use_read_bind
+def export_history():
+    """Stream workouts, chat messages and progress logs as NDJSON or CSV"""
+    try:
+        user_id = get_jwt_identity()
+        fmt = request.args.get('format', 'ndjson').lower()
+        
+        if fmt not in EXPORT_FORMATS:
+            return jsonify({'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+        
+        resources = parse_resources(request.args.get('resources', ''))
+        filename = f"fitness-export-{user_id}-{datetime.utcnow():%Y%m%d}.{fmt}"
+        
+        # Rows are read from the database while the response is being sent
+        return Response(
+            stream_with_context(export_stream(user_id, fmt, resources)),
+            mimetype=EXPORT_FORMATS[fmt],
+            headers={
+                'Content-Disposition': f'attachment; filename="{filename}"',
+                'X-Accel-Buffering': 'no'
+            }
+        )
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -2,25 +2,37 @@
 Profile Routes
 """
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from datetime import datetime, timedelta
-from sqlalchemy import func
+from flask_jwt_extended import current_user, jwt_required, get_jwt_identity
+from datetime import datetime
 from app import db
-from app.models import User, ProgressLog, Workout
+from app.models import ProgressLog
+from app.services.ai_service import ai_coach
+from app.services.bulk_ingest import (
+    BulkIngest,
+    BulkPayloadError,
+    TooManyRecords,
+    chunk_size_arg,
+    read_records,
+    validate_progress,
+)
+from app.services.conditional import conditional, profile_validator, progress_validator
+from app.services.database import use_read_bind
+from app.services.fieldsets import PROGRESS_FIELDS, InvalidFields
+from app.services.pagination import InvalidCursor, page_args, paginate
+from app.services.progress_series import get_series, parse_series_args, series_cache
+from app.services.response_cache import PROFILE_FIELDS
+from app.services.workout_stats import get_user_stats
 
 bp = Blueprint('profile', __name__)
 
 
 @bp.route('/', methods=['GET'], strict_slashes=False)
 @jwt_required()
+@conditional(profile_validator)
 def get_profile():
     """Get user profile"""
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
+        user = current_user
         
         return jsonify({'user': user.to_dict()}), 200
         
@@ -33,13 +45,10 @@ def get_profile():
 def update_profile():
     """Update user profile"""
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
+        user = current_user
         
         data = request.get_json()
+        previous_profile = {field: getattr(user, field) for field in PROFILE_FIELDS}
         
         # Update fields
         if 'full_name' in data:
@@ -60,6 +69,10 @@ def update_profile():
         user.updated_at = datetime.utcnow()
         db.session.commit()
         
+        # Cached AI responses for the old profile no longer apply
+        if any(getattr(user, field) != value for field, value in previous_profile.items()):
+            ai_coach.invalidate_profile(previous_profile)
+        
         return jsonify({
             'message': 'Profile updated',
             'user': user.to_dict()
@@ -72,22 +85,35 @@ def update_profile():
 
 @bp.route('/progress', methods=['GET'])
 @jwt_required()
+@use_read_bind
+@conditional(progress_validator)
 def get_progress_logs():
     """Get progress logs"""
     try:
         user_id = get_jwt_identity()
-        limit = request.args.get('limit', 30, type=int)
+        args = page_args(default_limit=30)
+        fields = PROGRESS_FIELDS.parse()
+        
+        query = ProgressLog.query.filter_by(user_id=user_id)
+        logs, next_cursor = paginate(
+            PROGRESS_FIELDS.apply(query, fields, required=[ProgressLog.logged_at]),
+            ProgressLog.logged_at, ProgressLog.id,
+            limit=args['limit'], cursor=args['cursor'], offset=args['offset']
+        )
         
-        logs = ProgressLog.query.filter_by(user_id=user_id)\
-            .order_by(ProgressLog.logged_at.desc())\
-            .limit(limit)\
-            .all()
+        result = {
+            'progress_logs': [PROGRESS_FIELDS.serialize(log, fields) for log in logs],
+            'next_cursor': next_cursor
+        }
         
-        return jsonify({
-            'progress_logs': [log.to_dict() for log in logs],
-            'total': ProgressLog.query.filter_by(user_id=user_id).count()
-        }), 200
+        # Counting the whole history is opt-in (legacy offset clients still get it)
+        if args['include_total'] or args['offset'] is not None:
+            result['total'] = query.count()
         
+        return jsonify(result), 200
+        
+    except (InvalidCursor, InvalidFields) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -112,6 +138,7 @@ def log_progress():
         
         db.session.add(log)
         db.session.commit()
+        series_cache.invalidate(user_id)
         
         return jsonify({
             'message': 'Progress logged',
@@ -123,40 +150,70 @@ def log_progress():
         return jsonify({'error': str(e)}), 500
 
 
-@bp.route('/statistics', methods=['GET'])
+@bp.route('/progress/series', methods=['GET'])
 @jwt_required()
-def get_statistics():
-    """Get user statistics"""
+@use_read_bind
+def get_progress_series():
+    """Get progress logs rolled up by day/week/month with moving averages and trends"""
     try:
         user_id = get_jwt_identity()
+        args = parse_series_args(
+            request.args.get('bucket'),
+            request.args.get('metrics'),
+            request.args.get('window', type=int)
+        )
         
-        # Total workouts
-        total_workouts = Workout.query.filter_by(user_id=user_id).count()
+        series = get_series(user_id, args['bucket'], args['metrics'], args['window'])
         
-        # Workouts this week
-        today = datetime.utcnow()
-        start_of_week = today - timedelta(days=today.weekday())
-        start_of_week = start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
+        return jsonify(series), 200
         
-        workouts_this_week = Workout.query.filter(
-            Workout.user_id == user_id,
-            Workout.created_at >= start_of_week
-        ).count()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/progress/bulk', methods=['POST'])
+@jwt_required()
+def bulk_log_progress():
+    """Log many progress entries from a JSON array or an NDJSON stream"""
+    user_id = get_jwt_identity()
+    ingest = BulkIngest(ProgressLog, validate_progress, user_id, chunk_size=chunk_size_arg(request))
+    
+    try:
+        ingest.add_all(read_records(request))
+        
+        return jsonify(ingest.report()), 200
         
-        # Total stats
-        stats = db.session.query(
-            func.sum(Workout.duration_minutes),
-            func.sum(Workout.calories_burned)
-        ).filter_by(user_id=user_id, status='completed').first()
+    except TooManyRecords as e:
+        db.session.rollback()
+        return jsonify({'error': str(e), **ingest.report()}), 413
+    except BulkPayloadError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e), **ingest.report()}), 500
+    finally:
+        # Chunks may have been committed even if the request failed part-way
+        if ingest.inserted:
+            series_cache.invalidate(user_id)
+
+
+@bp.route('/statistics', methods=['GET'])
+@jwt_required()
+@use_read_bind
+def get_statistics():
+    """Get user statistics"""
+    try:
+        user_id = get_jwt_identity()
         
-        total_minutes = int(stats[0]) if stats and stats[0] else 0
-        total_calories = int(stats[1]) if stats and stats[1] else 0
+        stats = get_user_stats(user_id)
         
         return jsonify({
-            'total_workouts': total_workouts,
-            'workouts_this_week': workouts_this_week,
-            'total_minutes': total_minutes,
-            'total_calories': total_calories
+            'total_workouts': stats['total_workouts'],
+            'workouts_this_week': stats['workouts_this_week'],
+            'total_minutes': stats['total_minutes'],
+            'total_calories': stats['total_calories']
         }), 200
         
     except Exception as e:
@@ -5,32 +5,68 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 from app import db
-from app.models import User, Workout
+from app.models import Workout
+from app.services.bulk_ingest import (
+    BulkIngest,
+    BulkPayloadError,
+    TooManyRecords,
+    chunk_size_arg,
+    read_records,
+    validate_workout,
+)
+from app.services.conditional import conditional, workout_stats_validator, workouts_validator
+from app.services.database import use_read_bind
+from app.services.fieldsets import WORKOUT_FIELDS, InvalidFields
+from app.services.pagination import InvalidCursor, page_args, paginate
+from app.services.workout_analytics import analytics_cache, get_analytics, parse_analytics_args
+from app.services.workout_stats import (
+    get_user_stats,
+    record_workout_added,
+    record_workouts_added,
+    record_workout_removed,
+    record_workout_updated,
+    snapshot,
+)
 
 bp = Blueprint('workouts', __name__)
 
 
 @bp.route('/', methods=['GET'], strict_slashes=False)
 @jwt_required()
+@use_read_bind
+@conditional(workouts_validator)
 def get_workouts():
     """Get user's workouts"""
     try:
         user_id = get_jwt_identity()
         status = request.args.get('status')  # planned, completed, skipped
-        limit = request.args.get('limit', 50, type=int)
+        args = page_args(default_limit=50)
+        fields = WORKOUT_FIELDS.parse()
         
         query = Workout.query.filter_by(user_id=user_id)
         
         if status:
             query = query.filter_by(status=status)
         
-        workouts = query.order_by(Workout.created_at.desc()).limit(limit).all()
+        workouts, next_cursor = paginate(
+            WORKOUT_FIELDS.apply(query, fields, required=[Workout.created_at]),
+            Workout.created_at, Workout.id,
+            limit=args['limit'], cursor=args['cursor'], offset=args['offset']
+        )
+        
+        # Serve the total from the per-user summary instead of re-counting
+        stats = get_user_stats(user_id)
+        total_key = f'{status}_workouts' if status else 'total_workouts'
+        total = stats[total_key] if total_key in stats else query.count()
         
         return jsonify({
-            'workouts': [w.to_dict() for w in workouts],
-            'total': query.count()
+            'workouts': [WORKOUT_FIELDS.serialize(w, fields) for w in workouts],
+            'total': total,
+            'next_cursor': next_cursor
         }), 200
         
+    except (InvalidCursor, InvalidFields) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -57,7 +93,10 @@ def create_workout():
         )
         
         db.session.add(workout)
+        db.session.flush()
+        record_workout_added(workout)
         db.session.commit()
+        analytics_cache.invalidate(user_id)
         
         return jsonify({
             'message': 'Workout created',
@@ -69,6 +108,35 @@ def create_workout():
         return jsonify({'error': str(e)}), 500
 
 
+@bp.route('/bulk', methods=['POST'])
+@jwt_required()
+def bulk_create_workouts():
+    """Create many workouts from a JSON array or an NDJSON stream"""
+    user_id = get_jwt_identity()
+    ingest = BulkIngest(
+        Workout, validate_workout, user_id,
+        chunk_size=chunk_size_arg(request), on_insert=record_workouts_added
+    )
+    
+    try:
+        ingest.add_all(read_records(request))
+        
+        return jsonify(ingest.report()), 200
+        
+    except TooManyRecords as e:
+        db.session.rollback()
+        return jsonify({'error': str(e), **ingest.report()}), 413
+    except BulkPayloadError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e), **ingest.report()}), 500
+    finally:
+        # Chunks may have been committed even if the request failed part-way
+        if ingest.inserted:
+            analytics_cache.invalidate(user_id)
+
+
 @bp.route('/<int:workout_id>', methods=['PUT'])
 @jwt_required()
 def update_workout(workout_id):
@@ -81,6 +149,7 @@ def update_workout(workout_id):
             return jsonify({'error': 'Workout not found'}), 404
         
         data = request.get_json()
+        before = snapshot(workout)
         
         # Update fields
         if 'status' in data:
@@ -97,7 +166,9 @@ def update_workout(workout_id):
         if 'intensity' in data:
             workout.intensity = data['intensity']
         
+        record_workout_updated(workout, before)
         db.session.commit()
+        analytics_cache.invalidate(user_id)
         
         return jsonify({
             'message': 'Workout updated',
@@ -121,7 +192,9 @@ def delete_workout(workout_id):
             return jsonify({'error': 'Workout not found'}), 404
         
         db.session.delete(workout)
+        record_workout_removed(workout)
         db.session.commit()
+        analytics_cache.invalidate(user_id)
         
         return jsonify({'message': 'Workout deleted'}), 200
         
@@ -132,32 +205,38 @@ def delete_workout(workout_id):
 
 @bp.route('/stats', methods=['GET'])
 @jwt_required()
+@use_read_bind
+@conditional(workout_stats_validator)
 def get_workout_stats():
     """Get workout statistics"""
     try:
         user_id = get_jwt_identity()
-        
-        total = Workout.query.filter_by(user_id=user_id).count()
-        completed = Workout.query.filter_by(user_id=user_id, status='completed').count()
-        planned = Workout.query.filter_by(user_id=user_id, status='planned').count()
-        
-        # Total calories
-        result = db.session.query(db.func.sum(Workout.calories_burned))\
-            .filter_by(user_id=user_id, status='completed').scalar()
-        total_calories = int(result) if result else 0
-        
-        # Total minutes
-        result = db.session.query(db.func.sum(Workout.duration_minutes))\
-            .filter_by(user_id=user_id, status='completed').scalar()
-        total_minutes = int(result) if result else 0
+        stats = get_user_stats(user_id)
         
         return jsonify({
-            'total_workouts': total,
-            'completed': completed,
-            'planned': planned,
-            'total_calories_burned': total_calories,
-            'total_minutes_exercised': total_minutes
+            'total_workouts': stats['total_workouts'],
+            'completed': stats['completed_workouts'],
+            'planned': stats['planned_workouts'],
+            'total_calories_burned': stats['total_calories'],
+            'total_minutes_exercised': stats['total_minutes']
         }), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/analytics', methods=['GET'])
+@jwt_required()
+@use_read_bind
+def get_workout_analytics():
+    """Get streaks, weekly volume and the workout type/intensity mix"""
+    try:
+        user_id = get_jwt_identity()
+        args = parse_analytics_args(request.args.get('weeks', type=int))
+        
+        return jsonify(get_analytics(user_id, args['weeks'])), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
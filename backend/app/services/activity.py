@@ -0,0 +1,199 @@
+"""
+Activity Service - User.last_active buffered in memory and written back in one batched UPDATE
+"""
+import atexit
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+from sqlalchemy import case, event, or_, update
+from sqlalchemy.orm.attributes import set_committed_value
+from app import db
+from app.models import User
+
+# Seconds between flushes; 0 writes every touch through immediately
+ACTIVITY_FLUSH_SECONDS = float(os.getenv('ACTIVITY_FLUSH_SECONDS', 15))
+# Flush early once this many users are waiting
+ACTIVITY_MAX_PENDING = int(os.getenv('ACTIVITY_MAX_PENDING', 5000))
+# Users per UPDATE statement (five bound parameters each)
+ACTIVITY_FLUSH_BATCH = 500
+
+users_table = User.__table__
+
+
+def _update_statement(entries: Dict[int, datetime]):
+    """
+    UPDATE users SET last_active = CASE id WHEN ... END WHERE id IN (...)
+
+    A row only moves forward, so a flush from another process holding an
+    older time cannot undo a newer one. updated_at is kept as it is: activity
+    is not a profile change.
+    """
+    latest = case(entries, value=users_table.c.id)
+    return update(users_table).where(users_table.c.id.in_(list(entries))).values(
+        last_active=case(
+            (or_(users_table.c.last_active.is_(None), users_table.c.last_active < latest), latest),
+            else_=users_table.c.last_active
+        ),
+        updated_at=users_table.c.updated_at
+    )
+
+
+class ActivityBuffer:
+    """
+    Latest activity time per user, waiting to be written
+
+    Entries are kept per engine, so apps bound to different databases in one
+    process each flush to their own. Users loaded while an entry is pending
+    get it overlaid on their last_active, so reads see it before it is written.
+    """
+
+    def __init__(self, flush_seconds: float = ACTIVITY_FLUSH_SECONDS, max_pending: int = ACTIVITY_MAX_PENDING):
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+        self._pending = {}  # engine -> {user_id: datetime}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._flusher_pid = None
+        self.touches = 0
+        self.flushes = 0
+        self.statements = 0
+        self.rows_written = 0
+        self.failures = 0
+        self.last_flush_ms = None
+
+    def touch(self, user: User, when: Optional[datetime] = None):
+        """Record activity now for a loaded user, and show it on that instance"""
+        when = when or datetime.utcnow()
+        # Read outside the lock: after a commit this reloads the user, and
+        # the load event calls overlay()
+        user_id, engine = user.id, db.engine
+        with self._lock:
+            pending = self._pending.setdefault(engine, {})
+            if user_id not in pending or pending[user_id] < when:
+                pending[user_id] = when
+            self.touches += 1
+            waiting = sum(len(entries) for entries in self._pending.values())
+        set_committed_value(user, 'last_active', when)
+
+        if self.flush_seconds <= 0:
+            self.flush()
+            return
+        self._ensure_flusher()
+        if waiting >= self.max_pending:
+            self._wake.set()
+
+    def pending(self, user_id: int) -> Optional[datetime]:
+        engine = db.engine
+        with self._lock:
+            return self._pending.get(engine, {}).get(user_id)
+
+    def overlay(self, user: User):
+        """Show a pending last_active on a loaded user without marking it modified"""
+        if 'last_active' not in user.__dict__:
+            return  # not loaded (deferred or expired); the next load overlays it
+        when = self.pending(user.id)
+        if when is not None and (user.last_active is None or user.last_active < when):
+            set_committed_value(user, 'last_active', when)
+
+    def flush(self) -> int:
+        """Write everything pending; returns the number of users written"""
+        from app.services.user_cache import user_cache
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        started = time.perf_counter()
+        written = statements = 0
+        for engine, entries in pending.items():
+            items = sorted(entries.items())
+            for start in range(0, len(items), ACTIVITY_FLUSH_BATCH):
+                batch = dict(items[start:start + ACTIVITY_FLUSH_BATCH])
+                try:
+                    with engine.begin() as conn:
+                        conn.execute(_update_statement(batch))
+                except Exception as e:
+                    # Keep what is left for the next flush
+                    self._restore(engine, dict(items[start:]))
+                    with self._lock:
+                        self.failures += 1
+                    print(f"⚠️ last_active flush failed, {len(items) - start} user(s) kept for retry: {e}")
+                    break
+                statements += 1
+                written += len(batch)
+                # Cached snapshots still hold the old value
+                for user_id in batch:
+                    user_cache.invalidate(user_id)
+
+        with self._lock:
+            self.flushes += 1
+            self.statements += statements
+            self.rows_written += written
+            self.last_flush_ms = round((time.perf_counter() - started) * 1000, 2)
+        return written
+
+    def _restore(self, engine, entries: Dict[int, datetime]):
+        with self._lock:
+            pending = self._pending.setdefault(engine, {})
+            for user_id, when in entries.items():
+                if user_id not in pending or pending[user_id] < when:
+                    pending[user_id] = when
+
+    def _ensure_flusher(self):
+        """Start the flush thread in this process (gunicorn forks after the app is built)"""
+        if self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        threading.Thread(target=self._run, name='activity-flusher', daemon=True).start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ last_active flush failed: {e}")
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            pending = sum(len(entries) for entries in self._pending.values())
+            return {
+                'pending': pending,
+                'touches': self.touches,
+                'flushes': self.flushes,
+                'statements': self.statements,
+                'rows_written': self.rows_written,
+                # Row writes avoided by coalescing touches of the same user
+                'writes_saved': self.touches - self.rows_written - pending,
+                'failures': self.failures,
+                'last_flush_ms': self.last_flush_ms,
+                'flush_seconds': self.flush_seconds
+            }
+
+
+# Global instance
+activity_buffer = ActivityBuffer()
+
+
+@event.listens_for(User, 'load')
+def _overlay_on_load(user, _context):
+    activity_buffer.overlay(user)
+
+
+@event.listens_for(User, 'refresh')
+def _overlay_on_refresh(user, _context, _attrs):
+    activity_buffer.overlay(user)
+
+
+def init_activity(app):
+    """Apply ACTIVITY_FLUSH_SECONDS and flush whatever is pending when the process exits"""
+    activity_buffer.flush_seconds = app.config.get('ACTIVITY_FLUSH_SECONDS', ACTIVITY_FLUSH_SECONDS)
+    atexit.unregister(activity_buffer.flush)
+    atexit.register(activity_buffer.flush)
@@ -3,19 +3,55 @@ AI Coach Service - Interface to the AI brains
 """
 import os
 import sys
-import json
-from typing import Dict, Optional
+import time
+import inspect
+import threading
+from typing import Dict, Iterator, Optional, Tuple
 
 # Add AI path
 AI_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', 'ai'))
 if AI_PATH not in sys.path:
     sys.path.insert(0, AI_PATH)
 
-from central_controller import CentralController
-from nlp.nlp_pipeline import NLPPipeline
-from nlp.integration.nlp_ml_integration import NLPMLIntegration
-from nlp.integration.nlp_prolog_integration import NLPPrologIntegration
-from dialogue.coach_pipeline import CoachPipeline
+from app.services.brain_runner import STATUS_TIMEOUT, BrainResult, ParallelBrainRunner, parse_deadlines
+from app.services.latency_sketch import BrainLatencyTracker
+from app.services.micro_batcher import install_batching
+from app.services.response_cache import ResponseCache
+
+# Warm-up states
+STATUS_COLD = 'cold'
+STATUS_WARMING = 'warming'
+STATUS_READY = 'ready'
+STATUS_FALLBACK = 'fallback'
+STATUS_FAILED = 'failed'
+
+# Execution modes: the CentralController runs every brain in turn, or the
+# parallel pipeline runs NLP and then ML and Logic concurrently
+EXECUTION_SEQUENTIAL = 'sequential'
+EXECUTION_PARALLEL = 'parallel'
+
+FALLBACK_RESPONSE = "Let's keep moving! Tell me a bit more about how you're feeling today."
+# Sent instead of advice when the safety rules did not run in time
+SAFETY_FALLBACK_RESPONSE = ("I couldn't finish my safety checks just now, so let's play it safe: "
+                            "take it easy today, and tell me if anything hurts.")
+SAFETY_CAUTION = 'caution'
+
+# Brain calls of the parallel pipeline: (brain, service attribute, keywords).
+# Each is called as `<attribute>.process(message, **keywords)`.
+PARALLEL_STAGES = (
+    ('NLP', 'nlp', ()),
+    ('ML', 'ml', ('user_data', 'nlp_result')),
+    ('Logic', 'logic', ('user_data', 'nlp_result')),
+    ('Personality', 'personality', ('user_data', 'context')),
+)
+
+# BrainOutput attributes of a CentralController decision, by brain name
+DECISION_OUTPUTS = (
+    ('NLP', 'nlp_output'),
+    ('ML', 'ml_output'),
+    ('Logic', 'logic_output'),
+    ('Personality', 'personality_output'),
+)
 
 
 class AICoachService:
@@ -36,9 +72,77 @@ class AICoachService:
         if self._initialized:
             return
         
+        self._brains_loaded = False
+        self._ml_batching = None
+        self._ml_batching_error = None
+        # Parallel brain runner, created by warm-up when AI_EXECUTION_MODE=parallel
+        self.execution_mode = os.getenv('AI_EXECUTION_MODE', EXECUTION_SEQUENTIAL).lower()
+        self.execution_error = None
+        self._runner = None
+        # Rolling p50/p95/p99 of each brain's execution time
+        self.latency = BrainLatencyTracker()
+        
+        # Cache of recent responses keyed on normalized message + profile features
+        self.cache = ResponseCache(
+            max_size=int(os.getenv('AI_CACHE_SIZE', 1024)),
+            ttl_seconds=float(os.getenv('AI_CACHE_TTL_SECONDS', 300)),
+            enabled=os.getenv('AI_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+        )
+        
+        # The brains themselves are loaded by warm_up(), not at import time
+        self.status = STATUS_COLD
+        self.warmup_error = None
+        self.warmup_time_ms = None
+        self._ready = threading.Event()
+        self._warmup_lock = threading.Lock()
+        self._warmup_thread = None
+        self._initialized = True
+    
+    @property
+    def is_ready(self) -> bool:
+        """True once warm-up has finished (with or without the AI brains)"""
+        return self._ready.is_set()
+    
+    @property
+    def is_available(self) -> bool:
+        """True once chat requests can be served"""
+        return self.is_ready and self._controller is not None
+    
+    def start_warmup(self) -> threading.Thread:
+        """Load the AI brains on a background thread (no-op if already started)"""
+        with self._warmup_lock:
+            if self._warmup_thread is None:
+                self._warmup_thread = threading.Thread(target=self.warm_up, name='ai-warmup', daemon=True)
+                self._warmup_thread.start()
+            return self._warmup_thread
+    
+    def warm_up(self):
+        """Load the NLP pipeline, ML model, Prolog facts and personality"""
+        with self._warmup_lock:
+            if self.status != STATUS_COLD:
+                return
+            self.status = STATUS_WARMING
+        
+        started = time.perf_counter()
+        
+        try:
+            from central_controller import CentralController
+        except Exception as e:
+            print(f"❌ AI Coach unavailable: {e}")
+            self.warmup_error = str(e)
+            self.status = STATUS_FAILED
+            self.warmup_time_ms = (time.perf_counter() - started) * 1000
+            self._ready.set()
+            return
+        
         try:
             print("🧠 Initializing AI Coach Service...")
             
+            from nlp.nlp_pipeline import NLPPipeline
+            from nlp.integration.nlp_ml_integration import NLPMLIntegration
+            from nlp.integration.nlp_prolog_integration import NLPPrologIntegration
+            from dialogue.coach_pipeline import CoachPipeline
+            
             # Initialize NLP Pipeline (Shared)
             self.nlp = NLPPipeline()
             
@@ -50,6 +154,22 @@ class AICoachService:
             self.ml = NLPMLIntegration(ml_model_path=ml_model_path, nlp_pipeline=self.nlp)
             self.logic = NLPPrologIntegration(prolog_facts_dir=prolog_facts_dir, nlp_pipeline=self.nlp)
             
+            # Batch concurrent XGBoost predictions across chat requests
+            if os.getenv('AI_BATCH_ENABLED', 'false').lower() in ('1', 'true', 'yes'):
+                try:
+                    self._ml_batching = install_batching(
+                        self.ml,
+                        attribute=os.getenv('AI_BATCH_MODEL_ATTRIBUTE') or None,
+                        max_batch_size=int(os.getenv('AI_BATCH_MAX_SIZE', 32)),
+                        max_wait_ms=float(os.getenv('AI_BATCH_MAX_WAIT_MS', 5)),
+                        max_queue=int(os.getenv('AI_BATCH_MAX_QUEUE', 1024)),
+                        timeout_ms=float(os.getenv('AI_BATCH_TIMEOUT_MS', 1000))
+                    )
+                    print(f"⚡ ML batching on {type(self.ml).__name__}.{self._ml_batching.attribute}")
+                except ValueError as e:
+                    self._ml_batching_error = str(e)
+                    print(f"❌ ML batching enabled but not installed: {e}")
+            
             # Initialize Personality (Coach Pipeline)
             # Note: Passing brains to CoachPipeline to ensure it can generate responses
             self.personality = CoachPipeline(
@@ -66,14 +186,72 @@ class AICoachService:
                 dialogue_pipeline=self.personality
             )
             
-            self._initialized = True
+            if self.execution_mode == EXECUTION_PARALLEL:
+                self._start_parallel()
+            
+            self._brains_loaded = True
+            self.status = STATUS_READY
             print("✅ AI Coach Service ready!\n")
             
         except Exception as e:
             print(f"⚠️ AI Coach initialization error: {e}")
             print("⚠️ Running in fallback mode (no AI brains)")
+            self.warmup_error = str(e)
             self._controller = CentralController()
-            self._initialized = True
+            self.status = STATUS_FALLBACK
+        
+        self.warmup_time_ms = (time.perf_counter() - started) * 1000
+        self._ready.set()
+    
+    def _start_parallel(self):
+        """Create the brain runner, unless the brains lack the calls it makes"""
+        problem = self._check_parallel_stages()
+        if problem:
+            self.execution_error = problem
+            print(f"⚠️ AI_EXECUTION_MODE=parallel unavailable ({problem}); running brains sequentially")
+            return
+        
+        self._runner = ParallelBrainRunner(
+            max_workers=int(os.getenv('AI_BRAIN_WORKERS', 4)),
+            deadlines_ms=parse_deadlines(os.getenv('AI_BRAIN_DEADLINES_MS', '')),
+            default_deadline_ms=float(os.getenv('AI_BRAIN_DEFAULT_DEADLINE_MS', 2000))
+        )
+        print(f"⚡ Parallel brain execution on {self._runner.max_workers} threads")
+    
+    def _check_parallel_stages(self) -> Optional[str]:
+        """Why the loaded brains cannot run in the parallel pipeline (None if they can)"""
+        for _name, attribute, keywords in PARALLEL_STAGES:
+            method = getattr(getattr(self, attribute, None), 'process', None)
+            if not callable(method):
+                return f'{attribute}.process() not found'
+            try:
+                inspect.signature(method).bind('', **dict.fromkeys(keywords))
+            except TypeError:
+                return f"{attribute}.process() does not accept (message, {', '.join(keywords) or '-'})"
+            except ValueError:
+                # Builtins without an introspectable signature
+                continue
+        return None
+    
+    @property
+    def active_execution_mode(self) -> str:
+        return EXECUTION_PARALLEL if self._runner is not None else EXECUTION_SEQUENTIAL
+    
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until warm-up finishes; returns False on timeout"""
+        return self._ready.wait(timeout)
+    
+    def get_status(self) -> Dict:
+        """Warm-up status for the readiness endpoint"""
+        return {
+            'ready': self.is_available,
+            'status': self.status,
+            'brains_loaded': self._brains_loaded,
+            'warmup_time_ms': round(self.warmup_time_ms, 2) if self.warmup_time_ms is not None else None,
+            'error': self.warmup_error,
+            'execution_mode': self.active_execution_mode,
+            'execution_error': self.execution_error
+        }
     
     def chat(self, message: str, user_data: Optional[Dict] = None) -> Dict:
         """
@@ -86,6 +264,96 @@ class AICoachService:
         Returns:
             Dictionary with response and metadata
         """
+        cached = self._cached_response(message, user_data)
+        if cached is not None:
+            return cached
+        
+        result = self._process(message, user_data)
+        self.cache.put(message, user_data, result)
+        return result
+    
+    def chat_stream(self, message: str, user_data: Optional[Dict] = None) -> Iterator[Tuple[str, Dict]]:
+        """
+        Send message to AI Coach, yielding results as they become available
+        
+        Yields (event, data) pairs:
+            ('metadata', {...})  once per brain result (emotion/intent, ML, safety)
+            ('token', {'text'})  chunks of the response text
+            ('result', {...})    the full response dict, same shape as chat()
+        
+        In parallel mode each brain's metadata is yielded as that brain
+        finishes, and tokens as Personality generates them. The sequential
+        CentralController only returns a finished decision, so there (and for
+        cached replies) everything is yielded at once, with the response as
+        a single token.
+        """
+        result = self._cached_response(message, user_data)
+        staged = result is None and self._runner is not None
+        
+        if staged:
+            streamed = False
+            try:
+                for event, data in self._run_parallel(message, user_data):
+                    if event == 'result':
+                        result = data
+                        continue
+                    streamed = streamed or event == 'token'
+                    yield event, data
+                self._record_latency(result)
+            except Exception as e:
+                print(f"❌ Chat error: {e}")
+                result = self._error_response(e)
+                if not streamed:
+                    yield 'token', {'text': result['response']}
+            self.cache.put(message, user_data, result)
+        elif result is None:
+            result = self._process(message, user_data)
+            self.cache.put(message, user_data, result)
+        
+        if not staged:
+            # Metadata first so clients can render emotion/safety before the text
+            yield 'metadata', {
+                'brain': 'NLP',
+                'emotion': result.get('emotion_detected'),
+                'intent': result.get('intent_detected'),
+                'energy_level': result.get('energy_level')
+            }
+            yield 'metadata', {
+                'brain': 'ML',
+                'workout_recommendation': result.get('workout_recommendation'),
+                'confidence': (result.get('metadata') or {}).get('ml_confidence')
+            }
+            yield 'metadata', {
+                'brain': 'Logic',
+                'safety_status': result.get('safety_status')
+            }
+        
+            yield 'token', {'text': result.get('response') or ''}
+        
+        yield 'result', result
+    
+    def invalidate_profile(self, user_data: Dict) -> int:
+        """Drop cached responses for a profile that has just changed"""
+        return self.cache.invalidate_profile(user_data)
+    
+    def _cached_response(self, message: str, user_data: Optional[Dict]) -> Optional[Dict]:
+        """Look up a cached response, marking it as served from cache"""
+        started = time.perf_counter()
+        cached = self.cache.get(message, user_data)
+        
+        if cached is not None:
+            cached['processing_time_ms'] = (time.perf_counter() - started) * 1000
+            cached.setdefault('metadata', {})['cached'] = True
+            # No brain ran for this turn
+            cached['metadata'].pop('brain_times_ms', None)
+        
+        return cached
+    
+    def _process(self, message: str, user_data: Optional[Dict]) -> Dict:
+        """Run the message through the AI brains"""
+        if self._runner is not None:
+            return self._process_parallel(message, user_data)
+        
         try:
             # Process through central controller
             decision = self._controller.process(
@@ -94,39 +362,208 @@ class AICoachService:
                 context={}
             )
             
-            # Extract metadata
-            nlp_data = decision.nlp_output.data if decision.nlp_output else {}
-            ml_data = decision.ml_output.data if decision.ml_output else {}
-            
-            return {
-                'response': decision.final_response,
-                'workout_recommendation': decision.workout_recommendation,
-                'safety_status': decision.safety_status,
-                'confidence_score': decision.confidence_score,
-                'emotion_detected': nlp_data.get('emotion'),
-                'intent_detected': nlp_data.get('intent'),
-                'energy_level': nlp_data.get('energy_level'),
-                'brains_used': decision.decision_path,
-                'processing_time_ms': decision.total_execution_time_ms,
-                'metadata': {
-                    'nlp_confidence': nlp_data.get('emotion_confidence'),
-                    'ml_confidence': ml_data.get('confidence'),
-                    'brains_active': decision.brains_used
-                }
-            }
+            result = self._format_decision(decision)
+            self._record_latency(result)
+            return result
             
         except Exception as e:
             print(f"❌ Chat error: {e}")
-            return {
-                'response': "I'm having trouble processing your request. Please try again.",
-                'error': str(e),
-                'workout_recommendation': 'REST',
-                'safety_status': 'safe',
-                'confidence_score': 0.0
+            return self._error_response(e)
+    
+    def _process_parallel(self, message: str, user_data: Optional[Dict]) -> Dict:
+        """Run the parallel pipeline and return only the final response"""
+        try:
+            for event, data in self._run_parallel(message, user_data):
+                if event == 'result':
+                    self._record_latency(data)
+                    return data
+            raise RuntimeError('Parallel pipeline produced no result')
+        except Exception as e:
+            print(f"❌ Chat error: {e}")
+            return self._error_response(e)
+    
+    def _run_parallel(self, message: str, user_data: Optional[Dict]) -> Iterator[Tuple[str, Dict]]:
+        """
+        Run the brains in stages, yielding per-brain metadata as each finishes
+        
+        NLP runs first because every other brain consumes its analysis. ML and
+        Logic then run concurrently, and Personality composes the reply from
+        their outputs, yielded as 'token' events as it generates them (a
+        Personality brain may return an iterator of text chunks). Each brain
+        has its own latency budget; one that misses it is reported as timed
+        out. Without a safety verdict from Logic (or without the NLP analysis
+        it needs) no advice is composed and a cautious fallback reply is sent
+        instead.
+        """
+        started = time.perf_counter()
+        user_data = user_data or {}
+        results = {}
+        
+        nlp = self._runner.run_one('NLP', lambda: self.nlp.process(message))
+        results[nlp.name] = nlp
+        yield 'metadata', self._brain_metadata(nlp)
+        
+        if nlp.ok:
+            fan_out = {
+                'ML': lambda: self.ml.process(message, user_data=user_data, nlp_result=nlp.data),
+                'Logic': lambda: self.logic.process(message, user_data=user_data, nlp_result=nlp.data)
             }
+            for result in self._runner.run_many(fan_out):
+                results[result.name] = result
+                yield 'metadata', self._brain_metadata(result)
+        
+        if self._safety_verdict(results) is None:
+            response = SAFETY_FALLBACK_RESPONSE
+            yield 'token', {'text': response}
+        else:
+            context = {
+                'nlp': nlp.data,
+                'ml': results['ML'].data,
+                'logic': results['Logic'].data
+            }
+            chunks = []
+            for item in self._runner.stream(
+                'Personality',
+                lambda: self.personality.process(message, user_data=user_data, context=context)
+            ):
+                if isinstance(item, BrainResult):
+                    results[item.name] = item
+                else:
+                    chunks.append(item)
+                    yield 'token', {'text': item}
+            
+            # Text already sent stays the reply even if the brain stalled after it
+            response = ''.join(chunks) or results['Personality'].data.get('response') or FALLBACK_RESPONSE
+            if not chunks:
+                yield 'token', {'text': response}
+        
+        yield 'result', self._format_parallel(results, response, (time.perf_counter() - started) * 1000)
+    
+    @staticmethod
+    def _safety_verdict(results: Dict) -> Optional[str]:
+        """The Logic brain's safety_status, or None if it did not produce one"""
+        logic = results.get('Logic')
+        if logic is None or not logic.ok:
+            return None
+        return logic.data.get('safety_status')
+    
+    @staticmethod
+    def _brain_metadata(result) -> Dict:
+        """Metadata event for one brain result"""
+        metadata = {
+            'brain': result.name,
+            'status': result.status,
+            'execution_time_ms': round(result.execution_time_ms, 2)
+        }
+        data = result.data
+        
+        if result.name == 'NLP':
+            metadata.update({
+                'emotion': data.get('emotion'),
+                'intent': data.get('intent'),
+                'energy_level': data.get('energy_level')
+            })
+        elif result.name == 'ML':
+            metadata.update({
+                'workout_recommendation': data.get('workout_recommendation'),
+                'confidence': data.get('confidence')
+            })
+        elif result.name == 'Logic':
+            metadata['safety_status'] = data.get('safety_status')
+        
+        return metadata
+    
+    def _format_parallel(self, results: Dict, response: str, total_ms: float) -> Dict:
+        """Build the API response dict from staged brain results"""
+        nlp_data = results['NLP'].data
+        ml_data = results['ML'].data if 'ML' in results else {}
+        safety_status = self._safety_verdict(results) or SAFETY_CAUTION
+        
+        # Only recommend training the safety rules have cleared
+        recommendation = ml_data.get('workout_recommendation') if safety_status == 'safe' else None
+        
+        return {
+            'response': response,
+            'workout_recommendation': recommendation or 'REST',
+            'safety_status': safety_status,
+            'confidence_score': ml_data.get('confidence', 0.0),
+            'emotion_detected': nlp_data.get('emotion'),
+            'intent_detected': nlp_data.get('intent'),
+            'energy_level': nlp_data.get('energy_level'),
+            'brains_used': [name for name, result in results.items() if result.ok],
+            'processing_time_ms': total_ms,
+            'metadata': {
+                'nlp_confidence': nlp_data.get('emotion_confidence'),
+                'ml_confidence': ml_data.get('confidence'),
+                'brains_active': list(results),
+                'brain_status': {name: result.status for name, result in results.items()},
+                'brain_times_ms': {
+                    name: round(result.execution_time_ms, 2)
+                    for name, result in results.items() if result.ok
+                },
+                'timed_out': [name for name, result in results.items() if result.status == STATUS_TIMEOUT],
+                'execution_mode': EXECUTION_PARALLEL
+            }
+        }
+    
+    def _format_decision(self, decision) -> Dict:
+        """Convert a controller decision into the API response dict"""
+        nlp_data = decision.nlp_output.data if decision.nlp_output else {}
+        ml_data = decision.ml_output.data if decision.ml_output else {}
+        
+        return {
+            'response': decision.final_response,
+            'workout_recommendation': decision.workout_recommendation,
+            'safety_status': decision.safety_status,
+            'confidence_score': decision.confidence_score,
+            'emotion_detected': nlp_data.get('emotion'),
+            'intent_detected': nlp_data.get('intent'),
+            'energy_level': nlp_data.get('energy_level'),
+            'brains_used': decision.decision_path,
+            'processing_time_ms': decision.total_execution_time_ms,
+            'metadata': {
+                'nlp_confidence': nlp_data.get('emotion_confidence'),
+                'ml_confidence': ml_data.get('confidence'),
+                'brains_active': decision.brains_used,
+                'brain_times_ms': self._decision_times(decision)
+            }
+        }
+    
+    @staticmethod
+    def _decision_times(decision) -> Dict:
+        """execution_time_ms of each BrainOutput the controller produced"""
+        times = {}
+        for name, attribute in DECISION_OUTPUTS:
+            elapsed = getattr(getattr(decision, attribute, None), 'execution_time_ms', None)
+            if elapsed is not None:
+                times[name] = round(elapsed, 2)
+        return times
+    
+    def _record_latency(self, result: Dict):
+        """Feed a freshly computed turn into the per-brain percentile sketches"""
+        self.latency.record((result.get('metadata') or {}).get('brain_times_ms') or {},
+                            result.get('processing_time_ms'))
+    
+    @staticmethod
+    def _error_response(error: Exception) -> Dict:
+        """Fallback response when the AI pipeline fails"""
+        return {
+            'response': "I'm having trouble processing your request. Please try again.",
+            'error': str(error),
+            'workout_recommendation': 'REST',
+            'safety_status': 'safe',
+            'confidence_score': 0.0
+        }
     
     def get_stats(self) -> Dict:
         """Get AI Coach statistics"""
+        if self._controller is None:
+            return {'status': self.status, 'cache': self.cache.get_stats(), 'latency': self.latency.get_stats()}
+        
+        execution = {'mode': self.active_execution_mode, 'error': self.execution_error}
+        if self._runner is not None:
+            execution.update(self._runner.get_stats())
+        
         try:
             stats = self._controller.get_stats()
             return {
@@ -136,11 +573,17 @@ class AICoachService:
                 'logic_calls': stats.get('logic_calls', 0),
                 'personality_calls': stats.get('personality_calls', 0),
                 'safety_interventions': stats.get('safety_interventions', 0),
-                'average_response_time_ms': stats.get('average_response_time_ms', 0)
+                'average_response_time_ms': stats.get('average_response_time_ms', 0),
+                'latency': self.latency.get_stats(),
+                'cache': self.cache.get_stats(),
+                'ml_batching': (self._ml_batching.get_stats() if self._ml_batching
+                                else {'enabled': False, 'error': self._ml_batching_error}),
+                'execution': execution,
+                'status': self.status
             }
         except Exception as e:
             return {'error': str(e)}
 
 
-# Global instance
+# Global instance (cheap to create; call start_warmup() to load the brains)
 ai_coach = AICoachService()
@@ -3,7 +3,7 @@ Mock AI Coach Service - Simple version without full AI dependencies
 """
 import os
 import random
-from typing import Dict
+from typing import Dict, Iterator, Tuple
 
 
 class AICoachService:
@@ -57,6 +57,12 @@ class AICoachService:
             'suggestions': ['Tell me about your goals', 'Show workout plans', 'Track progress']
         }
     
+    def chat_stream(self, message: str, user_data: Dict) -> Iterator[Tuple[str, Dict]]:
+        """Mock streaming chat: the whole response as one token"""
+        result = self.chat(message, user_data)
+        yield 'token', {'text': result['response']}
+        yield 'result', result
+    
     def generate_workout(self, user_data: Dict, preferences: Dict = None) -> Dict:
         """
         Mock workout generation
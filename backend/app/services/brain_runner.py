@@ -0,0 +1,200 @@
+"""
+Brain Runner - Concurrent fan-out of AI brains with per-brain deadlines
+"""
+import queue
+import threading
+import time
+from collections.abc import Iterator as IteratorABC
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, Optional, Union
+
+STATUS_OK = 'ok'
+STATUS_TIMEOUT = 'timeout'
+STATUS_ERROR = 'error'
+
+
+@dataclass
+class BrainResult:
+    """Outcome of one brain call"""
+    name: str
+    status: str
+    data: Dict = field(default_factory=dict)
+    execution_time_ms: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == STATUS_OK
+
+
+def parse_deadlines(spec: str) -> Dict[str, float]:
+    """Parse 'nlp=500,ml=800' into {'nlp': 500.0, 'ml': 800.0}"""
+    deadlines = {}
+    for part in (spec or '').split(','):
+        if '=' not in part:
+            continue
+        name, value = part.split('=', 1)
+        try:
+            deadlines[name.strip().lower()] = float(value)
+        except ValueError:
+            continue
+    return deadlines
+
+
+def as_dict(data) -> Dict:
+    """Normalize brain outputs (dicts, BrainOutput-like objects) to a dict"""
+    if data is None:
+        return {}
+    if isinstance(data, dict):
+        return data
+    if isinstance(getattr(data, 'data', None), dict):
+        return data.data
+    if hasattr(data, 'to_dict'):
+        return data.to_dict()
+    return {'value': data}
+
+
+class ParallelBrainRunner:
+    """
+    Runs brain calls on a bounded thread pool
+
+    Each call gets its own latency budget. A call that misses it is reported
+    as timed out and the caller moves on; the worker thread finishes in the
+    background and its result is discarded. While every worker is busy with
+    such a call, new calls queue and may time out themselves, so a stuck
+    brain degrades replies instead of stalling them.
+    """
+
+    def __init__(self, max_workers: int = 4, deadlines_ms: Optional[Dict[str, float]] = None,
+                 default_deadline_ms: float = 2000.0):
+        self.max_workers = max_workers
+        self.deadlines_ms = {k.lower(): v for k, v in (deadlines_ms or {}).items()}
+        self.default_deadline_ms = default_deadline_ms
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='brain')
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.timeouts = {}
+        self.errors = {}
+
+    def deadline_for(self, name: str) -> float:
+        """Latency budget for a brain in milliseconds"""
+        return self.deadlines_ms.get(name.lower(), self.default_deadline_ms)
+
+    @staticmethod
+    def _timed(fn: Callable[[], Dict]):
+        """Wrap a brain call so it reports its own execution time"""
+        def call():
+            started = time.perf_counter()
+            data = fn()
+            return data, (time.perf_counter() - started) * 1000
+        return call
+
+    def run_one(self, name: str, fn: Callable[[], Dict]) -> BrainResult:
+        """Run a single brain within its deadline"""
+        return next(self.run_many({name: fn}))
+
+    def run_many(self, calls: Dict[str, Callable[[], Dict]]) -> Iterator[BrainResult]:
+        """
+        Run brains concurrently, yielding results in completion order
+
+        Deadlines are measured from the moment the calls are submitted, so the
+        whole fan-out takes at most as long as the largest budget.
+        """
+        started = time.perf_counter()
+        pending = {
+            self._executor.submit(self._timed(fn)): name
+            for name, fn in calls.items()
+        }
+
+        while pending:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            next_deadline_ms = min(self.deadline_for(name) for name in pending.values())
+            timeout = max(0.0, next_deadline_ms - elapsed_ms) / 1000
+
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    data, execution_time_ms = future.result()
+                    yield self._count(BrainResult(name, STATUS_OK, as_dict(data), execution_time_ms))
+                except Exception as e:
+                    yield self._count(BrainResult(name, STATUS_ERROR, error=str(e),
+                                                  execution_time_ms=(time.perf_counter() - started) * 1000))
+
+            # Give up on anything that is now past its budget
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            for future, name in list(pending.items()):
+                if elapsed_ms >= self.deadline_for(name):
+                    future.cancel()
+                    del pending[future]
+                    yield self._count(BrainResult(name, STATUS_TIMEOUT, execution_time_ms=elapsed_ms,
+                                                  error=f'Exceeded {self.deadline_for(name):.0f}ms budget'))
+
+    def stream(self, name: str, fn: Callable) -> Iterator[Union[str, BrainResult]]:
+        """
+        Run a brain whose output may be a stream of text chunks
+
+        Yields each chunk as the brain produces it, then the BrainResult (for
+        a streamed output its data is {'response': <all chunks>}). The deadline
+        bounds the wait for every chunk, so a brain that stalls part-way
+        through is cut off and reported as timed out.
+        """
+        started = time.perf_counter()
+        items = queue.Queue()
+
+        def elapsed_ms():
+            return (time.perf_counter() - started) * 1000
+
+        def produce():
+            try:
+                data = fn()
+                if isinstance(data, IteratorABC):
+                    parts = []
+                    for chunk in data:
+                        parts.append(str(chunk))
+                        items.put(parts[-1])
+                    data = {'response': ''.join(parts)}
+                items.put(BrainResult(name, STATUS_OK, as_dict(data), elapsed_ms()))
+            except Exception as e:
+                items.put(BrainResult(name, STATUS_ERROR, error=str(e), execution_time_ms=elapsed_ms()))
+
+        self._executor.submit(produce)
+        timeout = self.deadline_for(name) / 1000
+
+        while True:
+            try:
+                item = items.get(timeout=timeout)
+            except queue.Empty:
+                yield self._count(BrainResult(name, STATUS_TIMEOUT, execution_time_ms=elapsed_ms(),
+                                              error=f'No output within {self.deadline_for(name):.0f}ms'))
+                return
+            if isinstance(item, BrainResult):
+                yield self._count(item)
+                return
+            yield item
+
+    def _count(self, result: BrainResult) -> BrainResult:
+        with self._lock:
+            self.runs += 1
+            bucket = {STATUS_TIMEOUT: self.timeouts, STATUS_ERROR: self.errors}.get(result.status)
+            if bucket is not None:
+                bucket[result.name] = bucket.get(result.name, 0) + 1
+        return result
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'brain_calls': self.runs,
+                'brain_timeouts': dict(self.timeouts),
+                'brain_errors': dict(self.errors),
+                'deadlines_ms': {
+                    name: self.deadline_for(name)
+                    for name in ('NLP', 'ML', 'Logic', 'Personality')
+                }
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
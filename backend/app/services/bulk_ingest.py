@@ -0,0 +1,285 @@
+"""
+Bulk Ingest Service - Validates and batch-inserts workouts and progress logs
+"""
+import json
+import math
+import os
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from app import db
+
+BULK_CHUNK_SIZE = int(os.getenv('BULK_CHUNK_SIZE', 500))
+BULK_MAX_RECORDS = int(os.getenv('BULK_MAX_RECORDS', 10000))
+
+# Per-row errors returned in a report; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+NDJSON_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+WORKOUT_STATUSES = ('planned', 'completed', 'skipped')
+
+
+class BulkPayloadError(ValueError):
+    """The request body as a whole could not be read"""
+
+
+class TooManyRecords(BulkPayloadError):
+    """The request holds more than BULK_MAX_RECORDS records"""
+
+
+def read_records(request) -> Iterator[Tuple[int, object]]:
+    """
+    Yield (index, record) pairs from a JSON array or an NDJSON stream
+
+    A JSON body may be a list or {"records": [...]}. NDJSON bodies are read a
+    line at a time; a line that is not valid JSON is yielded as a
+    BulkPayloadError so the caller can report it against that row.
+
+    Either way TooManyRecords is raised before the first record is yielded,
+    so an oversized request is rejected before any chunk has been written.
+    """
+    if request.mimetype in NDJSON_TYPES:
+        # Lines are kept unparsed until the whole body has been counted
+        lines = []
+        for line in request.stream:
+            line = line.strip()
+            if not line:
+                continue
+            if len(lines) >= BULK_MAX_RECORDS:
+                raise TooManyRecords(f'At most {BULK_MAX_RECORDS} records per request')
+            lines.append(line)
+
+        for index, line in enumerate(lines):
+            try:
+                yield index, json.loads(line)
+            except ValueError as e:
+                yield index, BulkPayloadError(f'Invalid JSON: {e}')
+        return
+
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('records')
+    if not isinstance(data, list):
+        raise BulkPayloadError('Expected a JSON array of records (or NDJSON)')
+    if len(data) > BULK_MAX_RECORDS:
+        raise TooManyRecords(f'At most {BULK_MAX_RECORDS} records per request')
+
+    yield from enumerate(data)
+
+
+def _datetime(record: Dict, field: str, errors: List[str]) -> Optional[datetime]:
+    value = record.get(field)
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        errors.append(f'{field} must be an ISO 8601 datetime')
+        return None
+
+
+def _number(record: Dict, field: str, errors: List[str], kind=float,
+            minimum: Optional[float] = None, maximum: Optional[float] = None):
+    value = record.get(field)
+    if value is None:
+        return None
+    if (isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value)
+            or (kind is int and value != int(value))):
+        errors.append(f'{field} must be {"an integer" if kind is int else "a number"}')
+        return None
+    if (minimum is not None and value < minimum) or (maximum is not None and value > maximum):
+        errors.append(f'{field} must be between {minimum} and {maximum}')
+        return None
+    return kind(value)
+
+
+def _string(record: Dict, field: str, errors: List[str], max_length: Optional[int] = None,
+            choices: Optional[Tuple] = None, default: Optional[str] = None) -> Optional[str]:
+    value = record.get(field, default)
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        errors.append(f'{field} must be a string')
+        return None
+    if choices and value not in choices:
+        errors.append(f'{field} must be one of: {", ".join(choices)}')
+        return None
+    if max_length and len(value) > max_length:
+        errors.append(f'{field} must be at most {max_length} characters')
+        return None
+    return value
+
+
+def _external_id(record: Dict, errors: List[str]) -> Optional[str]:
+    value = record.get('external_id')
+    if isinstance(value, int) and not isinstance(value, bool):
+        value = str(value)
+    return _string({'external_id': value}, 'external_id', errors, max_length=64)
+
+
+def validate_workout(record: Dict, now: datetime) -> Tuple[Dict, List[str]]:
+    """Column values for one workout record, plus any validation errors"""
+    errors = []
+    status = _string(record, 'status', errors, choices=WORKOUT_STATUSES, default='planned')
+    completed_at = _datetime(record, 'completed_at', errors)
+
+    row = {
+        'external_id': _external_id(record, errors),
+        'workout_type': _string(record, 'workout_type', errors, max_length=50, default='general'),
+        'duration_minutes': _number(record, 'duration_minutes', errors, kind=int, minimum=0, maximum=1440),
+        'calories_burned': _number(record, 'calories_burned', errors, kind=int, minimum=0, maximum=20000),
+        # Free text, as in the single-row endpoint; only the column length is enforced
+        'intensity': _string(record, 'intensity', errors, max_length=20, default='medium'),
+        'recommended_by_ai': bool(record.get('recommended_by_ai', False)),
+        'ai_confidence': _number(record, 'ai_confidence', errors, minimum=0, maximum=1),
+        'status': status,
+        'notes': _string(record, 'notes', errors),
+        'scheduled_for': _datetime(record, 'scheduled_for', errors),
+        'completed_at': completed_at or (now if status == 'completed' else None),
+        'created_at': now,
+        'updated_at': now,
+    }
+    return row, errors
+
+
+def validate_progress(record: Dict, now: datetime) -> Tuple[Dict, List[str]]:
+    """Column values for one progress log record, plus any validation errors"""
+    errors = []
+
+    row = {
+        'external_id': _external_id(record, errors),
+        'weight': _number(record, 'weight', errors, minimum=0, maximum=1000),
+        'body_fat_percentage': _number(record, 'body_fat_percentage', errors, minimum=0, maximum=100),
+        'muscle_mass': _number(record, 'muscle_mass', errors, minimum=0, maximum=1000),
+        'notes': _string(record, 'notes', errors),
+        'mood': _string(record, 'mood', errors, max_length=50),
+        'energy_level': _number(record, 'energy_level', errors, kind=int, minimum=1, maximum=100),
+        'logged_at': _datetime(record, 'logged_at', errors) or now,
+        'updated_at': now,
+    }
+    return row, errors
+
+
+class BulkIngest:
+    """
+    Inserts validated rows for one user in chunks
+
+    Each chunk is one multi-row INSERT (executemany) and one commit, so a
+    failure part-way through keeps the chunks already written. Rows whose
+    external_id already exists for the user are skipped and reported as
+    duplicates, which makes resending a whole batch after a failure safe.
+    """
+
+    def __init__(self, model, validate: Callable, user_id: int,
+                 chunk_size: int = BULK_CHUNK_SIZE, on_insert: Optional[Callable] = None):
+        self.model = model
+        self.validate = validate
+        self.user_id = user_id
+        self.chunk_size = max(1, chunk_size)
+        self.on_insert = on_insert
+        self.now = datetime.utcnow()
+        self.received = 0
+        self.inserted = 0
+        self.duplicates = []
+        self.failed = 0
+        self.errors = []
+        self._pending = []
+        self._seen_external_ids = set()
+
+    def _error(self, index: int, record, messages: List[str]):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            external_id = record.get('external_id') if isinstance(record, dict) else None
+            self.errors.append({'index': index, 'external_id': external_id, 'errors': messages})
+
+    def add(self, index: int, record):
+        """Validate one record and queue it for insertion"""
+        self.received += 1
+
+        if isinstance(record, BulkPayloadError):
+            self._error(index, None, [str(record)])
+            return
+        if not isinstance(record, dict):
+            self._error(index, record, ['Record must be a JSON object'])
+            return
+
+        row, messages = self.validate(record, self.now)
+        if messages:
+            self._error(index, record, messages)
+            return
+
+        external_id = row['external_id']
+        if external_id is not None:
+            if external_id in self._seen_external_ids:
+                self.duplicates.append(external_id)
+                return
+            self._seen_external_ids.add(external_id)
+
+        row['user_id'] = self.user_id
+        self._pending.append(row)
+
+        if len(self._pending) >= self.chunk_size:
+            self.flush()
+
+    def add_all(self, records: Iterable[Tuple[int, object]]):
+        for index, record in records:
+            self.add(index, record)
+        self.flush()
+
+    def _existing_external_ids(self, external_ids: List[str]) -> set:
+        if not external_ids:
+            return set()
+        rows = db.session.query(self.model.external_id).filter(
+            self.model.user_id == self.user_id,
+            self.model.external_id.in_(external_ids)
+        ).all()
+        return {row[0] for row in rows}
+
+    def _insert_chunk(self, rows: List[Dict]) -> List[Dict]:
+        existing = self._existing_external_ids([r['external_id'] for r in rows if r['external_id']])
+        fresh = [r for r in rows if r['external_id'] not in existing]
+        duplicates = [r['external_id'] for r in rows if r['external_id'] in existing]
+
+        if fresh:
+            db.session.execute(insert(self.model), fresh)
+            if self.on_insert:
+                self.on_insert(self.user_id, fresh)
+        db.session.commit()
+        # Only once committed: a retried chunk re-counts its duplicates
+        self.duplicates.extend(duplicates)
+        return fresh
+
+    def flush(self):
+        """Write the queued rows as one chunk"""
+        if not self._pending:
+            return
+
+        rows, self._pending = self._pending, []
+
+        try:
+            inserted = self._insert_chunk(rows)
+        except IntegrityError:
+            # A concurrent retry wrote some of these external ids first;
+            # re-check against the committed rows and try once more
+            db.session.rollback()
+            inserted = self._insert_chunk(rows)
+
+        self.inserted += len(inserted)
+
+    def report(self) -> Dict:
+        return {
+            'received': self.received,
+            'inserted': self.inserted,
+            'duplicates': len(self.duplicates),
+            'duplicate_external_ids': self.duplicates[:MAX_REPORTED_ERRORS],
+            'failed': self.failed,
+            'errors': self.errors
+        }
+
+
+def chunk_size_arg(request) -> int:
+    """`?chunk_size=` from the query string, capped at BULK_MAX_RECORDS"""
+    return min(request.args.get('chunk_size', BULK_CHUNK_SIZE, type=int) or BULK_CHUNK_SIZE, BULK_MAX_RECORDS)
+
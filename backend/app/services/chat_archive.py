@@ -0,0 +1,314 @@
+"""
+Chat Archive - Moves old chat messages into compressed per-user monthly batches
+"""
+import json
+import os
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import delete, func, select, tuple_, update
+from app import db
+from app.models import ChatArchive, ChatMessage
+from app.services.fieldsets import json_value
+
+try:
+    import zstandard
+except ImportError:  # Optional; zlib is always available
+    zstandard = None
+
+CHAT_ARCHIVE_AFTER_DAYS = int(os.getenv('CHAT_ARCHIVE_AFTER_DAYS', 90))
+# How often the background archiver runs (0 = only via `flask archive-chat`)
+CHAT_ARCHIVE_INTERVAL_HOURS = float(os.getenv('CHAT_ARCHIVE_INTERVAL_HOURS', 0))
+CHAT_ARCHIVE_CODEC = os.getenv('CHAT_ARCHIVE_CODEC') or ('zstd' if zstandard else 'zlib')
+
+# Rows per DELETE ... WHERE id IN (...)
+DELETE_CHUNK_SIZE = 500
+
+# Columns rewritten when new messages are merged into an existing batch
+BATCH_COLUMNS = ('message_count', 'first_created_at', 'last_created_at', 'first_message_id', 'last_message_id',
+                 'codec', 'payload', 'raw_bytes', 'compressed_bytes', 'archived_at')
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError('zstd archives need the zstandard package')
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return zlib.compress(data, 9)
+
+
+def decompress(payload: bytes, codec: str) -> bytes:
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError('zstd archives need the zstandard package')
+        return zstandard.ZstdDecompressor().decompress(payload)
+    return zlib.decompress(payload)
+
+
+def _period(created_at: datetime) -> str:
+    return created_at.strftime('%Y-%m')
+
+
+def _build_batch(user_id: int, rows: List[Dict], codec: str) -> ChatArchive:
+    """One ChatArchive row from messages of a single month, oldest first"""
+    raw = json.dumps([{key: json_value(value) for key, value in row.items()} for row in rows],
+                     separators=(',', ':')).encode()
+    payload = compress(raw, codec)
+
+    return ChatArchive(
+        user_id=user_id,
+        period=_period(rows[0]['created_at']),
+        message_count=len(rows),
+        first_created_at=rows[0]['created_at'],
+        last_created_at=rows[-1]['created_at'],
+        first_message_id=rows[0]['id'],
+        last_message_id=rows[-1]['id'],
+        codec=codec,
+        payload=payload,
+        raw_bytes=len(raw),
+        compressed_bytes=len(payload),
+        archived_at=datetime.utcnow()
+    )
+
+
+def _merge_batch(existing: List[ChatArchive], rows: List[Dict], codec: str) -> ChatArchive:
+    """One batch holding the messages of a month's existing batches plus `rows`"""
+    archived = [{**row, 'created_at': datetime.fromisoformat(row['created_at'])}
+                for archive in existing for row in _rows(archive)]
+    merged = sorted(archived + rows, key=lambda row: (row['created_at'], row['id']))
+    return _build_batch(existing[0].user_id, merged, codec)
+
+
+def _unchanged(archive: ChatArchive):
+    """WHERE clause matching a batch only as it was read"""
+    return (ChatArchive.id == archive.id, ChatArchive.message_count == archive.message_count,
+            ChatArchive.last_message_id == archive.last_message_id)
+
+
+def _replace_batches(existing: List[ChatArchive], batch: ChatArchive) -> bool:
+    """
+    Write `batch` over the first of a month's batches and delete the others
+
+    Returns False if another process changed any of them since they were read.
+    """
+    values = {column: getattr(batch, column) for column in BATCH_COLUMNS}
+    result = db.session.execute(
+        update(ChatArchive).where(*_unchanged(existing[0])).values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        return False
+
+    for archive in existing[1:]:
+        result = db.session.execute(
+            delete(ChatArchive).where(*_unchanged(archive)).execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            return False
+    return True
+
+
+def archive_user(user_id: int, cutoff: datetime, codec: str = CHAT_ARCHIVE_CODEC) -> Dict:
+    """
+    Archive one user's messages created before `cutoff` in a single transaction
+
+    Messages are streamed oldest first and cut into one batch per month. As
+    the cutoff moves, a month is often archived over several runs; its new
+    messages are then merged into the batch already stored for it, so each
+    user-month stays one batch. If another process archived some of the same
+    messages first, or changed a batch being merged into, the whole
+    transaction is rolled back.
+    """
+    columns = list(ChatMessage.__table__.columns)
+    keys = [column.key for column in columns]
+    statement = (
+        select(*columns)
+        .where(ChatMessage.user_id == user_id, ChatMessage.created_at < cutoff)
+        .order_by(ChatMessage.created_at, ChatMessage.id)
+        .execution_options(yield_per=1000)
+    )
+
+    batches = []  # new batches
+    merges = []  # (batches already stored for the month, their replacement)
+    message_ids = []
+    month = []
+
+    def close_month():
+        existing = ChatArchive.query.filter_by(
+            user_id=user_id, period=_period(month[0]['created_at'])
+        ).order_by(ChatArchive.id).all()
+        if existing:
+            merges.append((existing, _merge_batch(existing, month, codec)))
+        else:
+            batches.append(_build_batch(user_id, month, codec))
+
+    for values in db.session.execute(statement):
+        row = dict(zip(keys, values))
+        if month and _period(row['created_at']) != _period(month[0]['created_at']):
+            close_month()
+            month = []
+        month.append(row)
+        message_ids.append(row['id'])
+
+    if month:
+        close_month()
+
+    written = batches + [batch for _, batch in merges]
+    stats = {
+        'messages': len(message_ids),
+        'batches': len(written),
+        'merged': len(merges),
+        'raw_bytes': sum(b.raw_bytes for b in written),
+        'compressed_bytes': sum(b.compressed_bytes for b in written),
+        'skipped': False
+    }
+    if not written:
+        return stats
+
+    skipped = {**stats, 'messages': 0, 'batches': 0, 'merged': 0, 'raw_bytes': 0, 'compressed_bytes': 0,
+               'skipped': True}
+
+    db.session.add_all(batches)
+    for existing, batch in merges:
+        if not _replace_batches(existing, batch):
+            db.session.rollback()
+            return skipped
+
+    deleted = 0
+    for start in range(0, len(message_ids), DELETE_CHUNK_SIZE):
+        chunk = message_ids[start:start + DELETE_CHUNK_SIZE]
+        result = db.session.execute(
+            delete(ChatMessage).where(ChatMessage.id.in_(chunk)).execution_options(synchronize_session=False)
+        )
+        deleted += result.rowcount
+
+    if deleted != len(message_ids):
+        db.session.rollback()
+        return skipped
+
+    db.session.commit()
+    return stats
+
+
+def archive_old_messages(older_than_days: Optional[int] = None, user_id: Optional[int] = None,
+                         codec: Optional[str] = None) -> Dict:
+    """
+    Move messages older than `older_than_days` into the archive
+
+    Returns:
+        Report with message/batch counts and the raw vs compressed size of
+        the batches written (merged batches count in full)
+    """
+    days = CHAT_ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    codec = codec or CHAT_ARCHIVE_CODEC
+
+    if user_id is not None:
+        user_ids = [user_id]
+    else:
+        user_ids = [row[0] for row in db.session.query(ChatMessage.user_id)
+                    .filter(ChatMessage.created_at < cutoff).distinct()]
+
+    report = {'cutoff': cutoff.isoformat(), 'codec': codec, 'users': 0, 'skipped_users': 0,
+              'messages': 0, 'batches': 0, 'merged': 0, 'raw_bytes': 0, 'compressed_bytes': 0}
+
+    for uid in user_ids:
+        stats = archive_user(uid, cutoff, codec)
+        if stats['skipped']:
+            report['skipped_users'] += 1
+            continue
+        if stats['messages']:
+            report['users'] += 1
+        for key in ('messages', 'batches', 'merged', 'raw_bytes', 'compressed_bytes'):
+            report[key] += stats[key]
+
+    report['bytes_saved'] = report['raw_bytes'] - report['compressed_bytes']
+    report['compression_ratio'] = (
+        round(report['raw_bytes'] / report['compressed_bytes'], 2) if report['compressed_bytes'] else 0
+    )
+    return report
+
+
+def _rows(archive: ChatArchive) -> List[Dict]:
+    """Messages of a batch, oldest first"""
+    return json.loads(decompress(archive.payload, archive.codec))
+
+
+def archived_page(user_id: int, before: Optional[Tuple[datetime, int]], limit: int,
+                  skip: int = 0) -> Tuple[List[Dict], bool]:
+    """
+    Archived messages older than `before`, newest first
+
+    Args:
+        user_id: Owner of the messages
+        before: (created_at, id) of the last message already returned, or None
+        limit: Maximum messages to return (0 just checks whether any exist)
+        skip: Messages to pass over first (legacy offset paging)
+
+    Returns:
+        (messages, has_more)
+    """
+    query = ChatArchive.query.filter_by(user_id=user_id)
+    if before is not None:
+        query = query.filter(tuple_(ChatArchive.first_created_at, ChatArchive.first_message_id) < tuple_(*before))
+    query = query.order_by(ChatArchive.last_created_at.desc(), ChatArchive.last_message_id.desc())
+
+    messages = []
+    for archive in query.yield_per(4):
+        if before is None and skip >= archive.message_count:
+            # Skipped whole, without decompressing it
+            skip -= archive.message_count
+            continue
+        for row in reversed(_rows(archive)):
+            if before is not None and (datetime.fromisoformat(row['created_at']), row['id']) >= before:
+                continue
+            if skip:
+                skip -= 1
+                continue
+            if len(messages) == limit:
+                return messages, True
+            messages.append(row)
+
+    return messages, False
+
+
+def iter_archived_messages(user_id: int) -> Iterator[Dict]:
+    """Every archived message of a user, oldest first"""
+    query = ChatArchive.query.filter_by(user_id=user_id).order_by(
+        ChatArchive.first_created_at, ChatArchive.first_message_id
+    )
+    for archive in query.yield_per(4):
+        yield from _rows(archive)
+
+
+def archived_count(user_id: int) -> int:
+    return db.session.query(func.coalesce(func.sum(ChatArchive.message_count), 0)).filter(
+        ChatArchive.user_id == user_id
+    ).scalar()
+
+
+def start_archiver(app, interval_hours: float = CHAT_ARCHIVE_INTERVAL_HOURS) -> Optional[threading.Thread]:
+    """Run archive_old_messages every `interval_hours` on a daemon thread"""
+    if interval_hours <= 0:
+        return None
+
+    def run():
+        while True:
+            time.sleep(interval_hours * 3600)
+            with app.app_context():
+                try:
+                    report = archive_old_messages()
+                    if report['messages']:
+                        print(f"🗄️ Archived {report['messages']} chat messages "
+                              f"({report['raw_bytes']} -> {report['compressed_bytes']} bytes)")
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"⚠️ Chat archiving failed: {e}")
+                finally:
+                    db.session.remove()
+
+    thread = threading.Thread(target=run, name='chat-archiver', daemon=True)
+    thread.start()
+    return thread
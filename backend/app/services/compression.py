@@ -0,0 +1,260 @@
+"""
+Response Compression - gzip/brotli negotiation, incremental streaming and a compressed-body cache
+"""
+import hashlib
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, Optional
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # Optional; gzip is always available
+    brotli = None
+
+COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true'
+# Smaller bodies are sent as-is; headers and CPU outweigh the saving
+COMPRESSION_MIN_BYTES = int(os.getenv('COMPRESSION_MIN_BYTES', 500))
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4))
+# Compressed bodies kept for identical responses (0 disables the cache)
+COMPRESSION_CACHE_MB = float(os.getenv('COMPRESSION_CACHE_MB', 16))
+
+COMPRESSIBLE_TYPES = {
+    'application/json',
+    'application/x-ndjson',
+    'text/csv',
+    'text/event-stream',
+    'text/html',
+    'text/plain',
+}
+
+
+def available_encodings():
+    """Encodings this process can produce, most preferred first"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def choose_encoding(accept_encodings) -> Optional[str]:
+    """The best encoding the client accepts (highest q; brotli wins ties)"""
+    best, best_quality = None, 0
+    for encoding in available_encodings():
+        quality = accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class _Compressor:
+    """Incremental compressor with a flush after every chunk"""
+
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._brotli = brotli.Compressor(quality=level)
+        else:
+            # wbits 31: gzip container rather than a raw zlib stream
+            self._zlib = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool = False) -> bytes:
+        if self.encoding == 'br':
+            out = self._brotli.process(data)
+            return out + (self._brotli.finish() if final else self._brotli.flush())
+        out = self._zlib.compress(data)
+        return out + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressedBodyCache:
+    """LRU of compressed bodies keyed by encoding, level and body digest, bounded in bytes"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._size, 'hits': self.hits, 'misses': self.misses}
+
+
+class CompressionMetrics:
+    """Bytes in/out and compression CPU time per encoding"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._encodings = {}
+        self.skipped = {'too_small': 0, 'not_accepted': 0, 'not_compressible': 0}
+
+    def _entry(self, encoding: str) -> Dict:
+        return self._encodings.setdefault(encoding, {
+            'responses': 0, 'streamed': 0, 'bytes_in': 0, 'bytes_out': 0, 'cpu_seconds': 0.0
+        })
+
+    def response(self, encoding: str, streamed: bool = False):
+        with self._lock:
+            entry = self._entry(encoding)
+            entry['responses'] += 1
+            if streamed:
+                entry['streamed'] += 1
+
+    def record(self, encoding: str, bytes_in: int, bytes_out: int, cpu_seconds: float):
+        with self._lock:
+            entry = self._entry(encoding)
+            entry['bytes_in'] += bytes_in
+            entry['bytes_out'] += bytes_out
+            entry['cpu_seconds'] += cpu_seconds
+
+    def skip(self, reason: str):
+        with self._lock:
+            self.skipped[reason] += 1
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            encodings = {}
+            for name, entry in self._encodings.items():
+                saved = entry['bytes_in'] - entry['bytes_out']
+                encodings[name] = {
+                    'responses': entry['responses'],
+                    'streamed': entry['streamed'],
+                    'bytes_in': entry['bytes_in'],
+                    'bytes_out': entry['bytes_out'],
+                    'bytes_saved': saved,
+                    'ratio': round(entry['bytes_in'] / entry['bytes_out'], 2) if entry['bytes_out'] else 0,
+                    'cpu_ms': round(entry['cpu_seconds'] * 1000, 2),
+                    # CPU spent per MB of input, to weigh the level against latency
+                    'cpu_ms_per_mb': round(entry['cpu_seconds'] * 1000 / (entry['bytes_in'] / 1e6), 2)
+                    if entry['bytes_in'] else 0
+                }
+            return {
+                'encodings': encodings,
+                'skipped': dict(self.skipped),
+                'cache': body_cache.get_stats(),
+                'settings': {
+                    'available': list(available_encodings()),
+                    'min_bytes': COMPRESSION_MIN_BYTES,
+                    'gzip_level': COMPRESSION_GZIP_LEVEL,
+                    'brotli_quality': COMPRESSION_BROTLI_QUALITY
+                }
+            }
+
+
+# Global instances
+body_cache = CompressedBodyCache(max_bytes=int(COMPRESSION_CACHE_MB * 1024 * 1024))
+compression_metrics = CompressionMetrics()
+
+
+def _level(encoding: str) -> int:
+    return COMPRESSION_BROTLI_QUALITY if encoding == 'br' else COMPRESSION_GZIP_LEVEL
+
+
+def compress_body(data: bytes, encoding: str) -> bytes:
+    """Compress a whole response body, reusing an earlier result for identical bodies"""
+    level = _level(encoding)
+    key = (encoding, level, hashlib.blake2b(data, digest_size=16).digest())
+    if body_cache.max_bytes:
+        cached = body_cache.get(key)
+        if cached is not None:
+            compression_metrics.record(encoding, len(data), len(cached), 0.0)
+            return cached
+
+    started = time.thread_time()
+    body = _Compressor(encoding, level).compress(data, final=True)
+    compression_metrics.record(encoding, len(data), len(body), time.thread_time() - started)
+
+    if body_cache.max_bytes:
+        body_cache.put(key, body)
+    return body
+
+
+def compress_stream(chunks: Iterable, encoding: str) -> Iterator[bytes]:
+    """
+    Compress a streamed body chunk by chunk
+
+    Each chunk is flushed as soon as it is compressed, so server-sent events
+    and export batches still reach the client as they are produced. Closing
+    the returned generator closes `chunks` (e.g. stream_with_context).
+    """
+    compressor = _Compressor(encoding, _level(encoding))
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            if not chunk:
+                continue
+            started = time.thread_time()
+            out = compressor.compress(chunk)
+            compression_metrics.record(encoding, len(chunk), len(out), time.thread_time() - started)
+            yield out
+        yield compressor.compress(b'', final=True)
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+def compress_response(response):
+    """after_request hook: compress the response if the client and content allow it"""
+    if (response.direct_passthrough or 'Content-Encoding' in response.headers
+            or not 200 <= response.status_code < 300 or response.status_code in (204, 206)
+            or request.method == 'HEAD' or response.cache_control.no_transform):
+        return response
+
+    if response.mimetype not in COMPRESSIBLE_TYPES:
+        compression_metrics.skip('not_compressible')
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        compression_metrics.skip('not_accepted')
+        return response
+
+    if response.is_streamed:
+        # No size is known up front, so streams skip the threshold
+        response.response = compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+        compression_metrics.response(encoding, streamed=True)
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESSION_MIN_BYTES:
+            compression_metrics.skip('too_small')
+            return response
+        response.set_data(compress_body(data, encoding))
+        compression_metrics.response(encoding)
+
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_compression(app):
+    """Register the compression hook on the app (unless COMPRESSION_ENABLED is off)"""
+    if app.config.get('COMPRESSION_ENABLED', COMPRESSION_ENABLED):
+        app.after_request(compress_response)
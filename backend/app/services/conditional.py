@@ -0,0 +1,118 @@
+"""
+Conditional GET - ETag / Last-Modified validators that answer 304 before any rows are loaded
+"""
+import functools
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional, Tuple
+from flask import make_response, request
+from flask_jwt_extended import current_user, get_jwt_identity
+from sqlalchemy import func
+from app import db
+from app.models import ProgressLog, UserWorkoutStats, Workout
+from app.services.user_cache import ensure_current
+
+# (parts the ETag is derived from, last modification time or None), or None
+# when the resource has no validator yet
+Validator = Optional[Tuple[tuple, Optional[datetime]]]
+
+
+def _latest(*times: Optional[datetime]) -> Optional[datetime]:
+    times = [t for t in times if t is not None]
+    return max(times) if times else None
+
+
+def profile_validator() -> Validator:
+    """
+    The profile only changes with its user row
+
+    current_user may be a snapshot cached before another worker's write, so
+    its updated_at is checked against the row first (and the user reloaded
+    if it moved); the view then renders the same fresh user.
+    """
+    user = ensure_current(current_user._get_current_object())
+    return (user.id, user.updated_at, user.last_active), _latest(user.updated_at, user.last_active)
+
+
+def workouts_validator() -> Validator:
+    """
+    Row count and newest updated_at of the user's workouts
+
+    The summary row's updated_at is included as well: every delete goes
+    through it, and a delete would otherwise leave the newest updated_at
+    unchanged (and the listing's `total` comes from it).
+    """
+    user_id = get_jwt_identity()
+    count, latest = db.session.query(func.count(Workout.id), func.max(Workout.updated_at)).filter(
+        Workout.user_id == user_id
+    ).one()
+    summary = db.session.query(UserWorkoutStats.updated_at).filter(UserWorkoutStats.user_id == user_id).scalar()
+    return (user_id, count, latest, summary), _latest(latest, summary)
+
+
+def workout_stats_validator() -> Validator:
+    """The summary row changes with every write that affects the stats"""
+    user_id = get_jwt_identity()
+    summary = db.session.query(UserWorkoutStats.updated_at).filter(UserWorkoutStats.user_id == user_id).scalar()
+    if summary is None:
+        # Not built yet; get_user_stats() will build it
+        return None
+    return (user_id, summary), summary
+
+
+def progress_validator() -> Validator:
+    """Row count and newest updated_at of the user's progress logs"""
+    user_id = get_jwt_identity()
+    count, latest = db.session.query(func.count(ProgressLog.id), func.max(ProgressLog.updated_at)).filter(
+        ProgressLog.user_id == user_id
+    ).one()
+    return (user_id, count, latest), latest
+
+
+def _http_seconds(moment: datetime) -> datetime:
+    """A naive UTC timestamp at the one-second resolution of HTTP dates"""
+    return moment.replace(microsecond=0, tzinfo=timezone.utc)
+
+
+def conditional(validator: Callable[[], Validator]):
+    """
+    Answer If-None-Match / If-Modified-Since with 304 when nothing changed
+
+    The validator runs before the view and should only read cheap aggregates.
+    The ETag also covers the full request path, so each page, cursor and
+    `?fields=` selection gets its own tag. If-Modified-Since is only used when
+    the request has no If-None-Match. Last-Modified is left out while the
+    resource is less than a second old, as a second write within the same
+    second would not move it.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            validators = validator()
+            if validators is None:
+                return view(*args, **kwargs)
+
+            parts, last_modified = validators
+            etag = hashlib.sha1(repr((parts, request.full_path)).encode()).hexdigest()[:32]
+            if last_modified is not None:
+                last_modified = _http_seconds(last_modified)
+                if datetime.now(timezone.utc) < last_modified + timedelta(seconds=1):
+                    last_modified = None
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                since = request.if_modified_since
+                not_modified = since is not None and last_modified is not None and last_modified <= since
+
+            response = make_response(('', 304) if not_modified else view(*args, **kwargs))
+            if response.status_code in (200, 304):
+                response.set_etag(etag, weak=True)
+                if last_modified is not None:
+                    response.last_modified = last_modified
+                # Per-user data: browsers may keep it but must revalidate
+                response.cache_control.private = True
+                response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,135 @@
+"""
+Database Tuning - Engine options, SQLite pragmas and the read-only bind
+"""
+import functools
+import os
+from contextlib import contextmanager
+from typing import Dict, Iterable
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.sql import Select
+
+# Bind key of the optional read-only engine (DATABASE_READ_URL)
+READ_BIND = 'readonly'
+
+# 'tuned' applies the settings below; 'default' leaves SQLAlchemy's defaults
+PROFILES = ('tuned', 'default')
+
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+    # Negative values are KiB: 20 MB of page cache per connection
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE_KB', 20000)) * -1,
+    'temp_store': 'MEMORY',
+}
+
+
+def is_sqlite(url) -> bool:
+    return make_url(url).get_backend_name() == 'sqlite'
+
+
+def engine_options(url: str, profile: str = 'tuned') -> Dict:
+    """SQLALCHEMY_ENGINE_OPTIONS for a database URL"""
+    if profile != 'tuned':
+        return {}
+
+    if is_sqlite(url):
+        # Pragmas are applied per connection (see install_sqlite_pragmas); the
+        # driver-level timeout covers the window before busy_timeout is set
+        return {'connect_args': {'timeout': SQLITE_PRAGMAS['busy_timeout'] / 1000}}
+
+    return {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': True,
+    }
+
+
+def configure_database(app):
+    """Fill in engine options and the read bind before db.init_app()"""
+    profile = app.config.setdefault('DB_PROFILE', os.getenv('DB_PROFILE', 'tuned'))
+    if profile not in PROFILES:
+        raise ValueError(f"DB_PROFILE must be one of: {', '.join(PROFILES)}")
+
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS',
+                          engine_options(app.config['SQLALCHEMY_DATABASE_URI'], profile))
+
+    read_url = app.config.setdefault('DATABASE_READ_URL', os.getenv('DATABASE_READ_URL'))
+    if read_url:
+        binds = app.config.setdefault('SQLALCHEMY_BINDS', {})
+        binds.setdefault(READ_BIND, {'url': read_url, **engine_options(read_url, profile)})
+
+
+def _set_sqlite_pragmas(dbapi_connection, _connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            try:
+                cursor.execute(f'PRAGMA {name}={value}')
+            except Exception:
+                # e.g. journal_mode on a read-only connection; keep going
+                pass
+    finally:
+        cursor.close()
+
+
+def install_sqlite_pragmas(engines: Iterable, profile: str = 'tuned'):
+    """Apply SQLITE_PRAGMAS to every new connection of the SQLite engines"""
+    if profile != 'tuned':
+        return
+
+    for engine in engines:
+        if engine.dialect.name == 'sqlite' and not event.contains(engine, 'connect', _set_sqlite_pragmas):
+            event.listen(engine, 'connect', _set_sqlite_pragmas)
+
+
+def use_read_bind(view):
+    """
+    Let a GET view's SELECTs run on the read-only bind
+
+    Writes made while handling the request (flushes, UPDATE/INSERT
+    statements) still go to the primary. A replica may lag slightly behind,
+    so only use this on views that can tolerate that.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        g.use_read_bind = True
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def primary_bind():
+    """
+    Run the SELECTs inside the block on the primary, even in a read-bind view
+
+    For reads whose results are written back (e.g. rebuilding a summary row):
+    computed from a lagging replica, the written row would stay wrong.
+    """
+    if not has_app_context() or not g.get('use_read_bind'):
+        yield
+        return
+
+    g.use_read_bind = False
+    try:
+        yield
+    finally:
+        g.use_read_bind = True
+
+
+class RoutingSession(Session):
+    """db.session that sends reads to the read-only bind when a view asks for it"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and not self._flushing and isinstance(clause, Select)
+                and has_app_context() and g.get('use_read_bind')):
+            engine = self._db.engines.get(READ_BIND)
+            if engine is not None:
+                return engine
+
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
@@ -0,0 +1,124 @@
+"""
+Export Service - Streams a user's full history as NDJSON or CSV
+"""
+import csv
+import io
+import json
+import os
+from typing import Dict, Iterator, List, Sequence
+from sqlalchemy import select
+from app import db
+from app.models import ChatMessage, ProgressLog, Workout
+from app.services.chat_archive import iter_archived_messages
+from app.services.fieldsets import json_value
+
+# Rows fetched per round trip; a server-side cursor is used where the driver has one
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+
+# record_type -> model, in export order
+EXPORT_RESOURCES = {
+    'workout': Workout,
+    'chat_message': ChatMessage,
+    'progress_log': ProgressLog,
+}
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def parse_resources(value: str) -> List[str]:
+    """`?resources=workout,progress_log` -> validated record types (all by default)"""
+    if not value:
+        return list(EXPORT_RESOURCES)
+
+    resources = [r.strip() for r in value.split(',') if r.strip()]
+    unknown = [r for r in resources if r not in EXPORT_RESOURCES]
+    if unknown:
+        raise ValueError(f"Unknown resources: {', '.join(unknown)} "
+                         f"(expected {', '.join(EXPORT_RESOURCES)})")
+    return resources
+
+
+def iter_rows(model, user_id: int, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[Dict]:
+    """
+    Yield one user's rows of a model as plain dicts, oldest first
+
+    Selects columns rather than ORM entities so nothing accumulates in the
+    session's identity map, and uses yield_per so only one batch of rows is
+    held in memory at a time.
+    """
+    columns = list(model.__table__.columns)
+    statement = (
+        select(*columns)
+        .where(model.user_id == user_id)
+        .order_by(model.id)
+        .execution_options(yield_per=batch_size)
+    )
+
+    keys = [column.key for column in columns]
+    for row in db.session.execute(statement):
+        yield {key: json_value(value) for key, value in zip(keys, row)}
+
+
+def resource_rows(record_type: str, user_id: int, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[Dict]:
+    """Rows of one record type; archived chat messages come before the hot table"""
+    if record_type == 'chat_message':
+        yield from iter_archived_messages(user_id)
+    yield from iter_rows(EXPORT_RESOURCES[record_type], user_id, batch_size)
+
+
+def _batched(lines: Iterator[str], batch_size: int) -> Iterator[str]:
+    """Join lines into larger chunks so each write to the socket is worthwhile"""
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= batch_size:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def _ndjson_lines(user_id: int, resources: Sequence[str], batch_size: int) -> Iterator[str]:
+    for record_type in resources:
+        for row in resource_rows(record_type, user_id, batch_size):
+            yield json.dumps({'record_type': record_type, **row}, default=str) + '\n'
+
+
+def csv_columns(resources: Sequence[str]) -> List[str]:
+    """Union of the exported models' columns, after a leading record_type"""
+    columns = ['record_type']
+    for record_type in resources:
+        for column in EXPORT_RESOURCES[record_type].__table__.columns:
+            if column.key not in columns:
+                columns.append(column.key)
+    return columns
+
+
+def _csv_lines(user_id: int, resources: Sequence[str], batch_size: int) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=csv_columns(resources))
+
+    def take():
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    writer.writeheader()
+    yield take()
+
+    for record_type in resources:
+        for row in resource_rows(record_type, user_id, batch_size):
+            writer.writerow({'record_type': record_type, **row})
+            yield take()
+
+
+def export_stream(user_id: int, fmt: str = 'ndjson', resources: Sequence[str] = None,
+                  batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[str]:
+    """Generate the export body chunk by chunk"""
+    resources = resources or list(EXPORT_RESOURCES)
+    lines = _csv_lines if fmt == 'csv' else _ndjson_lines
+    return _batched(lines(user_id, resources, batch_size), batch_size)
@@ -0,0 +1,147 @@
+"""
+Sparse Fieldsets - `?fields=` column selection for the listing endpoints
+"""
+import os
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional, Sequence
+from flask import request
+from sqlalchemy import String, case, func
+from sqlalchemy.orm import load_only, with_expression
+from app.models import ChatMessage, ProgressLog, Workout
+
+# Characters kept in chat previews before the ellipsis
+PREVIEW_LENGTH = int(os.getenv('CHAT_PREVIEW_LENGTH', 120))
+
+
+class InvalidFields(ValueError):
+    """Raised when `?fields=` names a field the endpoint does not have"""
+
+
+def json_value(value):
+    """A column value as to_dict() would return it"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def preview(column, length: int = PREVIEW_LENGTH):
+    """SQL expression for the first `length` characters of a text column"""
+    return case(
+        (func.length(column) > length, func.substr(column, 1, length, type_=String) + '…'),
+        else_=column
+    )
+
+
+def truncate(text: Optional[str], length: int = PREVIEW_LENGTH) -> Optional[str]:
+    """Python counterpart of preview() for rows that are not in the database"""
+    if text is None or len(text) <= length:
+        return text
+    return text[:length] + '…'
+
+
+class FieldSet:
+    """
+    The fields a listing endpoint can return, and how to load only some of them
+
+    Plain fields are the model's columns and are loaded with load_only().
+    Computed fields (such as truncated previews) are query_expression()
+    attributes on the model, filled in with with_expression() only when asked
+    for, so the database does the truncating and the full text never leaves it.
+    Rows that only exist as dicts (archived chat messages) are computed with
+    the matching `computed` function instead.
+    """
+
+    def __init__(self, model, presets: Optional[Dict[str, Sequence[str]]] = None,
+                 expressions: Optional[Dict[str, Callable]] = None,
+                 computed: Optional[Dict[str, Callable]] = None):
+        self.model = model
+        self.presets = presets or {}
+        self.expressions = expressions or {}
+        self.computed = computed or {}
+        self.columns = [column.key for column in model.__table__.columns]
+
+    def parse(self, value: Optional[str] = None) -> Optional[List[str]]:
+        """
+        Read `?fields=` as a preset name or comma-separated field names
+
+        Returns None when every field was requested. `id` is always included.
+        """
+        if value is None:
+            value = request.args.get('fields', '')
+        value = value.strip()
+
+        if not value:
+            return None
+        if value in self.presets:
+            return list(self.presets[value])
+
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in names if name not in self.columns and name not in self.expressions]
+        if unknown:
+            available = self.columns + list(self.expressions) + list(self.presets)
+            raise InvalidFields(f"Unknown fields: {', '.join(unknown)} (available: {', '.join(available)})")
+
+        fields = ['id']
+        for name in names:
+            if name not in fields:
+                fields.append(name)
+        return fields
+
+    def apply(self, query, fields: Optional[List[str]], required: Sequence = ()):
+        """
+        Restrict a query to the columns behind `fields`
+
+        Args:
+            query: Query over self.model
+            fields: Result of parse() (None leaves the query unchanged)
+            required: Extra column attributes to load, e.g. the cursor's sort column
+        """
+        if fields is None:
+            return query
+
+        columns = [getattr(self.model, name) for name in fields if name not in self.expressions]
+        columns += [column for column in required if column.key not in fields]
+        options = [load_only(*columns)]
+
+        for name in fields:
+            if name in self.expressions:
+                options.append(with_expression(getattr(self.model, name), self.expressions[name]()))
+
+        return query.options(*options)
+
+    def serialize(self, obj, fields: Optional[List[str]]) -> Dict:
+        """to_dict(), limited to `fields`"""
+        if fields is None:
+            return obj.to_dict()
+        return {name: json_value(getattr(obj, name)) for name in fields}
+
+    def serialize_dict(self, row: Dict, fields: Optional[List[str]]) -> Dict:
+        """Like serialize(), for a row already in to_dict() form"""
+        if fields is None:
+            return row
+        return {
+            name: self.computed[name](row) if name in self.computed else row.get(name)
+            for name in fields
+        }
+
+
+WORKOUT_FIELDS = FieldSet(Workout)
+
+PROGRESS_FIELDS = FieldSet(ProgressLog)
+
+CHAT_FIELDS = FieldSet(
+    ChatMessage,
+    presets={
+        # History sidebar: no full message/response text
+        'summary': ('id', 'created_at', 'intent_detected', 'emotion_detected',
+                    'message_preview', 'response_preview'),
+    },
+    expressions={
+        'message_preview': lambda: preview(ChatMessage.message),
+        'response_preview': lambda: preview(ChatMessage.response),
+    },
+    computed={
+        'message_preview': lambda row: truncate(row.get('message')),
+        'response_preview': lambda row: truncate(row.get('response')),
+    }
+)
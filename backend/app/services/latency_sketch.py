@@ -0,0 +1,142 @@
+"""
+Latency Sketch - Rolling p50/p95/p99 per AI brain from a mergeable quantile sketch
+"""
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, Optional
+
+# Quantile estimates are within this relative error of the true value
+SKETCH_RELATIVE_ACCURACY = 0.01
+# Latencies are reported over this trailing window, kept as SLOTS sub-sketches
+LATENCY_WINDOW_SECONDS = float(os.getenv('AI_LATENCY_WINDOW_SECONDS', 900))
+LATENCY_WINDOW_SLOTS = int(os.getenv('AI_LATENCY_WINDOW_SLOTS', 15))
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class QuantileSketch:
+    """
+    Log-bucketed quantile sketch (DDSketch)
+
+    Each value lands in bucket ceil(log_gamma(value)), so every bucket spans
+    a fixed relative range and any quantile is estimated within
+    `relative_accuracy` using memory that grows only with the log of the
+    value range. Sketches with the same accuracy merge by adding counts.
+    """
+
+    def __init__(self, relative_accuracy: float = SKETCH_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.zero_count = 0  # values too small to bucket (0 ms)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float):
+        if value > 1e-9:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[index] = self.buckets.get(index, 0) + 1
+        else:
+            self.zero_count += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def merge(self, other: 'QuantileSketch'):
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                # Midpoint of the bucket in relative terms
+                return min(2 * self.gamma ** index / (self.gamma + 1), self.max)
+        return self.max
+
+
+class RollingQuantiles:
+    """Quantile sketch over a trailing time window, one sub-sketch per slot"""
+
+    def __init__(self, window_seconds: float = LATENCY_WINDOW_SECONDS, slots: int = LATENCY_WINDOW_SLOTS):
+        self.slot_seconds = window_seconds / slots
+        self._slots = deque(maxlen=slots)  # (slot number, sketch)
+
+    def add(self, value: float, now: Optional[float] = None):
+        slot = int((now if now is not None else time.time()) // self.slot_seconds)
+        if not self._slots or self._slots[-1][0] != slot:
+            self._slots.append((slot, QuantileSketch()))
+        self._slots[-1][1].add(value)
+
+    def snapshot(self, now: Optional[float] = None) -> QuantileSketch:
+        """All slots still inside the window, merged"""
+        oldest = int((now if now is not None else time.time()) // self.slot_seconds) - self._slots.maxlen + 1
+        merged = QuantileSketch()
+        for slot, sketch in self._slots:
+            if slot >= oldest:
+                merged.merge(sketch)
+        return merged
+
+
+def summarize(sketch: QuantileSketch, quantiles: Iterable[float] = QUANTILES) -> Dict:
+    def rounded(value):
+        return round(value, 2) if value is not None else None
+
+    summary = {'count': sketch.count}
+    for q in quantiles:
+        summary[f'p{round(q * 100)}'] = rounded(sketch.quantile(q))
+    summary['avg'] = rounded(sketch.total / sketch.count) if sketch.count else None
+    summary['max'] = rounded(sketch.max) if sketch.count else None
+    return summary
+
+
+class BrainLatencyTracker:
+    """Rolling latency percentiles per brain, plus the whole turn ('total')"""
+
+    def __init__(self, window_seconds: float = LATENCY_WINDOW_SECONDS, slots: int = LATENCY_WINDOW_SLOTS):
+        self.window_seconds = window_seconds
+        self.slots = slots
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def _add(self, name: str, value: float, now: float):
+        series = self._series.get(name)
+        if series is None:
+            series = self._series[name] = RollingQuantiles(self.window_seconds, self.slots)
+        series.add(value, now)
+
+    def record(self, brain_times_ms: Dict[str, float], total_ms: Optional[float] = None):
+        """Add one chat turn's per-brain times (and its total) to the sketches"""
+        now = time.time()
+        with self._lock:
+            for name, elapsed in brain_times_ms.items():
+                if elapsed is not None:
+                    self._add(name, float(elapsed), now)
+            if total_ms is not None:
+                self._add('total', float(total_ms), now)
+
+    def get_stats(self) -> Dict:
+        now = time.time()
+        with self._lock:
+            brains = {name: summarize(series.snapshot(now)) for name, series in self._series.items()}
+        return {
+            'window_seconds': self.window_seconds,
+            'relative_accuracy': SKETCH_RELATIVE_ACCURACY,
+            'total': brains.pop('total', summarize(QuantileSketch())),
+            'brains': brains
+        }
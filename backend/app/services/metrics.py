@@ -0,0 +1,253 @@
+"""
+Metrics Service - Per-route latency and SQL query histograms in Prometheus text format
+"""
+import hmac
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable, List, Sequence, Tuple
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+# Requests issuing more queries than this are logged as likely N+1 patterns
+METRICS_QUERY_WARN_THRESHOLD = int(os.getenv('METRICS_QUERY_WARN_THRESHOLD', 25))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple = (), amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def expose(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_labels(self.labelnames, labels)} {_number(value)}')
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [per-bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: Tuple = ()):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def expose(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + ('+Inf',), series[:-1]):
+                    cumulative += count
+                    le = 'le="{}"'.format(bound if bound == '+Inf' else _number(bound))
+                    lines.append(f'{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}')
+                lines.append(f'{self.name}_sum{_labels(self.labelnames, labels)} {_number(series[-1])}')
+                lines.append(f'{self.name}_count{_labels(self.labelnames, labels)} {cumulative}')
+        return lines
+
+
+class Registry:
+    """Metrics exported at /metrics, plus collectors for counters kept elsewhere"""
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors: List[Callable[[], Iterable[str]]] = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def expose(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.expose())
+        for collector in self.collectors:
+            try:
+                lines.extend(collector())
+            except Exception as e:
+                lines.append(f'# collector failed: {_escape(e)}')
+        return '\n'.join(lines) + '\n'
+
+
+# Global instances
+registry = Registry()
+
+ROUTE_LABELS = ('blueprint', 'endpoint', 'method')
+
+request_latency = registry.register(Histogram(
+    'http_request_duration_seconds', 'Time from request start until the response body has been sent',
+    ROUTE_LABELS
+))
+requests_total = registry.register(Counter(
+    'http_requests_total', 'Requests handled', ROUTE_LABELS + ('status',)
+))
+request_queries = registry.register(Histogram(
+    'db_queries_per_request', 'SQL statements executed while handling a request',
+    ROUTE_LABELS, buckets=QUERY_COUNT_BUCKETS
+))
+request_db_time = registry.register(Histogram(
+    'db_time_per_request_seconds', 'Time spent in SQL statements while handling a request',
+    ROUTE_LABELS
+))
+query_warnings = registry.register(Counter(
+    'db_query_threshold_exceeded_total', 'Requests that executed more than METRICS_QUERY_WARN_THRESHOLD statements',
+    ROUTE_LABELS
+))
+
+
+def _before_cursor_execute(conn, _cursor, _statement, _parameters, _context, _executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, _cursor, _statement, _parameters, _context, _executemany):
+    started = conn.info['query_started'].pop()
+    if has_request_context() and 'metrics_started' in g:
+        g.db_queries += 1
+        g.db_seconds += time.perf_counter() - started
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute; drop its start
+    # time so the stack does not grow on the pooled connection
+    if context.connection is not None:
+        started = context.connection.info.get('query_started')
+        if started:
+            started.pop()
+
+
+def instrument_engines(engines: Iterable):
+    """Count statements and their time on these engines against the current request"""
+    for engine in engines:
+        if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+            event.listen(engine, 'handle_error', _handle_error)
+
+
+def _start_request():
+    g.metrics_started = time.perf_counter()
+    g.db_queries = 0
+    g.db_seconds = 0.0
+
+
+def _record(state, labels: Tuple, status_code: int, path: str):
+    """Observe one finished request from its per-request counters"""
+    started = state.pop('metrics_started', None)
+    if started is None:
+        return
+
+    request_latency.observe(time.perf_counter() - started, labels)
+    requests_total.inc(labels + (str(status_code),))
+    request_queries.observe(state.db_queries, labels)
+    request_db_time.observe(state.db_seconds, labels)
+
+    if state.db_queries > METRICS_QUERY_WARN_THRESHOLD:
+        query_warnings.inc(labels)
+        print(f"⚠️ {labels[2]} {path} ({labels[1]}) ran {state.db_queries} queries "
+              f"in {state.db_seconds * 1000:.1f} ms - possible N+1")
+
+
+def _finish_request(response):
+    if 'metrics_started' not in g:
+        return response
+
+    # Unmatched URLs share one label so scanners cannot blow up the series count
+    labels = (request.blueprint or 'app', request.endpoint or 'unmatched', request.method)
+    state, path = g._get_current_object(), request.path
+
+    if response.is_streamed:
+        # The body (chat stream, export) is generated after this hook, still
+        # counting into the same `g` (stream_with_context); record once the
+        # server closes the response, when the request context is gone
+        response.call_on_close(lambda: _record(state, labels, response.status_code, path))
+    else:
+        _record(state, labels, response.status_code, path)
+    return response
+
+
+def compression_lines() -> List[str]:
+    """Response compression counters (services/compression.py) as Prometheus counters"""
+    from app.services.compression import compression_metrics
+
+    encodings = compression_metrics.get_stats()['encodings']
+    lines = []
+    for name, field, documentation in (
+        ('http_compression_bytes_in_total', 'bytes_in', 'Response bytes before compression'),
+        ('http_compression_bytes_out_total', 'bytes_out', 'Response bytes after compression'),
+        ('http_compression_cpu_seconds_total', 'cpu_ms', 'CPU time spent compressing responses'),
+    ):
+        lines += [f'# HELP {name} {documentation}', f'# TYPE {name} counter']
+        for encoding, stats in sorted(encodings.items()):
+            value = stats[field] / 1000 if field == 'cpu_ms' else stats[field]
+            lines.append(f'{name}{_labels(("encoding",), (encoding,))} {_number(value)}')
+    return lines
+
+
+def metrics_view():
+    """Prometheus text for this worker; `Authorization: Bearer <METRICS_TOKEN>` when a token is set"""
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        supplied = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(supplied.encode(), f'Bearer {token}'.encode()):
+            return Response('Unauthorized\n', status=401, content_type=CONTENT_TYPE,
+                            headers={'WWW-Authenticate': 'Bearer'})
+    return Response(registry.expose(), content_type=CONTENT_TYPE)
+
+
+def init_metrics(app, engines: Iterable):
+    """Register the request hooks, SQL listeners and /metrics (unless METRICS_ENABLED is off)"""
+    if not app.config.get('METRICS_ENABLED', METRICS_ENABLED):
+        return
+
+    instrument_engines(engines)
+    if compression_lines not in registry.collectors:
+        registry.collectors.append(compression_lines)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
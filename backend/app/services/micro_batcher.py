@@ -0,0 +1,275 @@
+"""
+Micro-Batcher - Coalesces concurrent single-row model predictions into batches
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, TimeoutError as FutureTimeout
+from typing import Callable, Dict, List, Optional
+
+
+class QueueFull(Exception):
+    """Raised when the batcher has no room for another request"""
+
+
+class BatchTimeout(Exception):
+    """Raised when a submitted item's batch did not finish within the timeout"""
+
+
+class MicroBatcher:
+    """
+    Collects items submitted from many threads and processes them together
+
+    A background thread flushes the pending items as one call to `batch_fn`
+    when `max_batch_size` items are waiting or the oldest item has waited
+    `max_wait_ms`, whichever comes first. Each caller blocks only until its
+    own result is ready, and at most `timeout_ms`.
+    """
+
+    def __init__(self, batch_fn: Callable[[List], List], max_batch_size: int = 32,
+                 max_wait_ms: float = 5.0, max_queue: int = 1024, timeout_ms: float = 1000.0,
+                 name: str = 'batcher'):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_queue = max_queue
+        self.timeout_ms = timeout_ms
+        self.name = name
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'submitted': 0,
+            'rejected': 0,
+            'timeouts': 0,
+            'batches': 0,
+            'rows': 0,
+            'max_batch_seen': 0,
+            'failed_batches': 0,
+            'total_wait_ms': 0.0,
+            'max_queue_depth': 0,
+        }
+
+    def _ensure_started(self):
+        # Started lazily so a pre-forked parent never owns the flush thread
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def submit(self, item, timeout: Optional[float] = None):
+        """
+        Queue one item and wait for its result
+
+        Raises BatchTimeout after `timeout` seconds (default: timeout_ms), so
+        a stuck flush cannot hold the caller's thread forever.
+        """
+        self._ensure_started()
+        future = Future()
+
+        try:
+            self._queue.put_nowait((item, future, time.perf_counter()))
+        except queue.Full:
+            with self._stats_lock:
+                self._stats['rejected'] += 1
+            raise QueueFull(f'{self.name} queue is full ({self.max_queue})')
+
+        with self._stats_lock:
+            self._stats['submitted'] += 1
+            self._stats['max_queue_depth'] = max(self._stats['max_queue_depth'], self._queue.qsize())
+
+        try:
+            return future.result(self.timeout_ms / 1000 if timeout is None else timeout)
+        except FutureTimeout:
+            # Dropped from its batch if that has not started yet
+            future.cancel()
+            with self._stats_lock:
+                self._stats['timeouts'] += 1
+            raise BatchTimeout(f'{self.name} result not ready after {self.timeout_ms:.0f}ms')
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.max_wait_ms / 1000
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._flush(batch)
+
+    @staticmethod
+    def _resolve(future: Future, result=None, error: Optional[Exception] = None):
+        # The caller may have timed out and cancelled it meanwhile
+        try:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        except InvalidStateError:
+            pass
+
+    def _flush(self, batch: List):
+        batch = [entry for entry in batch if not entry[1].cancelled()]
+        if not batch:
+            return
+
+        flushed_at = time.perf_counter()
+        waited_ms = sum((flushed_at - queued_at) * 1000 for _, _, queued_at in batch)
+
+        try:
+            results = self.batch_fn([item for item, _, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f'{self.name} returned {len(results)} results for {len(batch)} items')
+            for (_, future, _), result in zip(batch, results):
+                self._resolve(future, result)
+            failed = 0
+        except Exception as e:
+            for _, future, _ in batch:
+                self._resolve(future, error=e)
+            failed = 1
+
+        with self._stats_lock:
+            self._stats['batches'] += 1
+            self._stats['rows'] += len(batch)
+            self._stats['max_batch_seen'] = max(self._stats['max_batch_seen'], len(batch))
+            self._stats['failed_batches'] += failed
+            self._stats['total_wait_ms'] += waited_ms
+
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        batches = stats['batches']
+        rows = stats['rows']
+        total_wait_ms = stats.pop('total_wait_ms')
+        stats.update({
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait_ms,
+            'max_queue': self.max_queue,
+            'timeout_ms': self.timeout_ms,
+            'queue_depth': self._queue.qsize(),
+            'avg_batch_size': round(rows / batches, 2) if batches else 0,
+            'avg_wait_ms': round(total_wait_ms / rows, 3) if rows else 0
+        })
+        return stats
+
+
+def _stack(rows: List):
+    """Combine single-row inputs into one batch (pandas or numpy)"""
+    first = rows[0]
+    if hasattr(first, 'iloc'):
+        import pandas as pd
+        return pd.concat(rows, ignore_index=True)
+
+    import numpy as np
+    return np.vstack([np.asarray(row).reshape(1, -1) for row in rows])
+
+
+def _is_single_row(X) -> bool:
+    shape = getattr(X, 'shape', None)
+    return shape is not None and (len(shape) == 1 or (len(shape) == 2 and shape[0] == 1))
+
+
+class BatchedModel:
+    """
+    Drop-in proxy for an XGBoost model that batches single-row predictions
+
+    `predict` and `predict_proba` calls with one row are routed through a
+    MicroBatcher; anything else (multi-row input, extra keyword arguments,
+    DMatrix) goes straight to the model, as do rows that find the queue full
+    or whose batch has not finished after `timeout_ms`.
+    """
+
+    def __init__(self, model, max_batch_size: int = 32, max_wait_ms: float = 5.0, max_queue: int = 1024,
+                 timeout_ms: float = 1000.0):
+        self._model = model
+        # Integration attribute holding the model, set by install_batching
+        self.attribute = None
+        self._batchers = {
+            method: MicroBatcher(
+                self._batch_fn(method),
+                max_batch_size=max_batch_size,
+                max_wait_ms=max_wait_ms,
+                max_queue=max_queue,
+                timeout_ms=timeout_ms,
+                name=f'ml-{method}'
+            )
+            for method in ('predict', 'predict_proba')
+            if hasattr(model, method)
+        }
+
+    def _batch_fn(self, method: str):
+        def run(rows):
+            output = getattr(self._model, method)(_stack(rows))
+            return [output[i:i + 1] for i in range(len(rows))]
+        return run
+
+    def _call(self, method: str, X, **kwargs):
+        if kwargs or not _is_single_row(X):
+            return getattr(self._model, method)(X, **kwargs)
+        try:
+            return self._batchers[method].submit(X)
+        except (QueueFull, BatchTimeout):
+            return getattr(self._model, method)(X)
+
+    def predict(self, X, **kwargs):
+        return self._call('predict', X, **kwargs)
+
+    def predict_proba(self, X, **kwargs):
+        return self._call('predict_proba', X, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._model, name)
+
+    def get_stats(self) -> Dict:
+        return {
+            'enabled': True,
+            'attribute': self.attribute,
+            **{method: batcher.get_stats() for method, batcher in self._batchers.items()}
+        }
+
+
+def model_attributes(integration) -> List[str]:
+    """Instance attributes of an ML integration that hold a model with `predict`"""
+    return sorted(
+        name for name, value in vars(integration).items()
+        if isinstance(value, BatchedModel) or callable(getattr(value, 'predict', None))
+    )
+
+
+def install_batching(integration, attribute: Optional[str] = None, **options) -> BatchedModel:
+    """
+    Wrap the model held by an ML integration in a BatchedModel
+
+    `attribute` names the integration attribute holding the model. Without
+    it, the integration must hold exactly one object with a `predict`
+    method. Raises ValueError, naming the candidates, if there is no such
+    model or the choice is ambiguous, so batching is never silently off.
+    """
+    candidates = model_attributes(integration)
+    owner = type(integration).__name__
+
+    if attribute is None:
+        if len(candidates) != 1:
+            found = ', '.join(candidates) or 'none'
+            raise ValueError(f'{owner} holds {len(candidates)} models with predict() ({found}); '
+                             f'set AI_BATCH_MODEL_ATTRIBUTE')
+        attribute = candidates[0]
+    elif attribute not in candidates:
+        raise ValueError(f'{owner}.{attribute} is not a model with predict() '
+                         f'(models found: {", ".join(candidates) or "none"})')
+
+    model = getattr(integration, attribute)
+    if not isinstance(model, BatchedModel):
+        model = BatchedModel(model, **options)
+        setattr(integration, attribute, model)
+    model.attribute = attribute
+    return model
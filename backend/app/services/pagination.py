@@ -0,0 +1,91 @@
+"""
+Pagination Helpers - Opaque keyset cursors for the listing endpoints
+"""
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+from flask import request
+from sqlalchemy import tuple_
+
+TRUTHY = ('1', 'true', 'yes')
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor we did not issue"""
+
+
+def encode_cursor(sort_value: datetime, row_id: int) -> str:
+    """Encode the (timestamp, id) of the last row on a page"""
+    payload = json.dumps([sort_value.isoformat(), row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor('Invalid cursor') from e
+
+
+def page_args(default_limit: int) -> dict:
+    """
+    Read the pagination query parameters shared by all listing endpoints
+
+    `cursor` is the preferred way to page. `offset` is still accepted so older
+    clients keep working, and `include_total=1` opts into the total count.
+    """
+    return {
+        'limit': request.args.get('limit', default_limit, type=int),
+        'cursor': request.args.get('cursor') or None,
+        'offset': request.args.get('offset', type=int),
+        'include_total': request.args.get('include_total', '').lower() in TRUTHY,
+    }
+
+
+def paginate(query, sort_column, id_column, limit: int,
+             cursor: Optional[str] = None, offset: Optional[int] = None) -> Tuple[List, Optional[str]]:
+    """
+    Fetch one page of rows, newest first
+
+    Rows are ordered by (sort_column, id_column) descending so the composite
+    per-user indexes serve both the filter and the sort. A cursor resumes
+    strictly after the last row of the previous page, which keeps deep pages
+    as cheap as the first one; offset paging is kept for older clients.
+
+    Args:
+        query: Query already filtered to the current user
+        sort_column: Timestamp column to order by (created_at / logged_at)
+        id_column: Primary key column used as a tie-breaker
+        limit: Page size
+        cursor: Cursor from a previous page's `next_cursor`
+        offset: Legacy row offset (ignored when a cursor is given)
+
+    Returns:
+        (rows, next_cursor) where next_cursor is None on the last page
+    """
+    query = query.order_by(sort_column.desc(), id_column.desc())
+
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(sort_column, id_column) < tuple_(sort_value, row_id))
+    elif offset:
+        query = query.offset(offset)
+
+    # Fetch one extra row to find out whether another page exists
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            getattr(last, sort_column.key),
+            getattr(last, id_column.key)
+        )
+
+    return rows, next_cursor
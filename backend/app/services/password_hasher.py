@@ -0,0 +1,159 @@
+"""
+Password Hasher - Configurable password hashing on a dedicated process pool
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# Werkzeug method strings ('scrypt:32768:8:1', 'pbkdf2:sha256:600000') or
+# 'bcrypt:<rounds>'
+DEFAULT_METHOD = 'scrypt:32768:8:1'
+
+
+class HasherBusy(Exception):
+    """Raised when too many hashing jobs are already queued"""
+
+
+def _is_bcrypt(stored_hash: str) -> bool:
+    return stored_hash.startswith(('$2a$', '$2b$', '$2y$'))
+
+
+def _hash(password: str, method: str) -> str:
+    """Hash a password (runs inside a pool process)"""
+    if method.startswith('bcrypt'):
+        import bcrypt
+        rounds = int(method.split(':')[1]) if ':' in method else 12
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=rounds)).decode()
+    return generate_password_hash(password, method=method)
+
+
+def _verify(stored_hash: str, password: str) -> bool:
+    """Check a password against a stored hash (runs inside a pool process)"""
+    if _is_bcrypt(stored_hash):
+        import bcrypt
+        return bcrypt.checkpw(password.encode(), stored_hash.encode())
+    return check_password_hash(stored_hash, password)
+
+
+def _pool_context():
+    """
+    Start method for pool processes
+
+    Pool processes are never forked straight from a web worker: fork() copies
+    a threaded process along with any lock another thread holds at that moment,
+    which can deadlock the child. A fork server is a clean single-threaded
+    process; it preloads only this module (not the entry point, which builds
+    the whole app). Without one, processes are spawned. _hash and _verify are
+    module-level, so jobs pickle by reference either way.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+def hash_method_of(stored_hash: str) -> Optional[str]:
+    """The method string a stored hash was created with"""
+    if not stored_hash:
+        return None
+    if _is_bcrypt(stored_hash):
+        return f"bcrypt:{int(stored_hash.split('$')[2])}"
+    return stored_hash.split('$', 1)[0]
+
+
+class PasswordHasher:
+    """
+    Hashes and verifies passwords off the request thread
+
+    Work runs on a ProcessPoolExecutor so a burst of logins uses every core
+    instead of contending for the GIL inside the web workers. The pool is
+    created on first use, so a pre-forking server master never owns it, and
+    its processes come from a fork server (see _pool_context).
+    At most `max_pending` jobs may be queued; beyond that HasherBusy is raised
+    so the caller can shed load instead of piling up requests.
+    """
+
+    def __init__(self, method: str = DEFAULT_METHOD, workers: int = 0,
+                 max_pending: Optional[int] = None, timeout: float = 30.0):
+        self.method = method
+        self.workers = workers
+        self.timeout = timeout
+        self.max_pending = max_pending or max(workers, 1) * 8
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._pool_pid = None
+        self._canonical_method = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # Recreate the pool in a forked child; the parent's pool is not usable there
+        if self._pool is None or self._pool_pid != os.getpid():
+            with self._pool_lock:
+                if self._pool is None or self._pool_pid != os.getpid():
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=_pool_context())
+                    self._pool_pid = os.getpid()
+        return self._pool
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy('Password hashing queue is full')
+        try:
+            return self._get_pool().submit(fn, *args).result(timeout=self.timeout)
+        finally:
+            self._slots.release()
+
+    def hash(self, password: str) -> str:
+        return self._run(_hash, password, self.method)
+
+    def verify(self, stored_hash: str, password: str) -> bool:
+        if not stored_hash:
+            return False
+        return self._run(_verify, stored_hash, password)
+
+    @property
+    def canonical_method(self) -> str:
+        """Configured method with defaults filled in ('pbkdf2' -> 'pbkdf2:sha256:600000')"""
+        if self._canonical_method is None:
+            self._canonical_method = hash_method_of(_hash('', self.method))
+        return self._canonical_method
+
+    def needs_rehash(self, stored_hash: str) -> bool:
+        """True if a hash was created with different parameters than configured"""
+        return hash_method_of(stored_hash) != self.canonical_method
+
+    def shutdown(self):
+        if self._pool is not None and self._pool_pid == os.getpid():
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+
+
+def default_workers() -> int:
+    """
+    Pool size when PASSWORD_HASH_WORKERS is not set
+
+    Every web worker has its own pool, so the cores are shared out among the
+    GUNICORN_WORKERS of a server (at least one each) instead of each worker
+    starting one process per core. Without a fork server (Windows), spawned
+    children would re-run the entry point, so hashing stays inline there
+    unless explicitly configured.
+    """
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return 0
+    web_workers = max(int(os.getenv('GUNICORN_WORKERS') or 1), 1)
+    return max((os.cpu_count() or 1) // web_workers, 1)
+
+
+# Global instance
+password_hasher = PasswordHasher(
+    method=os.getenv('PASSWORD_HASH_METHOD', DEFAULT_METHOD),
+    workers=int(os.getenv('PASSWORD_HASH_WORKERS') or default_workers()),
+    max_pending=int(os.getenv('PASSWORD_HASH_MAX_PENDING') or 0) or None,
+    timeout=float(os.getenv('PASSWORD_HASH_TIMEOUT', 30))
+)
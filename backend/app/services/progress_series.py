@@ -0,0 +1,244 @@
+"""
+Progress Series Service - Bucketed progress-log rollups, moving averages and trends
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import func
+from app import db
+from app.models import ProgressLog
+
+BUCKETS = ('day', 'week', 'month')
+METRICS = ('weight', 'body_fat_percentage', 'muscle_mass', 'energy_level')
+
+# Moving-average window, in buckets, when the request does not set one
+DEFAULT_WINDOWS = {'day': 7, 'week': 4, 'month': 3}
+MAX_WINDOW = 365
+
+
+def parse_series_args(bucket: Optional[str], metrics: Optional[str], window: Optional[int]) -> Dict:
+    """Validate the query parameters of the series endpoint"""
+    bucket = (bucket or 'week').lower()
+    if bucket not in BUCKETS:
+        raise ValueError(f"bucket must be one of: {', '.join(BUCKETS)}")
+
+    names = [m.strip() for m in (metrics or 'weight').split(',') if m.strip()]
+    unknown = [m for m in names if m not in METRICS]
+    if unknown or not names:
+        raise ValueError(f"metrics must be a comma-separated subset of: {', '.join(METRICS)}")
+
+    window = DEFAULT_WINDOWS[bucket] if window is None else window
+    if not 1 <= window <= MAX_WINDOW:
+        raise ValueError(f'window must be between 1 and {MAX_WINDOW}')
+
+    return {'bucket': bucket, 'metrics': tuple(dict.fromkeys(names)), 'window': window}
+
+
+def bucket_expression(column, bucket: str, dialect: str):
+    """SQL expression giving the first day of the bucket a timestamp falls in, as YYYY-MM-DD"""
+    if dialect == 'sqlite':
+        if bucket == 'day':
+            return func.date(column)
+        if bucket == 'week':
+            # Next Sunday (or today), then back to that week's Monday
+            return func.date(column, 'weekday 0', '-6 days')
+        return func.strftime('%Y-%m-01', column)
+
+    if dialect == 'postgresql':
+        return func.to_char(func.date_trunc(bucket, column), 'YYYY-MM-DD')
+
+    if dialect in ('mysql', 'mariadb'):
+        if bucket == 'day':
+            return func.date(column)
+        if bucket == 'week':
+            return func.subdate(func.date(column), func.weekday(column))
+        return func.date_format(column, '%Y-%m-01')
+
+    raise ValueError(f'Progress series are not supported on {dialect}')
+
+
+def moving_average(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over `window` buckets, ignoring missing (NaN) buckets"""
+    valid = ~np.isnan(values)
+    sums = np.cumsum(np.where(valid, values, 0.0))
+    counts = np.cumsum(valid)
+
+    # Subtract the running totals from `window` buckets earlier
+    n = len(values)
+    window_sums = sums - np.concatenate((np.zeros(window), sums))[:n]
+    window_counts = counts - np.concatenate((np.zeros(window), counts))[:n]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(window_counts > 0, window_sums / window_counts, np.nan)
+
+
+def linear_trend(days: np.ndarray, values: np.ndarray) -> Optional[Dict]:
+    """Least-squares line through the non-missing points (x in days)"""
+    valid = ~np.isnan(values)
+    if valid.sum() < 2 or np.ptp(days[valid]) == 0:
+        return None
+
+    x, y = days[valid], values[valid]
+    slope, intercept = np.polyfit(x, y, 1)
+
+    residual = y - (slope * x + intercept)
+    total = y - y.mean()
+    total_ss = float(total @ total)
+    r_squared = 1 - float(residual @ residual) / total_ss if total_ss else 1.0
+
+    return {
+        'slope_per_day': round(float(slope), 5),
+        'slope_per_week': round(float(slope) * 7, 4),
+        'r_squared': round(r_squared, 4),
+        'points': int(valid.sum())
+    }
+
+
+def _bucket_range(first: np.datetime64, last: np.datetime64, bucket: str) -> np.ndarray:
+    """Every bucket start from first to last, so gaps show up as missing values"""
+    if bucket == 'month':
+        months = np.arange(first.astype('datetime64[M]'), last.astype('datetime64[M]') + 1)
+        return months.astype('datetime64[D]')
+    step = 7 if bucket == 'week' else 1
+    return np.arange(first, last + 1, step, dtype='datetime64[D]')
+
+
+def _to_list(values: np.ndarray, digits: int = 3) -> List:
+    return [None if np.isnan(v) else round(float(v), digits) for v in values]
+
+
+def compute_series(user_id: int, bucket: str, metrics: Sequence[str], window: int) -> Dict:
+    """
+    Roll a user's progress logs up into buckets and derive trends
+
+    Averages per bucket are computed by the database; the bucketed series is
+    then filled out to a regular axis and smoothed/fitted with NumPy.
+    """
+    dialect = db.session.get_bind().dialect.name
+    label = bucket_expression(ProgressLog.logged_at, bucket, dialect).label('bucket')
+
+    rows = (
+        db.session.query(label, func.count(ProgressLog.id),
+                         *[func.avg(getattr(ProgressLog, metric)) for metric in metrics])
+        .filter(ProgressLog.user_id == user_id, ProgressLog.logged_at.isnot(None))
+        .group_by(label)
+        .order_by(label)
+        .all()
+    )
+
+    result = {'bucket': bucket, 'window': window, 'buckets': [], 'counts': [], 'metrics': {}}
+    if not rows:
+        result['metrics'] = {metric: {'values': [], 'moving_average': [], 'trend': None} for metric in metrics}
+        return result
+
+    observed = np.array([str(row[0])[:10] for row in rows], dtype='datetime64[D]')
+    axis = _bucket_range(observed[0], observed[-1], bucket)
+    positions = np.searchsorted(axis, observed)
+
+    counts = np.zeros(len(axis), dtype=int)
+    counts[positions] = [row[1] for row in rows]
+    days = (axis - axis[0]).astype(float)
+
+    result['buckets'] = [str(day) for day in axis]
+    result['counts'] = counts.tolist()
+
+    for i, metric in enumerate(metrics):
+        values = np.full(len(axis), np.nan)
+        values[positions] = np.array([row[2 + i] for row in rows], dtype=float)
+
+        result['metrics'][metric] = {
+            'values': _to_list(values),
+            'moving_average': _to_list(moving_average(values, window)),
+            'trend': linear_trend(days, values)
+        }
+
+    return result
+
+
+class SeriesCache:
+    """
+    Per-user cache of computed results, tagged with a watermark of the user's rows
+
+    Each web worker has its own cache and invalidate() only reaches the worker
+    that handled the write, so entries also remember the watermark (row count,
+    newest updated_at) they were computed from. Lookups pass the current
+    watermark, read with one indexed aggregate query, and an entry computed
+    from other rows is a miss no matter which worker changed them.
+    """
+
+    def __init__(self, max_users: int = 1024):
+        self.max_users = max_users
+        self._entries = OrderedDict()  # user_id -> (watermark, {key: result})
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def get(self, user_id, key, watermark) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] != watermark:
+                # The rows changed since, possibly through another worker
+                del self._entries[user_id]
+                self.stale += 1
+                entry = None
+            series = entry[1].get(key) if entry is not None else None
+            if series is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return series
+
+    def put(self, user_id, key, series: Dict, watermark):
+        """Store a result computed from rows read after `watermark` was taken"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] != watermark:
+                entry = self._entries[user_id] = (watermark, {})
+            entry[1][key] = series
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        """Drop a user's entries right away in this worker (others see the new watermark)"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'users': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+# Global instance
+series_cache = SeriesCache(max_users=int(os.getenv('PROGRESS_SERIES_CACHE_USERS', 1024)))
+
+
+def progress_watermark(user_id: int) -> Tuple:
+    """Row count and newest updated_at of a user's progress logs (covering index)"""
+    return tuple(db.session.query(func.count(ProgressLog.id), func.max(ProgressLog.updated_at)).filter(
+        ProgressLog.user_id == user_id
+    ).one())
+
+
+def get_series(user_id: int, bucket: str, metrics: Sequence[str], window: int) -> Dict:
+    """compute_series(), served from the cache while the user's progress logs are unchanged"""
+    key = (bucket, tuple(metrics), window)
+    # Taken before computing: a write that lands meanwhile moves it, so the
+    # result is recomputed on the next request
+    watermark = progress_watermark(user_id)
+    series = series_cache.get(user_id, key, watermark)
+    if series is None:
+        series = compute_series(user_id, bucket, metrics, window)
+        series_cache.put(user_id, key, series, watermark)
+    return series
@@ -0,0 +1,165 @@
+"""
+Response Cache - LRU + TTL cache in front of the AI Coach pipeline
+"""
+import copy
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+# user_data fields that can change the coach's answer
+PROFILE_FIELDS = ('age', 'weight', 'height', 'gender', 'fitness_level', 'fitness_goal')
+
+# Intents whose answers must always come from the full pipeline
+SAFETY_INTENTS = {'injury', 'pain', 'medical', 'medical_concern', 'safety_concern', 'emergency'}
+
+# Messages that look safety-related skip the cache before the intent is known.
+# Body parts that are also training vocabulary (chest day, heart rate zones,
+# breathing cues) only count as part of a symptom phrase.
+SAFETY_PATTERN = re.compile(
+    r'\b(pain|hurt|hurts|injur\w*|dizzy|faint\w*|bleed\w*|'
+    r'emergency|sick|pregnan\w*|sprain\w*|broke|broken|palpitation\w*|'
+    r'chest\s+(feels?\s+)?(tight\w*|pressure|ache\w*)|tight(ness)?\s+in\s+(my\s+)?chest|'
+    r'heart\s+((is|keeps)\s+)?(attack|racing|pounding|condition\w*|problem\w*|issue\w*)|'
+    r'short(ness)?\s+of\s+breath|(can\'t|cannot|can\s+not|trouble|difficulty)\s+breath\w*)\b'
+)
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    text = re.sub(r"[^\w\s']", ' ', (message or '').lower())
+    return ' '.join(text.split())
+
+
+def profile_fingerprint(user_data: Optional[Dict]) -> str:
+    """Stable hash of the profile fields that influence a response"""
+    user_data = user_data or {}
+    features = {field: user_data.get(field) for field in PROFILE_FIELDS}
+    payload = json.dumps(features, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def is_safety_sensitive(message: str) -> bool:
+    """True if a message should never be answered from cache"""
+    return bool(SAFETY_PATTERN.search(normalize_message(message)))
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache with per-entry TTL
+
+    Keys are (normalized message, profile fingerprint), so users with the same
+    profile features share answers to near-identical messages.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 300.0, enabled: bool = True):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._entries = OrderedDict()  # key -> (expires_at, response)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.bypasses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(message: str, user_data: Optional[Dict]):
+        return normalize_message(message), profile_fingerprint(user_data)
+
+    def get(self, message: str, user_data: Optional[Dict]) -> Optional[Dict]:
+        """Return a copy of the cached response, or None"""
+        if not self.enabled:
+            return None
+
+        if is_safety_sensitive(message):
+            with self._lock:
+                self.bypasses += 1
+            return None
+
+        key = self.make_key(message, user_data)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, response = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(response)
+
+    def put(self, message: str, user_data: Optional[Dict], response: Dict) -> bool:
+        """Cache a response unless it is an error or safety-related"""
+        if not self.enabled or not self.is_cacheable(message, response):
+            return False
+
+        key = self.make_key(message, user_data)
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, copy.deepcopy(response))
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        return True
+
+    @staticmethod
+    def is_cacheable(message: str, response: Dict) -> bool:
+        if response.get('error') or is_safety_sensitive(message):
+            return False
+        if (response.get('intent_detected') or '').lower() in SAFETY_INTENTS:
+            return False
+        # A reply built without some brain (timed out or failed) is not reused
+        brain_status = (response.get('metadata') or {}).get('brain_status') or {}
+        if any(status != 'ok' for status in brain_status.values()):
+            return False
+        return response.get('safety_status', 'safe') == 'safe'
+
+    def invalidate_profile(self, user_data: Optional[Dict]) -> int:
+        """Drop every entry cached for a profile fingerprint"""
+        fingerprint = profile_fingerprint(user_data)
+
+        with self._lock:
+            stale = [key for key in self._entries if key[1] == fingerprint]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'bypasses': self.bypasses,
+                'invalidations': self.invalidations
+            }
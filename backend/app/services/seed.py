@@ -0,0 +1,344 @@
+"""
+Seed Service - Synthetic users, workouts, chat messages and progress logs at production volumes
+"""
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from typing import Callable, Dict, Iterator, List, Optional, Union
+import numpy as np
+from flask import current_app
+from sqlalchemy import create_engine, event, func, insert, select
+from app import db
+from app.models import ChatMessage, ProgressLog, User, Workout
+from app.services.database import engine_options, install_sqlite_pragmas
+
+# Rows per INSERT transaction
+SEED_CHUNK_SIZE = int(os.getenv('SEED_CHUNK_SIZE', 50000))
+# Users generated together from one random stream; a block is the unit of work
+# handed to a process, so the data does not depend on the number of processes
+SEED_BLOCK_USERS = 500
+# Workers queue for the SQLite write lock for up to this long
+SEED_BUSY_TIMEOUT_MS = 120000
+# Planned workouts are scheduled up to this many days ahead
+PLAN_AHEAD_DAYS = 7
+
+LEVELS = ('beginner', 'intermediate', 'advanced')
+GOALS = ('weight_loss', 'muscle_gain', 'general_fitness')
+GENDERS = ('female', 'male')
+WORKOUT_TYPES = ('chest', 'back', 'legs', 'shoulders', 'arms', 'cardio', 'core', 'full_body')
+INTENSITIES = ('low', 'medium', 'high')
+MOODS = ('great', 'good', 'okay', 'tired', 'sore')
+EMOTIONS = ('motivated', 'happy', 'neutral', 'tired', 'frustrated', 'anxious')
+INTENTS = ('workout_request', 'progress_check', 'motivation', 'nutrition', 'injury', 'general')
+
+USER_WORDS = (
+    'what should I do today my legs are sore can you plan a workout for this week I feel tired '
+    'how many sets reps is it ok to skip cardio lose weight build muscle knee hurts after running '
+    'I missed yesterday need motivation quick session at home no equipment gym protein sleep'
+).split()
+COACH_WORDS = (
+    'great job keep going start with a five minute warm up then three sets of ten reps rest sixty '
+    'seconds between sets focus on form breathe steadily your progress this week looks solid try '
+    'adding light cardio stretch afterwards listen to your body recovery matters hydrate well'
+).split()
+
+BRAINS_USED = '["NLP", "ML", "Logic", "Personality"]'
+
+
+def _rows(columns: Dict[str, Union[np.ndarray, Callable]], start: int, stop: int) -> List[Dict]:
+    """Dict rows for one chunk; a column is an array or a callable(start, stop) -> list"""
+    names = list(columns)
+    values = [column(start, stop) if callable(column) else column[start:stop].tolist()
+              for column in columns.values()]
+    return [dict(zip(names, row)) for row in zip(*values)]
+
+
+def _write(engine, model, columns: Dict, count: int, chunk_size: int) -> int:
+    for start in range(0, count, chunk_size):
+        rows = _rows(columns, start, min(start + chunk_size, count))
+        with engine.begin() as conn:
+            conn.execute(insert(model), rows)
+    return count
+
+
+def _timestamps(now: np.datetime64, days_ago: np.ndarray) -> np.ndarray:
+    """datetime64[us] values `days_ago` days before now (negative: in the future)"""
+    return now - (days_ago * 86400e6).astype('timedelta64[us]')
+
+
+def _nullable(values: np.ndarray, present: np.ndarray) -> np.ndarray:
+    return np.where(present, values.astype(object), None)
+
+
+def _pick(rng, probabilities: np.ndarray) -> np.ndarray:
+    """One index per row, each row drawing from its own probability vector"""
+    draws = rng.random(len(probabilities))[:, None]
+    return np.minimum((draws > probabilities.cumsum(axis=1)).sum(axis=1), probabilities.shape[1] - 1)
+
+
+def _text(rng, words, lengths: np.ndarray) -> Callable:
+    """Column of text slices of a random word stream, `lengths` characters each"""
+    corpus = ' '.join(rng.choice(words, 50000))
+    # Start at word boundaries that leave room for the longest text
+    boundaries = np.flatnonzero(np.frombuffer(corpus.encode(), dtype=np.uint8) == ord(' ')) + 1
+    starts = rng.choice(boundaries[boundaries < len(corpus) - int(lengths.max())], len(lengths))
+
+    def column(start, stop):
+        return [corpus[s:s + n].strip() or words[0] for s, n in zip(starts[start:stop], lengths[start:stop])]
+    return column
+
+
+def user_profiles(rng, count: int, days: int, workouts: int, messages: int, progress: int) -> Dict[str, np.ndarray]:
+    """
+    Per-user attributes and row counts
+
+    Training cadence (sessions per week), adherence and chattiness are drawn
+    per user, so some users train daily and most a few times a week. Totals
+    are split across users by multinomial draws weighted by cadence (or
+    chattiness) times account age, so they add up exactly.
+    """
+    level = rng.choice(len(LEVELS), count, p=[0.5, 0.35, 0.15])
+    goal = rng.choice(len(GOALS), count, p=[0.45, 0.25, 0.3])
+    gender = rng.choice(len(GENDERS), count)
+    height = np.where(gender == 1, rng.normal(178, 7, count), rng.normal(164, 6.5, count))
+    bmi = np.clip(rng.lognormal(math.log(25), 0.15, count), 17, 45)
+    tenure = rng.uniform(min(14, days), days, count)
+
+    cadence = np.clip(rng.gamma(2.0, 1.2, count) * np.array([0.8, 1.0, 1.3])[level], 0.2, 7)
+    chattiness = rng.lognormal(0, 1, count)
+    weigh_ins = rng.lognormal(0, 0.8, count)
+
+    def split(total, weights):
+        return rng.multinomial(total, weights / weights.sum()) if count else np.zeros(0, dtype=int)
+
+    return {
+        'level': level,
+        'goal': goal,
+        'gender': gender,
+        'age': np.clip(rng.normal(34, 10, count), 18, 75).astype(int),
+        'height': np.round(height, 1),
+        'weight': np.round(bmi * (height / 100) ** 2, 1),
+        'tenure': tenure,
+        'idle': np.minimum(rng.exponential(4, count), tenure),
+        'adherence': rng.beta(np.array([5, 7, 9])[level], 2),
+        'workouts': split(workouts, cadence * tenure),
+        'messages': split(messages, chattiness * tenure),
+        'progress': split(progress, weigh_ins * tenure),
+    }
+
+
+def _user_columns(profiles: Dict, now: np.datetime64, prefix: str, password_hash: str) -> Dict:
+    created = _timestamps(now, profiles['tenure'])
+    return {
+        'email': lambda a, b: [f'user{i}@{prefix}.example' for i in range(a, b)],
+        'username': lambda a, b: [f'{prefix}_user{i}' for i in range(a, b)],
+        'password_hash': lambda a, b: [password_hash] * (b - a),
+        'full_name': lambda a, b: [f'Seed User {i}' for i in range(a, b)],
+        'age': profiles['age'],
+        'weight': profiles['weight'],
+        'height': profiles['height'],
+        'gender': np.array(GENDERS)[profiles['gender']],
+        'fitness_level': np.array(LEVELS)[profiles['level']],
+        'fitness_goal': np.array(GOALS)[profiles['goal']],
+        'created_at': created,
+        'updated_at': created,
+        'last_active': _timestamps(now, profiles['idle']),
+    }
+
+
+def _workout_columns(rng, users: Dict, now: np.datetime64) -> Dict:
+    """Workouts spread over each user's history, with a week of plans ahead"""
+    owner = np.repeat(np.arange(len(users['id'])), users['workouts'])
+    total = len(owner)
+
+    # Whole days back plus a morning or evening training time
+    day = np.floor(rng.uniform(-PLAN_AHEAD_DAYS, users['tenure'][owner]))
+    hour = np.where(rng.random(total) < 0.4, rng.normal(7, 1, total), rng.normal(18.5, 1.5, total))
+    today = now.astype('datetime64[D]').astype('datetime64[us]')
+    scheduled = today - (day * 86400e6).astype('timedelta64[us]') + (np.clip(hour, 5, 22) * 3600e6).astype('timedelta64[us]')
+
+    past = scheduled <= now
+    completed = past & (rng.random(total) < users['adherence'][owner])
+    forgotten = past & ~completed & (rng.random(total) < 0.1)  # never marked either way
+    status = np.where(completed, 'completed', np.where(~past | forgotten, 'planned', 'skipped'))
+
+    level = users['level'][owner]
+    type_preference = rng.dirichlet(np.full(len(WORKOUT_TYPES), 0.8), len(users['id']))
+    intensity_mix = np.array([[0.5, 0.4, 0.1], [0.2, 0.55, 0.25], [0.1, 0.4, 0.5]])
+    intensity = _pick(rng, intensity_mix[level])
+    duration = np.clip(rng.lognormal(np.log(np.array([30, 45, 55])[level]), 0.3), 10, 180).astype(int)
+    calories = duration * np.array([5, 8, 11])[intensity] * users['weight'][owner] / 70 * rng.normal(1, 0.1, total)
+    recommended = rng.random(total) < 0.3
+
+    created = np.minimum(scheduled - (rng.uniform(0, 2, total) * 86400e6).astype('timedelta64[us]'), now)
+    finished = np.minimum(scheduled + (duration * 60e6).astype('timedelta64[us]'), now)
+    completed_at = np.where(completed, finished, np.datetime64('NaT', 'us'))
+    return {
+        'user_id': users['id'][owner],
+        'workout_type': np.array(WORKOUT_TYPES)[_pick(rng, type_preference[owner])],
+        'duration_minutes': duration,
+        'calories_burned': np.maximum(calories, 20).astype(int),
+        'intensity': np.array(INTENSITIES)[intensity],
+        'recommended_by_ai': recommended,
+        'ai_confidence': _nullable(np.round(rng.uniform(0.55, 0.98, total), 2), recommended),
+        'status': status,
+        'scheduled_for': scheduled,
+        'completed_at': completed_at,
+        'created_at': created,
+        'updated_at': np.where(completed, finished, created),
+    }
+
+
+def _progress_columns(rng, users: Dict, now: np.datetime64) -> Dict:
+    """Weigh-ins that trend towards the user's current weight according to their goal"""
+    count = len(users['id'])
+    owner = np.repeat(np.arange(count), users['progress'])
+    total = len(owner)
+    days_ago = rng.uniform(0, users['tenure'][owner])
+
+    # kg per day: losing, gaining or holding steady
+    slope_by_goal = np.stack([rng.normal(-0.02, 0.008, count), rng.normal(0.008, 0.004, count),
+                              rng.normal(0, 0.004, count)], axis=1)
+    slope = slope_by_goal[np.arange(count), users['goal']][owner]
+    weight = users['weight'][owner] - slope * days_ago + rng.normal(0, 0.35, total)
+    body_fat_now = np.where(users['gender'] == 1, rng.normal(22, 4, count), rng.normal(30, 5, count))[owner]
+    body_fat = np.clip(body_fat_now - slope * 0.3 * days_ago + rng.normal(0, 0.5, total), 5, 55)
+    has_muscle = rng.random(total) < 0.5
+
+    logged = _timestamps(now, days_ago)
+    return {
+        'user_id': users['id'][owner],
+        'weight': np.round(np.clip(weight, 35, 250), 1),
+        'body_fat_percentage': np.round(body_fat, 1),
+        'muscle_mass': _nullable(np.round(weight * (1 - body_fat / 100) * 0.52, 1), has_muscle),
+        'mood': rng.choice(MOODS, total, p=[0.15, 0.35, 0.3, 0.12, 0.08]),
+        'energy_level': np.clip(rng.normal(62, 15, total), 1, 100).astype(int),
+        'logged_at': logged,
+        'updated_at': logged,
+    }
+
+
+def _chat_columns(rng, users: Dict, now: np.datetime64) -> Dict:
+    """Short questions and longer answers, lengths drawn from log-normals"""
+    owner = np.repeat(np.arange(len(users['id'])), users['messages'])
+    total = len(owner)
+    message_lengths = np.clip(rng.lognormal(math.log(60), 0.6, total), 5, 600).astype(int)
+    response_lengths = np.clip(rng.lognormal(math.log(400), 0.45, total), 40, 2000).astype(int)
+
+    return {
+        'user_id': users['id'][owner],
+        'message': _text(rng, USER_WORDS, message_lengths) if total else message_lengths,
+        'response': _text(rng, COACH_WORDS, response_lengths) if total else response_lengths,
+        'emotion_detected': rng.choice(EMOTIONS, total, p=[0.25, 0.15, 0.3, 0.15, 0.1, 0.05]),
+        'intent_detected': rng.choice(INTENTS, total, p=[0.35, 0.2, 0.15, 0.1, 0.05, 0.15]),
+        'energy_level': np.clip(rng.normal(60, 18, total), 1, 100).astype(int),
+        'confidence_score': np.round(rng.uniform(0.5, 0.98, total), 2),
+        'brains_used': lambda a, b: [BRAINS_USED] * (b - a),
+        'processing_time_ms': np.round(rng.lognormal(math.log(150), 0.5, total), 1),
+        'created_at': _timestamps(now, rng.uniform(0, users['tenure'][owner])),
+    }
+
+
+def _engine(database_url: str, profile: str):
+    """An engine for a worker process, waiting longer than the app for the write lock"""
+    engine = create_engine(database_url, **engine_options(database_url, profile))
+    install_sqlite_pragmas([engine], profile)
+    if engine.dialect.name == 'sqlite':
+        @event.listens_for(engine, 'connect')
+        def _busy_timeout(dbapi_connection, _connection_record):
+            dbapi_connection.execute(f'PRAGMA busy_timeout={SEED_BUSY_TIMEOUT_MS}')
+    return engine
+
+
+def seed_block(engine, block: int, seed: int, users: Dict, now: np.datetime64, chunk_size: int) -> Dict:
+    """Generate and insert the workouts, chat messages and progress logs of one block of users"""
+    if isinstance(engine, tuple):
+        engine = _engine(*engine)
+
+    rng = np.random.default_rng([seed, block])
+    counts = {}
+    for name, model, build in (('workouts', Workout, _workout_columns),
+                               ('chat_messages', ChatMessage, _chat_columns),
+                               ('progress_logs', ProgressLog, _progress_columns)):
+        columns = build(rng, users, now)
+        counts[name] = _write(engine, model, columns, len(columns['user_id']), chunk_size)
+    return counts
+
+
+def _blocks(profiles: Dict, user_ids: np.ndarray) -> Iterator[Dict]:
+    for start in range(0, len(user_ids), SEED_BLOCK_USERS):
+        block = {name: values[start:start + SEED_BLOCK_USERS] for name, values in profiles.items()}
+        block['id'] = user_ids[start:start + SEED_BLOCK_USERS]
+        yield block
+
+
+def seed_database(users: int, workouts: int, messages: int, progress: int, seed: int = 42,
+                  days: int = 365, processes: int = 1, prefix: str = 'seed',
+                  password: str = 'password', chunk_size: Optional[int] = None) -> Dict:
+    """
+    Insert synthetic rows through Core bulk inserts
+
+    The same arguments always produce the same data (apart from the ids and
+    the reference time), whatever the number of processes. With processes > 1
+    the blocks of users are generated and written by a spawned process pool.
+    On SQLite the writes still take turns, but generation runs in parallel.
+
+    Returns:
+        Dict with the rows inserted per table, seconds taken and rows/minute
+    """
+    from app.services.password_hasher import password_hasher
+    from app.services.workout_stats import rebuild_user_stats
+
+    if min(users, workouts, messages, progress) < 0 or days < 1 or processes < 1:
+        raise ValueError('Counts must be >= 0, days and processes >= 1')
+    if users == 0 and workouts + messages + progress:
+        raise ValueError('Workouts, messages and progress logs need at least one user')
+    if db.session.query(User.id).filter(User.email.like(f'%@{prefix}.example')).first():
+        raise ValueError(f"Users with prefix '{prefix}' already exist; pick another --prefix")
+    db.session.commit()
+
+    chunk_size = chunk_size or SEED_CHUNK_SIZE
+    started = time.perf_counter()
+    now = np.datetime64(datetime.utcnow(), 'us')
+    rng = np.random.default_rng(seed)
+
+    profiles = user_profiles(rng, users, days, workouts, messages, progress)
+    # One shared hash so seeded users can log in without paying for thousands of hashes
+    columns = _user_columns(profiles, now, prefix, password_hasher.hash(password))
+    first_id = (db.session.query(func.max(User.id)).scalar() or 0) + 1
+    db.session.commit()
+    _write(db.engine, User, columns, users, chunk_size)
+    user_ids = np.array(db.session.execute(
+        select(User.id).where(User.id >= first_id, User.email.like(f'%@{prefix}.example')).order_by(User.id)
+    ).scalars().all())
+    db.session.commit()
+
+    counts = {'users': users, 'workouts': 0, 'chat_messages': 0, 'progress_logs': 0}
+    blocks = list(_blocks(profiles, user_ids))
+    if processes == 1 or len(blocks) == 1:
+        results = [seed_block(db.engine, i, seed, block, now, chunk_size) for i, block in enumerate(blocks)]
+    else:
+        target = (db.engine.url.render_as_string(hide_password=False), current_app.config['DB_PROFILE'])
+        with ProcessPoolExecutor(max_workers=processes, mp_context=get_context('spawn')) as pool:
+            futures = [pool.submit(seed_block, target, i, seed, block, now, chunk_size)
+                       for i, block in enumerate(blocks)]
+            results = [future.result() for future in futures]
+
+    for result in results:
+        for name, count in result.items():
+            counts[name] += count
+
+    rebuild_user_stats()
+    db.session.commit()
+
+    seconds = time.perf_counter() - started
+    return {
+        **counts,
+        'seconds': round(seconds, 2),
+        'rows_per_minute': int(sum(counts.values()) / seconds * 60) if seconds else 0,
+        'processes': processes,
+        'seed': seed,
+    }
@@ -0,0 +1,68 @@
+"""
+Streaming Helpers - Server-Sent Events formatting and stream metrics
+"""
+import json
+import threading
+from collections import deque
+from typing import Dict
+
+
+def sse_event(event: str, data: Dict) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class StreamMetrics:
+    """Rolling timing metrics for streamed chat responses"""
+
+    def __init__(self, window: int = 500):
+        self._lock = threading.Lock()
+        self._ttfb = deque(maxlen=window)
+        self._first_token = deque(maxlen=window)
+        self._total = deque(maxlen=window)
+        self.streams_started = 0
+        self.streams_completed = 0
+        self.streams_failed = 0
+
+    def started(self):
+        with self._lock:
+            self.streams_started += 1
+
+    def record(self, ttfb_ms: float, first_token_ms: float, total_ms: float):
+        """Record a completed stream"""
+        with self._lock:
+            self.streams_completed += 1
+            self._ttfb.append(ttfb_ms)
+            if first_token_ms is not None:
+                self._first_token.append(first_token_ms)
+            self._total.append(total_ms)
+
+    def failed(self):
+        with self._lock:
+            self.streams_failed += 1
+
+    @staticmethod
+    def _summary(samples) -> Dict:
+        if not samples:
+            return {'avg': 0, 'p50': 0, 'p95': 0}
+        ordered = sorted(samples)
+        return {
+            'avg': round(sum(ordered) / len(ordered), 2),
+            'p50': round(ordered[int(0.50 * (len(ordered) - 1))], 2),
+            'p95': round(ordered[int(0.95 * (len(ordered) - 1))], 2)
+        }
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'streams_started': self.streams_started,
+                'streams_completed': self.streams_completed,
+                'streams_failed': self.streams_failed,
+                'time_to_first_byte_ms': self._summary(self._ttfb),
+                'time_to_first_token_ms': self._summary(self._first_token),
+                'total_time_ms': self._summary(self._total)
+            }
+
+
+# Global instance
+stream_metrics = StreamMetrics()
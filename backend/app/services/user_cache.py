@@ -0,0 +1,164 @@
+"""
+User Cache - Resolves the JWT-identified User once per request, backed by a
+short-TTL in-process cache of profile snapshots
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from flask import jsonify
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached
+from app import db, jwt
+from app.models import User
+from app.services.activity import activity_buffer
+
+
+class UserCache:
+    """Thread-safe LRU of user column snapshots with a TTL"""
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 60.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # user_id -> (expires_at, snapshot)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, user_id) -> Optional[Dict]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, user_id, snapshot: Dict):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl_seconds, snapshot)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'lookups': lookups,
+                'db_lookups': self.misses,
+                'db_lookups_saved': self.hits,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'invalidations': self.invalidations
+            }
+
+
+# Global instance
+user_cache = UserCache(
+    max_size=int(os.getenv('USER_CACHE_SIZE', 1024)),
+    ttl_seconds=float(os.getenv('USER_CACHE_TTL_SECONDS', 60))
+)
+
+
+def snapshot_user(user: User) -> Dict:
+    """Column values of a user, enough to rebuild it without a query"""
+    return {column.key: getattr(user, column.key) for column in User.__table__.columns}
+
+
+def load_user(user_id) -> Optional[User]:
+    """
+    Get a session-attached User, from the cache when possible
+
+    A cached snapshot is turned back into a persistent instance with
+    merge(load=False), which attaches it to the session without a SELECT;
+    changes made by the handler are still flushed as a normal UPDATE.
+    """
+    snapshot = user_cache.get(user_id)
+
+    if snapshot is None:
+        user = db.session.get(User, user_id)
+        if user is not None:
+            user_cache.put(user_id, snapshot_user(user))
+        return user
+
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    user = db.session.merge(user, load=False)
+    # Queried users get this from the load event; snapshots skip it
+    activity_buffer.overlay(user)
+    return user
+
+
+def ensure_current(user: User) -> User:
+    """
+    Reload a cached user whose row has changed since it was snapshotted
+
+    A write only drops the snapshot in the process that made it, so in other
+    workers a snapshot can be up to USER_CACHE_TTL_SECONDS old. Where that
+    matters (the profile validator, whose ETag would otherwise answer 304 for
+    stale data), this checks updated_at and last_active with one primary-key
+    lookup and refreshes the user and its snapshot if either moved.
+    """
+    row = db.session.query(User.updated_at, User.last_active).filter(User.id == user.id).one_or_none()
+    if row is None:
+        return user
+
+    updated_at, last_active = row
+    if updated_at != user.updated_at or (
+            last_active is not None and (user.last_active is None or last_active > user.last_active)):
+        db.session.refresh(user)
+        user_cache.put(user.id, snapshot_user(user))
+    return user
+
+
+@jwt.user_lookup_loader
+def user_lookup_callback(_jwt_header, jwt_data):
+    """Resolve `current_user` once per request"""
+    return load_user(jwt_data['sub'])
+
+
+@jwt.user_lookup_error_loader
+def user_lookup_error_callback(_jwt_header, _jwt_data):
+    return jsonify({'error': 'User not found'}), 404
+
+
+# Any write to a user row (register, profile, password) drops its
+# snapshot. The id is dropped again after commit so a concurrent request cannot
+# re-cache the pre-commit row for the rest of the TTL.
+@event.listens_for(User, 'after_insert')
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_on_write(_mapper, connection, target):
+    user_cache.invalidate(target.id)
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault('dirty_user_ids', set()).add(target.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    for user_id in session.info.pop('dirty_user_ids', ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_after_rollback(session):
+    session.info.pop('dirty_user_ids', None)
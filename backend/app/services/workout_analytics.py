@@ -0,0 +1,191 @@
+"""
+Workout Analytics Service - Streaks, weekly volume and type/intensity mix from grouped SQL
+"""
+import os
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import func
+from app import db
+from app.models import Workout
+from app.services.progress_series import SeriesCache, bucket_expression
+
+DEFAULT_WEEKS = 12
+MAX_WEEKS = 104
+
+
+def parse_analytics_args(weeks: Optional[int]) -> Dict:
+    """Validate the query parameters of the analytics endpoint"""
+    weeks = DEFAULT_WEEKS if weeks is None else weeks
+    if not 1 <= weeks <= MAX_WEEKS:
+        raise ValueError(f'weeks must be between 1 and {MAX_WEEKS}')
+    return {'weeks': weeks}
+
+
+def _activity_date():
+    """When a workout counts as done: completion time, or creation for older rows without one"""
+    return func.coalesce(Workout.completed_at, Workout.created_at)
+
+
+def _completed(user_id: int):
+    return (Workout.user_id == user_id, Workout.status == 'completed')
+
+
+def _runs(values: np.ndarray) -> np.ndarray:
+    """Lengths of the runs of consecutive integers in a sorted, de-duplicated array"""
+    if not len(values):
+        return np.zeros(0, dtype=int)
+    breaks = np.flatnonzero(np.diff(values) != 1) + 1
+    starts = np.concatenate(([0], breaks))
+    ends = np.concatenate((breaks, [len(values)]))
+    return ends - starts
+
+
+def streaks(days: np.ndarray, today: np.datetime64) -> Dict:
+    """
+    Current and longest streaks of active days and active weeks
+
+    A streak is still current if its last day is today or yesterday (this or
+    last week for week streaks), so it does not reset before the user has had
+    a chance to train today.
+    """
+    if not len(days):
+        return {'current_days': 0, 'longest_days': 0, 'current_weeks': 0, 'longest_weeks': 0,
+                'last_workout_date': None}
+
+    ordinals = days.astype('int64')
+    # 1970-01-01 was a Thursday; shifting by 3 days makes weeks start on Monday
+    weeks = np.unique((ordinals + 3) // 7)
+    today_ordinal = int(today.astype('int64'))
+
+    day_runs = _runs(ordinals)
+    week_runs = _runs(weeks)
+
+    return {
+        'current_days': int(day_runs[-1]) if today_ordinal - ordinals[-1] <= 1 else 0,
+        'longest_days': int(day_runs.max()),
+        'current_weeks': int(week_runs[-1]) if (today_ordinal + 3) // 7 - weeks[-1] <= 1 else 0,
+        'longest_weeks': int(week_runs.max()),
+        'last_workout_date': str(days[-1])
+    }
+
+
+def _weekly_volume(user_id: int, dialect: str, today: np.datetime64, weeks: int) -> Dict:
+    """Completed workouts, minutes and calories for each of the last `weeks` weeks"""
+    this_week = today - np.timedelta64((int(today.astype('int64')) + 3) % 7, 'D')
+    axis = this_week - np.arange(weeks - 1, -1, -1) * np.timedelta64(7, 'D')
+    since = datetime.combine(date.fromisoformat(str(axis[0])), datetime.min.time())
+
+    label = bucket_expression(_activity_date(), 'week', dialect).label('week')
+    rows = (
+        db.session.query(label, func.count(Workout.id),
+                         func.coalesce(func.sum(Workout.duration_minutes), 0),
+                         func.coalesce(func.sum(Workout.calories_burned), 0))
+        .filter(*_completed(user_id), _activity_date() >= since)
+        .group_by(label)
+        .all()
+    )
+
+    volume = np.zeros((3, weeks), dtype=int)
+    observed = np.array([str(row[0])[:10] for row in rows], dtype='datetime64[D]')
+    positions = np.searchsorted(axis, observed)
+    keep = (positions < weeks) & (axis[np.minimum(positions, weeks - 1)] == observed)
+    for i in range(3):
+        volume[i, positions[keep]] = np.array([row[1 + i] for row in rows], dtype=int)[keep]
+
+    return {
+        'weeks': [str(week) for week in axis],
+        'workouts': volume[0].tolist(),
+        'minutes': volume[1].tolist(),
+        'calories': volume[2].tolist()
+    }
+
+
+def _by_type(user_id: int) -> List[Dict]:
+    rows = (
+        db.session.query(Workout.workout_type, func.count(Workout.id),
+                         func.coalesce(func.sum(Workout.duration_minutes), 0),
+                         func.coalesce(func.sum(Workout.calories_burned), 0),
+                         func.avg(Workout.duration_minutes))
+        .filter(*_completed(user_id))
+        .group_by(Workout.workout_type)
+        .order_by(func.count(Workout.id).desc(), Workout.workout_type)
+        .all()
+    )
+    return [{
+        'workout_type': row[0],
+        'workouts': row[1],
+        'minutes': int(row[2]),
+        'calories': int(row[3]),
+        'avg_minutes': round(float(row[4]), 1) if row[4] is not None else None
+    } for row in rows]
+
+
+def _intensity(user_id: int) -> Dict:
+    rows = (
+        db.session.query(Workout.intensity, func.count(Workout.id))
+        .filter(*_completed(user_id))
+        .group_by(Workout.intensity)
+        .all()
+    )
+    counts = {row[0] or 'unknown': row[1] for row in rows}
+    total = sum(counts.values())
+    return {
+        'counts': counts,
+        'share': {name: round(count / total, 4) for name, count in counts.items()} if total else {}
+    }
+
+
+def compute_analytics(user_id: int, weeks: int = DEFAULT_WEEKS, today: Optional[date] = None) -> Dict:
+    """
+    Analytics over a user's completed workouts
+
+    Every aggregate is a GROUP BY in the database: one row per active day
+    (for streaks), per week, per workout_type and per intensity. Streaks are
+    then found with NumPy over the day list, which is at most one row per day
+    however many workouts the user has logged. Days are UTC.
+    """
+    today = np.datetime64(today or datetime.utcnow().date(), 'D')
+    dialect = db.session.get_bind().dialect.name
+
+    day = bucket_expression(_activity_date(), 'day', dialect).label('day')
+    day_rows = (
+        db.session.query(day)
+        .filter(*_completed(user_id))
+        .group_by(day)
+        .order_by(day)
+        .all()
+    )
+    days = np.array([str(row[0])[:10] for row in day_rows], dtype='datetime64[D]')
+
+    return {
+        'generated_for': str(today),
+        'active_days': len(days),
+        'streaks': streaks(days, today),
+        'weekly_volume': _weekly_volume(user_id, dialect, today, weeks),
+        'by_type': _by_type(user_id),
+        'intensity': _intensity(user_id)
+    }
+
+
+# Global instance
+analytics_cache = SeriesCache(max_users=int(os.getenv('WORKOUT_ANALYTICS_CACHE_USERS', 1024)))
+
+
+def workouts_watermark(user_id: int) -> Tuple:
+    """Row count and newest updated_at of a user's workouts (covering index)"""
+    return tuple(db.session.query(func.count(Workout.id), func.max(Workout.updated_at)).filter(
+        Workout.user_id == user_id
+    ).one())
+
+
+def get_analytics(user_id: int, weeks: int = DEFAULT_WEEKS) -> Dict:
+    """compute_analytics(), served from the cache while the user's workouts are unchanged"""
+    today = datetime.utcnow().date()
+    watermark = workouts_watermark(user_id)
+    analytics = analytics_cache.get(user_id, weeks, watermark)
+    # Streaks and the week axis move at midnight even without new workouts
+    if analytics is None or analytics['generated_for'] != str(today):
+        analytics = compute_analytics(user_id, weeks, today)
+        analytics_cache.put(user_id, weeks, analytics, watermark)
+    return analytics
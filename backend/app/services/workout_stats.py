@@ -0,0 +1,220 @@
+"""
+Workout Stats Service - Incrementally maintained per-user workout summaries
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import case, func, update
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import Workout, UserWorkoutStats
+from app.services.database import primary_bind
+
+# Workout fields that feed into the summary
+STAT_FIELDS = ('status', 'duration_minutes', 'calories_burned', 'created_at')
+
+COUNTER_FIELDS = (
+    'total_workouts',
+    'completed_workouts',
+    'planned_workouts',
+    'skipped_workouts',
+    'total_minutes',
+    'total_calories',
+)
+
+
+def start_of_week(now: Optional[datetime] = None) -> datetime:
+    """Midnight on Monday of the current (UTC) week"""
+    now = now or datetime.utcnow()
+    monday = now - timedelta(days=now.weekday())
+    return monday.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def snapshot(workout: Workout) -> Dict:
+    """Capture the fields of a workout that affect its user's summary"""
+    return {field: getattr(workout, field) for field in STAT_FIELDS}
+
+
+def _deltas(snap: Dict, sign: int) -> Dict:
+    """Contribution of one workout snapshot to the summary counters"""
+    status = snap.get('status')
+    completed = status == 'completed'
+    created_at = snap.get('created_at')
+
+    return {
+        'total_workouts': sign,
+        'completed_workouts': sign if completed else 0,
+        'planned_workouts': sign if status == 'planned' else 0,
+        'skipped_workouts': sign if status == 'skipped' else 0,
+        'total_minutes': sign * (snap.get('duration_minutes') or 0) if completed else 0,
+        'total_calories': sign * (snap.get('calories_burned') or 0) if completed else 0,
+        'workouts_this_week': sign if created_at and created_at >= start_of_week() else 0,
+    }
+
+
+def _apply(user_id: int, deltas: Dict):
+    """
+    Add deltas to the user's summary row in a single UPDATE
+
+    The update is expressed against the current column values so concurrent
+    requests cannot lose each other's changes. If the user has no summary row
+    yet, it is rebuilt from the (already flushed) workouts table instead.
+    """
+    week = start_of_week()
+    week_delta = deltas['workouts_this_week']
+
+    values = {
+        field: getattr(UserWorkoutStats, field) + deltas[field]
+        for field in COUNTER_FIELDS
+    }
+    values['workouts_this_week'] = case(
+        (UserWorkoutStats.week_start == week, UserWorkoutStats.workouts_this_week + week_delta),
+        else_=week_delta
+    )
+    values['week_start'] = week
+    values['updated_at'] = datetime.utcnow()
+
+    statement = (
+        update(UserWorkoutStats)
+        .where(UserWorkoutStats.user_id == user_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+    if db.session.execute(statement).rowcount == 0:
+        db.session.flush()
+        if not _create_user_stats(user_id):
+            # A concurrent request created the row first, from workouts that
+            # did not include this request's uncommitted ones
+            db.session.execute(statement)
+
+
+def _create_user_stats(user_id: int) -> bool:
+    """
+    Build a missing summary row in a savepoint
+
+    Returns False (leaving the transaction usable) if another request
+    inserted the row in the meantime.
+    """
+    try:
+        with db.session.begin_nested():
+            rebuild_user_stats(user_id)
+    except IntegrityError:
+        return False
+    return True
+
+
+def record_workout_added(workout: Workout):
+    """Count a newly created (and flushed) workout"""
+    _apply(workout.user_id, _deltas(snapshot(workout), 1))
+
+
+def record_workouts_added(user_id: int, rows: List[Dict]):
+    """Count many bulk-inserted workouts (column dicts) with one UPDATE"""
+    if not rows:
+        return
+
+    totals = dict.fromkeys(COUNTER_FIELDS + ('workouts_this_week',), 0)
+    for row in rows:
+        for field, value in _deltas(row, 1).items():
+            totals[field] += value
+
+    _apply(user_id, totals)
+
+
+def record_workout_removed(workout: Workout):
+    """Remove a deleted workout from its user's summary"""
+    _apply(workout.user_id, _deltas(snapshot(workout), -1))
+
+
+def record_workout_updated(workout: Workout, before: Dict):
+    """Apply the difference between a workout's previous and current state"""
+    old = _deltas(before, -1)
+    new = _deltas(snapshot(workout), 1)
+    deltas = {field: old[field] + new[field] for field in old}
+
+    if any(deltas.values()):
+        _apply(workout.user_id, deltas)
+
+
+def rebuild_user_stats(user_id: Optional[int] = None) -> int:
+    """
+    Recompute summaries from the workouts table
+
+    Args:
+        user_id: Only rebuild this user's row (all users if None)
+
+    Returns:
+        Number of summary rows written
+    """
+    # The counts are written back, so never read them from a lagging replica
+    with primary_bind():
+        week = start_of_week()
+        completed = Workout.status == 'completed'
+
+        query = db.session.query(
+            Workout.user_id,
+            func.count(Workout.id),
+            func.sum(case((completed, 1), else_=0)),
+            func.sum(case((Workout.status == 'planned', 1), else_=0)),
+            func.sum(case((Workout.status == 'skipped', 1), else_=0)),
+            func.sum(case((completed, Workout.duration_minutes), else_=0)),
+            func.sum(case((completed, Workout.calories_burned), else_=0)),
+            func.sum(case((Workout.created_at >= week, 1), else_=0))
+        ).group_by(Workout.user_id)
+
+        stale = UserWorkoutStats.query
+
+        if user_id is not None:
+            query = query.filter(Workout.user_id == user_id)
+            stale = stale.filter_by(user_id=user_id)
+
+        rows = query.all()
+        stale.delete(synchronize_session=False)
+
+        summaries = [
+            UserWorkoutStats(
+                user_id=row[0],
+                total_workouts=int(row[1] or 0),
+                completed_workouts=int(row[2] or 0),
+                planned_workouts=int(row[3] or 0),
+                skipped_workouts=int(row[4] or 0),
+                total_minutes=int(row[5] or 0),
+                total_calories=int(row[6] or 0),
+                week_start=week,
+                workouts_this_week=int(row[7] or 0)
+            )
+            for row in rows
+        ]
+
+        # Keep an empty row so later increments have something to update
+        if user_id is not None and not summaries:
+            summaries.append(UserWorkoutStats(user_id=user_id, week_start=week))
+
+        db.session.add_all(summaries)
+        db.session.flush()
+
+        return len(summaries)
+
+
+def get_user_stats(user_id: int) -> Dict:
+    """
+    Get a user's workout summary with a single primary-key lookup
+
+    Users whose summary has never been built (e.g. accounts created before the
+    summary table existed) are rebuilt once on first access.
+    """
+    stats = db.session.get(UserWorkoutStats, user_id)
+
+    if stats is None:
+        with primary_bind():
+            _create_user_stats(user_id)
+            db.session.commit()
+            stats = db.session.get(UserWorkoutStats, user_id)
+
+    data = stats.to_dict()
+
+    # No workout has been written since the week rolled over
+    if stats.week_start != start_of_week():
+        data['workouts_this_week'] = 0
+
+    return data
@@ -0,0 +1,151 @@
+"""
+Chat Archive Benchmark - storage and hot-table latency before and after archiving
+
+Seeds several users with chat history spread over the last two years, then
+measures the database file size and chat history latency. It runs
+`archive_old_messages` (followed by VACUUM) and measures again. Latency is
+reported for the first page, for the first page with include_total=1 (which
+counts the hot table) and for a SELECT over the hot table alone.
+
+Run from the backend directory:
+
+    python benchmarks/chat_archive.py --users 20 --messages 20000 --older-than-days 90
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+WORDS = ('squat deadlift bench press row cardio run interval tempo protein sleep recovery rest '
+         'stretch mobility hip knee shoulder core plank lunge sets reps weight goal week '
+         'progress tired motivated sore energy hydrate calories plan beginner advanced').split()
+
+
+def sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def seed(db, ChatMessage, user_ids, messages, days=730):
+    from sqlalchemy import insert
+
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    per_user = messages // len(user_ids)
+    for user_id in user_ids:
+        rows = [{
+            'user_id': user_id,
+            'message': sentence(rng, rng.randint(5, 30)),
+            'response': ' '.join(sentence(rng, rng.randint(8, 20)) for _ in range(rng.randint(2, 6))),
+            'intent_detected': rng.choice(['ask_workout', 'ask_nutrition', 'greeting', 'progress']),
+            'emotion_detected': rng.choice(['neutral', 'tired', 'motivated']),
+            'brains_used': '["NLP", "ML", "Logic", "Personality"]',
+            'processing_time_ms': rng.uniform(50, 400),
+            'created_at': now - timedelta(minutes=rng.randint(0, days * 24 * 60))
+        } for _ in range(per_user)]
+        db.session.execute(insert(ChatMessage), rows)
+        db.session.commit()
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def measure(app, db, client, tokens, ChatMessage, db_path, repeat):
+    from sqlalchemy import select
+
+    def first_pages():
+        for headers in tokens:
+            client.get('/api/chat/history?limit=50', headers=headers)
+
+    def with_totals():
+        for headers in tokens:
+            client.get('/api/chat/history?limit=50&include_total=1', headers=headers)
+
+    def hot_scan():
+        with app.app_context():
+            db.session.execute(select(ChatMessage.id, ChatMessage.response)).all()
+
+    with app.app_context():
+        hot_rows = db.session.query(ChatMessage).count()
+
+    return {
+        'hot_rows': hot_rows,
+        'db_mb': os.path.getsize(db_path) / 1e6,
+        'first_page_ms': timed(first_pages, repeat) / len(tokens),
+        'with_total_ms': timed(with_totals, repeat) / len(tokens),
+        'hot_scan_ms': timed(hot_scan, repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--messages', type=int, default=20000, help='Messages in total, split across users')
+    parser.add_argument('--older-than-days', type=int, default=90)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench_archive.db')
+    os.environ['AI_WARMUP'] = 'lazy'
+    os.environ['DATABASE_URL'] = 'sqlite:///' + db_path
+
+    sys.path.insert(0, BACKEND_DIR)
+    from sqlalchemy import text
+    from app import create_app, db
+    from app.models import ChatMessage
+    from app.services.chat_archive import archive_old_messages
+
+    app = create_app()
+    client = app.test_client()
+
+    tokens, user_ids = [], []
+    for i in range(args.users):
+        response = client.post('/api/auth/register', json={
+            'email': f'archive{i}@example.com', 'username': f'archive{i}', 'password': 'password'
+        }).get_json()
+        tokens.append({'Authorization': f"Bearer {response['access_token']}"})
+        user_ids.append(response['user']['id'])
+
+    with app.app_context():
+        seed(db, ChatMessage, user_ids, args.messages)
+        db.session.execute(text('VACUUM'))
+
+    before = measure(app, db, client, tokens, ChatMessage, db_path, args.repeat)
+
+    with app.app_context():
+        started = time.perf_counter()
+        report = archive_old_messages(args.older_than_days)
+        archive_seconds = time.perf_counter() - started
+        db.session.execute(text('VACUUM'))
+
+    after = measure(app, db, client, tokens, ChatMessage, db_path, args.repeat)
+
+    print(f"Archived {report['messages']} of {before['hot_rows']} messages into {report['batches']} "
+          f"{report['codec']} batches in {archive_seconds:.1f}s")
+    print(f"Payload: {report['raw_bytes'] / 1e6:.1f} MB -> {report['compressed_bytes'] / 1e6:.1f} MB "
+          f"({report['compression_ratio']}x)\n")
+    print(f"{'':<22}{'before':>12}{'after':>12}")
+    rows = [
+        ('hot rows', 'hot_rows', '{:.0f}'),
+        ('database file (MB)', 'db_mb', '{:.1f}'),
+        ('first page (ms)', 'first_page_ms', '{:.2f}'),
+        ('page + total (ms)', 'with_total_ms', '{:.2f}'),
+        ('hot table scan (ms)', 'hot_scan_ms', '{:.1f}'),
+    ]
+    for label, key, fmt in rows:
+        print(f"{label:<22}{fmt.format(before[key]):>12}{fmt.format(after[key]):>12}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+DB Concurrency Benchmark - concurrent writes under each DB_PROFILE
+
+Runs the same mixed workload against a fresh SQLite file once with
+DB_PROFILE=default (rollback journal, SQLAlchemy defaults) and once with
+DB_PROFILE=tuned (WAL, synchronous=NORMAL, busy_timeout, larger cache).
+Several users are spread across threads. Each thread creates workouts, updates them,
+logs progress and lists workouts through the API for a fixed duration.
+
+Run from the backend directory:
+
+    python benchmarks/db_concurrency.py --threads 16 --duration 10
+    DATABASE_URL=postgresql://... python benchmarks/db_concurrency.py   # server database
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+def run_profile(create_app, profile, database_url, threads, duration, users):
+    app = create_app({'DB_PROFILE': profile, 'SQLALCHEMY_DATABASE_URI': database_url})
+    client = app.test_client()
+
+    tokens = []
+    run_id = int(time.time())
+    for i in range(users):
+        name = f'bench-{profile}-{run_id}-{i}'
+        response = client.post('/api/auth/register', json={
+            'email': f'{name}@example.com', 'username': name, 'password': 'password'
+        })
+        tokens.append({'Authorization': f"Bearer {response.get_json()['access_token']}"})
+
+    results = {'ok': 0, 'locked': 0, 'failed': 0}
+    latencies = []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def worker(n):
+        local_client = app.test_client()
+        headers = tokens[n % users]
+        rng = random.Random(n)
+        workout_ids = []
+        ok = locked = failed = 0
+        local_latencies = []
+
+        while time.perf_counter() < stop_at:
+            roll = rng.random()
+            started = time.perf_counter()
+            if roll < 0.35 or not workout_ids:
+                response = local_client.post('/api/workouts/', headers=headers, json={
+                    'workout_type': 'cardio', 'duration_minutes': 30, 'status': 'planned'
+                })
+                if response.status_code == 201:
+                    workout_ids.append(response.get_json()['workout']['id'])
+            elif roll < 0.6:
+                response = local_client.put(f'/api/workouts/{rng.choice(workout_ids)}', headers=headers, json={
+                    'status': 'completed', 'calories_burned': rng.randint(100, 500)
+                })
+            elif roll < 0.8:
+                response = local_client.post('/api/profile/progress', headers=headers, json={
+                    'weight': 70 + rng.random() * 10
+                })
+            else:
+                response = local_client.get('/api/workouts?limit=20', headers=headers)
+            local_latencies.append((time.perf_counter() - started) * 1000)
+
+            if response.status_code < 400:
+                ok += 1
+            elif 'locked' in (response.get_json(silent=True) or {}).get('error', ''):
+                locked += 1
+            else:
+                failed += 1
+
+        with lock:
+            results['ok'] += ok
+            results['locked'] += locked
+            results['failed'] += failed
+            latencies.extend(local_latencies)
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    print(f"{profile:<8} {results['ok'] / elapsed:8.1f} ok/s  "
+          f"ok={results['ok']:<6} locked={results['locked']:<5} failed={results['failed']:<5} "
+          f"p50={percentile(latencies, 50):7.1f} ms  p95={percentile(latencies, 95):7.1f} ms  "
+          f"p99={percentile(latencies, 99):7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--users', type=int, default=4)
+    parser.add_argument('--profiles', nargs='+', default=['default', 'tuned'])
+    args = parser.parse_args()
+
+    os.environ['AI_WARMUP'] = 'lazy'
+    env_url = os.environ.get('DATABASE_URL', '')
+    server_url = env_url if env_url and not env_url.startswith('sqlite') else None
+
+    sys.path.insert(0, BACKEND_DIR)
+    from app import create_app
+
+    print(f"threads={args.threads} users={args.users} duration={args.duration}s "
+          f"database={'server' if server_url else 'sqlite file'}")
+    for profile in args.profiles:
+        url = server_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), f'bench_{profile}.db')
+        run_profile(create_app, profile, url, args.threads, args.duration, args.users)
+
+
+if __name__ == '__main__':
+    main()
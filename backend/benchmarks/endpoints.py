@@ -0,0 +1,464 @@
+"""
+Endpoint Benchmark - throughput and p50/p99 for every API route, with a regression gate
+
+Builds the app with create_app(config=...) against a fresh SQLite file. The
+file is seeded at the requested scale by app/services/seed.py (the generator
+behind `flask seed`), with a fixed random seed. Every auth, workouts,
+profile, chat and export route is then driven in two modes:
+
+    client  the Flask test client, one request at a time (in-process cost)
+    http    a local threaded server and --threads keep-alive HTTP clients
+
+Chat is answered by a deterministic stub in place of AICoachService, so the
+numbers measure the route and the database rather than the brains. Any
+blueprint route without a scenario is listed before the run.
+
+Results can be saved as a JSON baseline and compared by later runs. A route
+regresses when its p50 or p99 is more than --threshold slower than the
+baseline and also more than --min-delta-ms slower. Any regression, or any
+unexpected status code, exits with status 1.
+
+Run from the backend directory:
+
+    python benchmarks/endpoints.py --save-baseline benchmarks/baselines/endpoints.json
+    python benchmarks/endpoints.py --baseline benchmarks/baselines/endpoints.json
+    python benchmarks/endpoints.py --users 10000 --workouts 1000000 --messages 5000000 --mode http
+    python benchmarks/endpoints.py --only 'workouts|profile' --requests 500
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import platform
+import queue
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+WORKOUT_TYPES = ('chest', 'back', 'legs', 'shoulders', 'arms', 'cardio', 'core', 'full_body')
+INTENTS = ('workout_request', 'progress_check', 'motivation', 'nutrition', 'general')
+EMOTIONS = ('motivated', 'tired', 'neutral', 'frustrated', 'happy')
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+class StubCoach:
+    """Deterministic stand-in for AICoachService: same chat interface, no brains"""
+
+    def __init__(self, latency_ms=0.0):
+        self.latency_ms = latency_ms
+        self.calls = 0
+
+    def chat(self, message, user_data=None):
+        self.calls += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        h = zlib.crc32(message.encode())
+        workout = WORKOUT_TYPES[h % len(WORKOUT_TYPES)]
+        return {
+            'response': f"Let's keep it steady today: a {30 + h % 30} minute {workout} session. "
+                        f"Warm up for five minutes, keep the effort moderate and log it when you are done.",
+            'workout_recommendation': workout,
+            'safety_status': 'safe',
+            'confidence_score': round(0.5 + (h % 50) / 100, 2),
+            'emotion_detected': EMOTIONS[h % len(EMOTIONS)],
+            'intent_detected': INTENTS[h % len(INTENTS)],
+            'energy_level': h % 100,
+            'brains_used': ['NLP', 'ML', 'Logic', 'Personality'],
+            'processing_time_ms': self.latency_ms,
+            'metadata': {'brain_times_ms': {'NLP': self.latency_ms / 4, 'ML': self.latency_ms / 4,
+                                            'Logic': self.latency_ms / 4, 'Personality': self.latency_ms / 4}}
+        }
+
+    def chat_stream(self, message, user_data=None):
+        result = self.chat(message, user_data)
+        yield 'metadata', {'brain': 'NLP', 'emotion': result['emotion_detected'],
+                           'intent': result['intent_detected'], 'energy_level': result['energy_level']}
+        for chunk in re.findall(r'\S+\s*', result['response']):
+            yield 'token', {'text': chunk}
+        yield 'result', result
+
+    def get_stats(self):
+        return {'total_requests': self.calls, 'stub': True}
+
+
+def seed(app, args):
+    """Seed through the `flask seed` generator; returns row counts"""
+    from app.services.seed import seed_database
+
+    with app.app_context():
+        report = seed_database(args.users, args.workouts, args.messages, args.progress,
+                               seed=args.seed, processes=args.processes)
+    return {name: report[name] for name in ('users', 'workouts', 'chat_messages', 'progress_logs')}
+
+
+class Context:
+    """Tokens and row ids the scenarios draw from, shared by all worker threads"""
+
+    def __init__(self, app, sample_users):
+        from app import db
+        from app.models import User, Workout
+        from flask_jwt_extended import create_access_token
+
+        self.app = app
+        self.counter = itertools.count()
+        self.run_id = int(time.time())
+        self.deletable = queue.Queue()
+
+        with app.app_context():
+            users = db.session.execute(db.select(User.id, User.email).order_by(User.id).limit(sample_users)).all()
+            self.users = [(user_id, email, {'Authorization': f'Bearer {create_access_token(identity=user_id)}'})
+                          for user_id, email in users]
+            self.workout_ids = []
+            for user_id, _, _ in self.users:
+                self.workout_ids.append(db.session.execute(
+                    db.select(Workout.id).where(Workout.user_id == user_id).order_by(Workout.id).limit(200)
+                ).scalars().all())
+
+    def user(self, i):
+        return self.users[i % len(self.users)]
+
+    def prepare_deletes(self, count):
+        """Extra workouts for the DELETE scenario, so it never removes seeded rows"""
+        from app import db
+        from app.models import Workout
+
+        with self.app.app_context():
+            now = datetime.utcnow()
+            for i in range(count):
+                user_id = self.user(i)[0]
+                workout_id = db.session.execute(db.insert(Workout).values(
+                    user_id=user_id, workout_type='cardio', status='planned', created_at=now, updated_at=now
+                )).inserted_primary_key[0]
+                self.deletable.put((i, workout_id))
+            db.session.commit()
+
+
+class Scenario:
+    """One request shape: build(ctx, i) -> (path, headers, body), sent `share` times as often as the default"""
+
+    def __init__(self, name, endpoint, method, build, share=1.0, prepare=None):
+        self.name = name
+        self.endpoint = endpoint
+        self.method = method
+        self.build = build
+        self.share = share
+        self.prepare = prepare
+
+
+def _authed(path, body=None):
+    def build(ctx, i):
+        return path, ctx.user(i)[2], body
+    return build
+
+
+def _register(ctx, i):
+    n = next(ctx.counter)
+    name = f'bench-{ctx.run_id}-{n}'
+    return '/api/auth/register', {}, {'email': f'{name}@bench.local', 'username': name, 'password': 'password'}
+
+
+def _login(ctx, i):
+    return '/api/auth/login', {}, {'email': ctx.user(i)[1], 'password': 'password'}
+
+
+def _update_workout(ctx, i):
+    workout_ids = ctx.workout_ids[i % len(ctx.users)]
+    if not workout_ids:
+        return '/api/workouts/0', ctx.user(i)[2], {'notes': 'no seeded workouts'}
+    workout_id = workout_ids[i // len(ctx.users) % len(workout_ids)]
+    return f'/api/workouts/{workout_id}', ctx.user(i)[2], {'notes': f'edited {i}', 'calories_burned': 300 + i % 200}
+
+
+def _delete_workout(ctx, i):
+    owner, workout_id = ctx.deletable.get_nowait()
+    return f'/api/workouts/{workout_id}', ctx.user(owner)[2], None
+
+
+def _bulk_workouts(ctx, i):
+    return '/api/workouts/bulk', ctx.user(i)[2], [
+        {'workout_type': WORKOUT_TYPES[j % len(WORKOUT_TYPES)], 'duration_minutes': 20 + j, 'status': 'completed'}
+        for j in range(50)
+    ]
+
+
+def _bulk_progress(ctx, i):
+    return '/api/profile/progress/bulk', ctx.user(i)[2], [
+        {'weight': 70 + (i + j) % 10, 'energy_level': 50 + j} for j in range(50)
+    ]
+
+
+def _chat(stream):
+    def build(ctx, i):
+        path = '/api/chat/message?stream=1' if stream else '/api/chat/message'
+        return path, ctx.user(i)[2], {'message': f'Plan my workout number {i}'}
+    return build
+
+
+SCENARIOS = [
+    Scenario('auth.register', 'auth.register', 'POST', _register, share=0.1),
+    Scenario('auth.login', 'auth.login', 'POST', _login, share=0.1),
+    Scenario('auth.me', 'auth.get_current_user', 'GET', _authed('/api/auth/me')),
+    Scenario('auth.refresh', 'auth.refresh', 'POST', _authed('/api/auth/refresh')),
+    Scenario('auth.cache_stats', 'auth.get_user_cache_stats', 'GET', _authed('/api/auth/cache/stats')),
+    Scenario('workouts.list', 'workouts.get_workouts', 'GET', _authed('/api/workouts?limit=50')),
+    Scenario('workouts.create', 'workouts.create_workout', 'POST', _authed('/api/workouts', {
+        'workout_type': 'legs', 'duration_minutes': 45, 'calories_burned': 350, 'status': 'completed'
+    })),
+    Scenario('workouts.bulk', 'workouts.bulk_create_workouts', 'POST', _bulk_workouts, share=0.2),
+    Scenario('workouts.update', 'workouts.update_workout', 'PUT', _update_workout),
+    Scenario('workouts.delete', 'workouts.delete_workout', 'DELETE', _delete_workout,
+             prepare=Context.prepare_deletes),
+    Scenario('workouts.stats', 'workouts.get_workout_stats', 'GET', _authed('/api/workouts/stats')),
+    Scenario('workouts.analytics', 'workouts.get_workout_analytics', 'GET', _authed('/api/workouts/analytics')),
+    Scenario('profile.get', 'profile.get_profile', 'GET', _authed('/api/profile')),
+    Scenario('profile.update', 'profile.update_profile', 'PUT', _authed('/api/profile', {'fitness_level': 'intermediate'})),
+    Scenario('profile.progress', 'profile.get_progress_logs', 'GET', _authed('/api/profile/progress?limit=50')),
+    Scenario('profile.progress_log', 'profile.log_progress', 'POST', _authed('/api/profile/progress', {
+        'weight': 72.5, 'energy_level': 60
+    })),
+    Scenario('profile.series', 'profile.get_progress_series', 'GET', _authed('/api/profile/progress/series?bucket=week')),
+    Scenario('profile.progress_bulk', 'profile.bulk_log_progress', 'POST', _bulk_progress, share=0.2),
+    Scenario('profile.statistics', 'profile.get_statistics', 'GET', _authed('/api/profile/statistics')),
+    Scenario('chat.message', 'chat.send_message', 'POST', _chat(stream=False)),
+    Scenario('chat.stream', 'chat.send_message', 'POST', _chat(stream=True)),
+    Scenario('chat.history', 'chat.get_chat_history', 'GET', _authed('/api/chat/history?limit=50')),
+    Scenario('chat.stats', 'chat.get_ai_stats', 'GET', _authed('/api/chat/stats')),
+    Scenario('export.ndjson', 'export.export_history', 'GET', _authed('/api/export?resources=workout'), share=0.05),
+]
+
+
+def uncovered_routes(app):
+    """(endpoint, method) pairs of blueprint routes that no scenario exercises"""
+    covered = {(s.endpoint, s.method) for s in SCENARIOS}
+    missing = []
+    for rule in app.url_map.iter_rules():
+        if '.' not in rule.endpoint or rule.endpoint.startswith('static'):
+            continue
+        for method in sorted(rule.methods - {'HEAD', 'OPTIONS'}):
+            if (rule.endpoint, method) not in covered:
+                missing.append((rule.endpoint, method, rule.rule))
+    return missing
+
+
+def summarize(latencies_ms, errors, wall_seconds):
+    return {
+        'requests': len(latencies_ms),
+        'errors': errors,
+        'rps': round(len(latencies_ms) / wall_seconds, 1) if wall_seconds else 0.0,
+        'p50_ms': round(percentile(latencies_ms, 50), 3),
+        'p99_ms': round(percentile(latencies_ms, 99), 3),
+    }
+
+
+def run_client(ctx, scenario, count, encoding):
+    client = ctx.app.test_client()
+    latencies, errors = [], 0
+    started = time.perf_counter()
+    for i in range(count):
+        path, headers, body = scenario.build(ctx, i)
+        headers = dict(headers, **({'Accept-Encoding': encoding} if encoding else {}))
+        sent = time.perf_counter()
+        response = client.open(path, method=scenario.method, headers=headers, json=body)
+        response.get_data()  # drains streamed bodies
+        latencies.append((time.perf_counter() - sent) * 1000)
+        if response.status_code >= 400:
+            errors += 1
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def run_http(ctx, scenario, count, encoding, port, threads):
+    indexes = itertools.count()
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+
+    def worker():
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        local, failed = [], 0
+        while True:
+            i = next(indexes)
+            if i >= count:
+                break
+            path, headers, body = scenario.build(ctx, i)
+            headers = dict(headers)
+            if encoding:
+                headers['Accept-Encoding'] = encoding
+            payload = None
+            if body is not None:
+                payload = json.dumps(body)
+                headers['Content-Type'] = 'application/json'
+            sent = time.perf_counter()
+            try:
+                connection.request(scenario.method, path, body=payload, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+                status = 599
+            local.append((time.perf_counter() - sent) * 1000)
+            if status >= 400:
+                failed += 1
+        connection.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for future in [pool.submit(worker) for _ in range(threads)]:
+            future.result()
+    return summarize(latencies, errors[0], time.perf_counter() - started)
+
+
+def start_server(app):
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class QuietHandler(WSGIRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive, like a real client pool
+
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """Regressions of p50/p99 against a saved baseline, as printable lines"""
+    regressions = []
+    for mode, scenarios in results.items():
+        for name, current in scenarios.items():
+            previous = baseline.get('results', {}).get(mode, {}).get(name)
+            if previous is None:
+                continue
+            for metric in ('p50_ms', 'p99_ms'):
+                old, new = previous[metric], current[metric]
+                if new > old * (1 + threshold) and new - old > min_delta_ms:
+                    regressions.append(f"{mode:<7}{name:<24}{metric:<8}{old:>10.2f} -> {new:.2f} ms "
+                                       f"(+{(new / old - 1) * 100 if old else float('inf'):.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--workouts', type=int, default=20000)
+    parser.add_argument('--messages', type=int, default=50000)
+    parser.add_argument('--progress', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the seeded rows')
+    parser.add_argument('--processes', type=int, default=1, help='Processes generating the seeded rows')
+    parser.add_argument('--sample-users', type=int, default=50, help='Users the requests are spread over')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per scenario (scaled by its share)')
+    parser.add_argument('--threads', type=int, default=8, help='HTTP client threads')
+    parser.add_argument('--mode', choices=('client', 'http', 'both'), default='both')
+    parser.add_argument('--only', default=None, help='Regex on scenario names')
+    parser.add_argument('--accept-encoding', default='gzip', help="Sent with every request ('' for none)")
+    parser.add_argument('--ai-latency-ms', type=float, default=0.0, help='Simulated stub coach latency')
+    parser.add_argument('--save-baseline', metavar='PATH', help='Write the results as a JSON baseline')
+    parser.add_argument('--baseline', metavar='PATH', help='Compare against this baseline and fail on regressions')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed relative slowdown (0.25 = 25%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0, help='Slowdowns smaller than this never fail')
+    args = parser.parse_args()
+
+    os.environ['AI_WARMUP'] = 'lazy'
+    os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'unused.db'))
+    sys.path.insert(0, BACKEND_DIR)
+    from app import create_app
+    from app.routes import chat as chat_routes
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench_endpoints.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + db_path})
+    stub = StubCoach(args.ai_latency_ms)
+    chat_routes._get_coach = lambda: stub
+
+    for endpoint, method, rule in uncovered_routes(app):
+        print(f"⚠️ No scenario for {method} {rule} ({endpoint})")
+
+    started = time.perf_counter()
+    counts = seed(app, args)
+    print(f"Seeded {', '.join(f'{v} {k}' for k, v in counts.items())} in {time.perf_counter() - started:.1f}s "
+          f"({os.path.getsize(db_path) / 1e6:.0f} MB)")
+
+    ctx = Context(app, args.sample_users)
+    scenarios = [s for s in SCENARIOS if not args.only or re.search(args.only, s.name)]
+    modes = ('client', 'http') if args.mode == 'both' else (args.mode,)
+    server = start_server(app) if 'http' in modes else None
+    results = {}
+
+    for mode in modes:
+        results[mode] = {}
+        print(f"\n[{mode}]" + (f" {args.threads} threads" if mode == 'http' else ''))
+        print(f"{'scenario':<24}{'requests':>9}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        for scenario in scenarios:
+            count = max(1, int(args.requests * scenario.share))
+            if scenario.prepare:
+                scenario.prepare(ctx, count)
+            if mode == 'client':
+                stats = run_client(ctx, scenario, count, args.accept_encoding)
+            else:
+                stats = run_http(ctx, scenario, count, args.accept_encoding, server.server_port, args.threads)
+            results[mode][scenario.name] = stats
+            print(f"{scenario.name:<24}{stats['requests']:>9}{stats['errors']:>8}{stats['rps']:>10.1f}"
+                  f"{stats['p50_ms']:>10.2f}{stats['p99_ms']:>10.2f}")
+
+    if server is not None:
+        server.shutdown()
+
+    failed = False
+    errors = [(mode, name) for mode in results for name, stats in results[mode].items() if stats['errors']]
+    for mode, name in errors:
+        print(f"❌ {mode} {name}: {results[mode][name]['errors']} request(s) failed")
+        failed = True
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('scale') != counts or baseline.get('requests') != args.requests:
+            print(f"⚠️ Baseline was recorded at scale {baseline.get('scale')} with "
+                  f"{baseline.get('requests')} requests; numbers may not be comparable")
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        print(f"\nCompared with {args.baseline} (threshold {args.threshold:.0%}, min delta {args.min_delta_ms} ms)")
+        for line in regressions:
+            print(f"❌ {line}")
+        if regressions:
+            failed = True
+        else:
+            print("✅ No regressions")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, 'w') as f:
+            json.dump({
+                'created_at': datetime.utcnow().isoformat(),
+                'scale': counts,
+                'requests': args.requests,
+                'threads': args.threads,
+                'accept_encoding': args.accept_encoding,
+                'environment': {'python': platform.python_version(), 'sqlite': sqlite3.sqlite_version,
+                                'machine': platform.machine(), 'cpus': os.cpu_count()},
+                'results': results
+            }, f, indent=2)
+        print(f"💾 Baseline written to {args.save_baseline}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
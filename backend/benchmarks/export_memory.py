@@ -0,0 +1,127 @@
+"""
+Export Memory Benchmark - peak Python memory while streaming /api/export
+
+Seeds one user with N rows of each exported type, reads the whole export
+through the test client chunk by chunk, and records the tracemalloc peak.
+The export is run at two sizes; streaming keeps the peak roughly flat, so
+the run fails if the larger export peaks more than --max-growth times higher.
+For comparison, it also reports the peak of building the same rows with
+to_dict() + jsonify, which is what paging the list endpoints does.
+
+Run from the backend directory:
+
+    python benchmarks/export_memory.py --rows 20000 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def seed(db, models, user_id, rows):
+    from sqlalchemy import delete, insert
+
+    Workout, ChatMessage, ProgressLog = models
+    for model in models:
+        db.session.execute(delete(model).where(model.user_id == user_id))
+
+    start = datetime(2024, 1, 1)
+    chunk = 5000
+    for offset in range(0, rows, chunk):
+        count = min(chunk, rows - offset)
+        stamps = [start + timedelta(minutes=offset + i) for i in range(count)]
+        db.session.execute(insert(Workout), [
+            {'user_id': user_id, 'workout_type': 'cardio', 'duration_minutes': 30, 'calories_burned': 250,
+             'intensity': 'medium', 'status': 'completed', 'notes': 'Morning run', 'created_at': t}
+            for t in stamps
+        ])
+        db.session.execute(insert(ChatMessage), [
+            {'user_id': user_id, 'message': 'What should I train today?',
+             'response': 'Try a 30 minute run followed by mobility work. ' * 4, 'created_at': t}
+            for t in stamps
+        ])
+        db.session.execute(insert(ProgressLog), [
+            {'user_id': user_id, 'weight': 75.0, 'body_fat_percentage': 18.5, 'logged_at': t}
+            for t in stamps
+        ])
+        db.session.commit()
+
+
+def measure_export(client, headers, fmt):
+    tracemalloc.start()
+    started = time.perf_counter()
+    response = client.get(f'/api/export?format={fmt}', headers=headers, buffered=False)
+    size = 0
+    for chunk in response.response:
+        size += len(chunk)
+    response.close()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, size, elapsed
+
+
+def measure_to_dict(app, models, user_id):
+    from flask import jsonify
+
+    tracemalloc.start()
+    with app.app_context():
+        jsonify({model.__tablename__: [row.to_dict() for row in model.query.filter_by(user_id=user_id).all()]
+                 for model in models})
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs=2, default=[20000, 100000],
+                        help='Rows per type for the small and large run')
+    parser.add_argument('--format', default='ndjson', choices=['ndjson', 'csv'])
+    parser.add_argument('--max-growth', type=float, default=2.0,
+                        help='Allowed ratio of large to small peak memory')
+    args = parser.parse_args()
+
+    os.environ['AI_WARMUP'] = 'lazy'
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench_export.db')
+
+    sys.path.insert(0, BACKEND_DIR)
+    from app import create_app, db
+    from app.models import ChatMessage, ProgressLog, Workout
+
+    app = create_app()
+    client = app.test_client()
+    models = (Workout, ChatMessage, ProgressLog)
+
+    response = client.post('/api/auth/register', json={
+        'email': 'export@example.com', 'username': 'export', 'password': 'password'
+    })
+    headers = {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+    user_id = response.get_json()['user']['id']
+
+    peaks = []
+    for rows in args.rows:
+        with app.app_context():
+            seed(db, models, user_id, rows)
+
+        peak, size, elapsed = measure_export(client, headers, args.format)
+        baseline = measure_to_dict(app, models, user_id)
+        peaks.append(peak)
+
+        print(f"{rows:>8} rows/type  export={size / 1e6:8.1f} MB in {elapsed:5.1f}s  "
+              f"streaming peak={peak / 1e6:6.1f} MB  to_dict+jsonify peak={baseline / 1e6:7.1f} MB")
+
+    growth = peaks[1] / peaks[0] if peaks[0] else float('inf')
+    print(f"\nStreaming peak grew {growth:.2f}x for {args.rows[1] / args.rows[0]:.0f}x the rows")
+    if growth > args.max_growth:
+        print(f"FAIL: peak memory grew more than {args.max_growth}x")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
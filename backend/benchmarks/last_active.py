@@ -0,0 +1,144 @@
+"""
+last_active Benchmark - users-row writes and chat latency, write-through vs buffered
+
+Runs the same chat load twice, each time against a fresh SQLite file seeded
+with `flask seed` users:
+
+    write-through  ACTIVITY_FLUSH_SECONDS=0, one UPDATE users per chat turn
+    buffered       ACTIVITY_FLUSH_SECONDS=--flush-seconds, one batched UPDATE per flush
+
+Each thread sends chat messages as users taken in turn from the pool, for a
+fixed duration. The chat route answers with a stub coach, so the numbers
+reflect the database work. Reports turns/sec, p50/p99 latency, failed
+requests, and the UPDATE users statements and rows written per chat turn.
+
+Run from the backend directory:
+
+    python benchmarks/last_active.py --threads 16 --users 200 --duration 10
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+class StubCoach:
+    """Answers instantly, so only the route's own database work is measured"""
+
+    def chat(self, message, user_data=None):
+        return {'response': 'Nice work, keep it up.', 'intent_detected': 'motivation',
+                'brains_used': ['NLP'], 'processing_time_ms': 0.0}
+
+
+def run(create_app, flush_seconds, args):
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import event
+    from app import db
+    from app.routes import chat as chat_routes
+    from app.services.activity import activity_buffer
+    from app.services.seed import seed_database
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench_last_active.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + db_path, 'ACTIVITY_FLUSH_SECONDS': flush_seconds})
+    stub = StubCoach()
+    chat_routes._get_coach = lambda: stub
+
+    writes = {'users': 0, 'all': 0}
+
+    with app.app_context():
+        seed_database(args.users, 0, 0, 0, seed=1)
+        tokens = [{'Authorization': f'Bearer {create_access_token(identity=user_id)}'}
+                  for user_id in range(1, args.users + 1)]
+
+        @event.listens_for(db.engine, 'before_cursor_execute')
+        def count_writes(_conn, _cursor, statement, _parameters, _context, _executemany):
+            verb = statement.lstrip()[:6].upper()
+            if verb in ('INSERT', 'UPDATE', 'DELETE'):
+                writes['all'] += 1
+                if statement.lstrip().upper().startswith('UPDATE USERS'):
+                    writes['users'] += 1
+
+    before = activity_buffer.get_stats()
+    latencies, failures = [], [0]
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + args.duration
+
+    def worker(n):
+        client = app.test_client()
+        local, failed = [], 0
+        turn = n
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            response = client.post('/api/chat/message', headers=tokens[turn % len(tokens)],
+                                   json={'message': f'turn {turn}'})
+            local.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                failed += 1
+            turn += args.threads
+        with lock:
+            latencies.extend(local)
+            failures[0] += failed
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # What is still buffered would be written at the next flush (or at exit)
+    activity_buffer.flush()
+    after = activity_buffer.get_stats()
+    turns = len(latencies)
+    return {
+        'turns': turns,
+        'rate': turns / args.duration,
+        'p50': percentile(latencies, 50),
+        'p99': percentile(latencies, 99),
+        'failed': failures[0],
+        'users_updates': writes['users'],
+        'rows_written': after['rows_written'] - before['rows_written'],
+        'writes': writes['all'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--flush-seconds', type=float, default=5, help='Flush interval of the buffered run')
+    args = parser.parse_args()
+
+    os.environ['AI_WARMUP'] = 'lazy'
+    os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'unused.db'))
+    sys.path.insert(0, BACKEND_DIR)
+    from app import create_app
+
+    results = {
+        'write-through': run(create_app, 0, args),
+        'buffered': run(create_app, args.flush_seconds, args),
+    }
+
+    print(f"{args.threads} threads, {args.users} users, {args.duration:.0f}s each\n")
+    print(f"{'mode':<15}{'turns/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'failed':>8}"
+          f"{'UPDATE users':>14}{'per turn':>10}{'rows':>8}{'writes/turn':>13}")
+    for name, r in results.items():
+        turns = r['turns'] or 1
+        print(f"{name:<15}{r['rate']:>9.1f}{r['p50']:>9.2f}{r['p99']:>9.2f}{r['failed']:>8}"
+              f"{r['users_updates']:>14}{r['users_updates'] / turns:>10.3f}{r['rows_written']:>8}"
+              f"{r['writes'] / turns:>13.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Login Throughput Benchmark - logins/sec (and per core) through /api/auth/login
+
+Seeds users into a temporary SQLite database, then has many threads log in
+concurrently through the Flask test client for a fixed duration.
+
+Run from the backend directory:
+
+    python benchmarks/login_throughput.py --threads 16 --duration 10
+    python benchmarks/login_throughput.py --hash-workers 0      # hash inline
+    python benchmarks/login_throughput.py --compare             # inline vs pool
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def usable_cores():
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+def run(args):
+    if args.hash_workers is not None:
+        os.environ['PASSWORD_HASH_WORKERS'] = str(args.hash_workers)
+    if args.hash_method:
+        os.environ['PASSWORD_HASH_METHOD'] = args.hash_method
+    os.environ['AI_WARMUP'] = 'lazy'
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench_login.db')
+
+    sys.path.insert(0, BACKEND_DIR)
+    from app import create_app
+    from app.services.password_hasher import password_hasher
+
+    app = create_app()
+    client = app.test_client()
+
+    users = [(f'bench{i}@example.com', f'password-{i}') for i in range(args.users)]
+    for i, (email, password) in enumerate(users):
+        client.post('/api/auth/register', json={'email': email, 'username': f'bench{i}', 'password': password})
+
+    latencies = []
+    failures = [0]
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + args.duration
+
+    def worker(offset):
+        local_client = app.test_client()
+        local_latencies = []
+        local_failures = 0
+        i = offset
+        while time.perf_counter() < stop_at:
+            email, password = users[i % len(users)]
+            started = time.perf_counter()
+            response = local_client.post('/api/auth/login', json={'email': email, 'password': password})
+            local_latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                local_failures += 1
+            i += 1
+        with lock:
+            latencies.extend(local_latencies)
+            failures[0] += local_failures
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    cores = usable_cores()
+    succeeded = len(latencies) - failures[0]
+    rate = succeeded / elapsed
+
+    print(f"hash method={password_hasher.canonical_method} pool workers={password_hasher.workers} "
+          f"threads={args.threads} cores={cores}")
+    print(f"  logins:        {succeeded} ok, {failures[0]} failed in {elapsed:.1f}s")
+    print(f"  throughput:    {rate:.1f} logins/sec  ({rate / cores:.1f} logins/sec/core)")
+    print(f"  latency (ms):  p50={percentile(latencies, 50):.1f}  p99={percentile(latencies, 99):.1f}")
+
+    password_hasher.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=16, help='Concurrent login threads')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds to run')
+    parser.add_argument('--users', type=int, default=20, help='Users to seed')
+    parser.add_argument('--hash-workers', type=int, default=None, help='PASSWORD_HASH_WORKERS (0 = inline)')
+    parser.add_argument('--hash-method', default=None, help='PASSWORD_HASH_METHOD')
+    parser.add_argument('--compare', action='store_true', help='Run inline and pooled hashing back to back')
+    args = parser.parse_args()
+
+    if not args.compare:
+        run(args)
+        return
+
+    for workers in (0, usable_cores()):
+        command = [sys.executable, __file__, '--threads', str(args.threads), '--duration', str(args.duration),
+                   '--users', str(args.users), '--hash-workers', str(workers)]
+        if args.hash_method:
+            command += ['--hash-method', args.hash_method]
+        subprocess.run(command, check=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Metrics Overhead Benchmark - request latency with and without /metrics instrumentation
+
+Builds one app with METRICS_ENABLED off and one with it on, each against its
+own fresh SQLite file seeded with the same workouts. Both then run the same
+mix of requests (workout listing, stats, profile and a query-heavy create).
+The requests are interleaved in rounds so that drift affects both apps
+equally. Reports the median per-request latency, the difference per request
+and the time taken to render /metrics.
+
+Run from the backend directory:
+
+    python benchmarks/metrics_overhead.py --requests 2000 --workouts 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+REQUESTS = (
+    ('GET', '/api/workouts?limit=50', None),
+    ('GET', '/api/workouts/stats', None),
+    ('GET', '/api/profile', None),
+    ('POST', '/api/workouts', {'workout_type': 'legs', 'duration_minutes': 30, 'status': 'completed'}),
+)
+
+
+def build(create_app, enabled, workouts):
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench_metrics.db')
+    app = create_app({'METRICS_ENABLED': enabled, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + db_path})
+    client = app.test_client()
+
+    response = client.post('/api/auth/register', json={
+        'email': 'metrics@example.com', 'username': 'metrics', 'password': 'password'
+    }).get_json()
+    headers = {'Authorization': f"Bearer {response['access_token']}"}
+    client.post('/api/workouts/bulk', headers=headers, json=[
+        {'workout_type': 'cardio', 'duration_minutes': 20 + i % 40, 'status': 'completed'}
+        for i in range(workouts)
+    ])
+    return app, client, headers
+
+
+def run_round(client, headers, method, path, body):
+    started = time.perf_counter()
+    client.open(path, method=method, headers=headers, json=body)
+    return (time.perf_counter() - started) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000, help='Requests per app, spread over the mix')
+    parser.add_argument('--workouts', type=int, default=200)
+    args = parser.parse_args()
+
+    os.environ['AI_WARMUP'] = 'lazy'
+    os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'unused.db'))
+    sys.path.insert(0, BACKEND_DIR)
+    from app import create_app
+
+    apps = {
+        'off': build(create_app, False, args.workouts),
+        'on': build(create_app, True, args.workouts),
+    }
+    samples = {name: {path: [] for _, path, _ in REQUESTS} for name in apps}
+
+    # Warm both apps up before measuring
+    for name, (_, client, headers) in apps.items():
+        for method, path, body in REQUESTS:
+            run_round(client, headers, method, path, body)
+
+    for i in range(args.requests):
+        method, path, body = REQUESTS[i % len(REQUESTS)]
+        for name, (_, client, headers) in apps.items():
+            samples[name][path].append(run_round(client, headers, method, path, body))
+
+    print(f"{'request':<28}{'off (us)':>12}{'on (us)':>12}{'overhead':>12}")
+    for method, path, _ in REQUESTS:
+        off = statistics.median(samples['off'][path])
+        on = statistics.median(samples['on'][path])
+        print(f"{method + ' ' + path:<28}{off:>12.0f}{on:>12.0f}{on - off:>+10.0f}us")
+
+    _, client, _ = apps['on']
+    render = [run_round(client, {}, 'GET', '/metrics', None) for _ in range(50)]
+    size = len(client.get('/metrics').data)
+    print(f"\n/metrics render: {statistics.median(render):.0f} us for {size / 1024:.1f} KB")
+
+
+if __name__ == '__main__':
+    main()
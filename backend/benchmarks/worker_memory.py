@@ -0,0 +1,130 @@
+"""
+Worker Memory Benchmark - RSS/PSS per gunicorn worker with and without preloading
+
+Starts gunicorn twice (GUNICORN_PRELOAD=false, then true), waits until the AI
+brains report ready, and reads each worker's memory from /proc. PSS splits
+shared pages between the processes sharing them, so it shows the real
+per-worker cost of copy-on-write sharing; RSS counts shared pages in full.
+
+Linux only. Run from the backend directory:
+
+    python benchmarks/worker_memory.py --workers 4
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def read_memory_kb(pid):
+    """Return (rss, pss, uss) in kB from /proc/<pid>/smaps_rollup"""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                values[parts[0][:-1]] = int(parts[1])
+    uss = values.get('Private_Clean', 0) + values.get('Private_Dirty', 0)
+    return values.get('Rss', 0), values.get('Pss', 0), uss
+
+
+def child_pids(parent_pid):
+    children = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # Field 4 is the parent pid; the command name may contain spaces
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == parent_pid:
+            children.append(int(entry))
+    return children
+
+
+def wait_until_ready(url, workers, timeout):
+    """Poll /ready until enough consecutive 200s suggest every worker is up"""
+    deadline = time.time() + timeout
+    streak = 0
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=5) as response:
+                streak = streak + 1 if response.status == 200 else 0
+        except (urllib.error.URLError, ConnectionError):
+            streak = 0
+        if streak >= workers * 3:
+            return True
+        time.sleep(0.2)
+    return False
+
+
+def measure(preload, workers, threads, port, timeout):
+    env = dict(os.environ)
+    env.update({
+        'GUNICORN_PRELOAD': 'true' if preload else 'false',
+        'GUNICORN_WORKERS': str(workers),
+        'GUNICORN_THREADS': str(threads),
+        'GUNICORN_BIND': f'127.0.0.1:{port}',
+        'GUNICORN_ACCESS_LOG': '',
+        'AI_WARMUP': 'eager',
+        'DATABASE_URL': env.get('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.gettempdir(), 'bench_memory.db')),
+    })
+
+    master = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'],
+        cwd=BACKEND_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+    try:
+        if not wait_until_ready(f'http://127.0.0.1:{port}/ready', workers, timeout):
+            raise RuntimeError('gunicorn did not become ready in time')
+
+        rows = [read_memory_kb(pid) for pid in child_pids(master.pid)]
+        master_rss, master_pss, _ = read_memory_kb(master.pid)
+        return rows, (master_rss, master_pss)
+    finally:
+        master.send_signal(signal.SIGTERM)
+        master.wait(timeout=30)
+
+
+def report(label, rows, master):
+    n = len(rows) or 1
+    rss = sum(r[0] for r in rows) / n / 1024
+    pss = sum(r[1] for r in rows) / n / 1024
+    uss = sum(r[2] for r in rows) / n / 1024
+    total_pss = (sum(r[1] for r in rows) + master[1]) / 1024
+    print(f"{label:<12} workers={len(rows):<3} RSS/worker={rss:8.1f} MB  "
+          f"PSS/worker={pss:8.1f} MB  USS/worker={uss:8.1f} MB  total PSS={total_pss:8.1f} MB")
+    return total_pss
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--timeout', type=float, default=300, help='Seconds to wait for warm-up')
+    args = parser.parse_args()
+
+    results = {}
+    for preload in (False, True):
+        label = 'preload' if preload else 'no-preload'
+        rows, master = measure(preload, args.workers, args.threads, args.port, args.timeout)
+        results[label] = report(label, rows, master)
+
+    saved = results['no-preload'] - results['preload']
+    print(f"\nPreloading saves {saved:.1f} MB of PSS across {args.workers} workers")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Gunicorn Configuration - multi-worker production server
+
+    gunicorn -c gunicorn.conf.py
+
+The app (and with it every AI model) is loaded once in the master process
+before the workers are forked, so all workers share those memory pages
+copy-on-write instead of each loading its own copy. Database connections are
+opened after the fork so no socket is shared between processes.
+"""
+import gc
+import multiprocessing
+import os
+
+# Load the AI brains synchronously in the master; a background warm-up
+# thread would not survive the fork
+if os.getenv('GUNICORN_PRELOAD', 'true').lower() in ('1', 'true', 'yes'):
+    os.environ.setdefault('AI_WARMUP', 'eager')
+    preload_app = True
+else:
+    preload_app = False
+
+wsgi_app = 'wsgi:app'
+bind = os.getenv('GUNICORN_BIND', f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', 5000)}")
+
+# See "Production server" in README.md for sizing guidance
+workers = int(os.getenv('GUNICORN_WORKERS', min(multiprocessing.cpu_count(), 4)))
+# Read by the app to size its per-worker process pools (password hashing)
+os.environ['GUNICORN_WORKERS'] = str(workers)
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+worker_class = 'gthread'
+
+# AI responses (and SSE streams) can take a while
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then to cap slow memory growth
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 0))
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-') or None
+errorlog = '-'
+
+
+def when_ready(server):
+    # Move everything allocated while preloading into the permanent
+    # generation so the garbage collector never touches (and copies) it
+    if preload_app:
+        gc.freeze()
+    server.log.info("Fitness API ready (preload=%s, workers=%s, threads=%s)", preload_app, workers, threads)
+
+
+def post_fork(server, worker):
+    """Drop DB connections inherited from the master"""
+    if not preload_app:
+        return
+
+    from app import db
+    from wsgi import app
+
+    # Every bind, including the read-only one (DATABASE_READ_URL)
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def worker_exit(server, worker):
+    """Write buffered last_active times before the worker goes away"""
+    from app.services.activity import activity_buffer
+
+    activity_buffer.flush()
@@ -0,0 +1,40 @@
+"""Add composite per-user indexes for listing endpoints
+
+Revision ID: 3f1a9c2d7b10
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1a9c2d7b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Tables may already exist from db.create_all(), so only add what is missing
+    with op.batch_alter_table('workouts', schema=None) as batch_op:
+        batch_op.create_index('ix_workouts_user_status_created', ['user_id', 'status', 'created_at'], unique=False, if_not_exists=True)
+        batch_op.create_index('ix_workouts_user_created', ['user_id', 'created_at'], unique=False, if_not_exists=True)
+
+    with op.batch_alter_table('chat_messages', schema=None) as batch_op:
+        batch_op.create_index('ix_chat_messages_user_created', ['user_id', 'created_at'], unique=False, if_not_exists=True)
+
+    with op.batch_alter_table('progress_logs', schema=None) as batch_op:
+        batch_op.create_index('ix_progress_logs_user_logged', ['user_id', 'logged_at'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    with op.batch_alter_table('progress_logs', schema=None) as batch_op:
+        batch_op.drop_index('ix_progress_logs_user_logged', if_exists=True)
+
+    with op.batch_alter_table('chat_messages', schema=None) as batch_op:
+        batch_op.drop_index('ix_chat_messages_user_created', if_exists=True)
+
+    with op.batch_alter_table('workouts', schema=None) as batch_op:
+        batch_op.drop_index('ix_workouts_user_created', if_exists=True)
+        batch_op.drop_index('ix_workouts_user_status_created', if_exists=True)
@@ -0,0 +1,43 @@
+"""Add per-user workout stats summary table
+
+Revision ID: 8c4e2b7a91d3
+Revises: 3f1a9c2d7b10
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c4e2b7a91d3'
+down_revision = '3f1a9c2d7b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # db.create_all() may already have created the (empty) table
+    if 'user_workout_stats' in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table('user_workout_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total_workouts', sa.Integer(), nullable=False),
+    sa.Column('completed_workouts', sa.Integer(), nullable=False),
+    sa.Column('planned_workouts', sa.Integer(), nullable=False),
+    sa.Column('skipped_workouts', sa.Integer(), nullable=False),
+    sa.Column('total_minutes', sa.Integer(), nullable=False),
+    sa.Column('total_calories', sa.Integer(), nullable=False),
+    sa.Column('week_start', sa.DateTime(), nullable=True),
+    sa.Column('workouts_this_week', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    # Summaries are built lazily on first read, or eagerly with
+    # `flask rebuild-workout-stats`
+
+
+def downgrade():
+    op.drop_table('user_workout_stats')
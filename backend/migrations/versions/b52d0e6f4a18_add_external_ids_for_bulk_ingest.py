@@ -0,0 +1,44 @@
+"""Add client external ids to workouts and progress logs for bulk ingestion
+
+Revision ID: b52d0e6f4a18
+Revises: 8c4e2b7a91d3
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b52d0e6f4a18'
+down_revision = '8c4e2b7a91d3'
+branch_labels = None
+depends_on = None
+
+TABLES = {
+    'workouts': 'uq_workouts_user_external_id',
+    'progress_logs': 'uq_progress_logs_user_external_id',
+}
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    for table, index in TABLES.items():
+        # db.create_all() may already have created the column on a fresh database
+        has_column = any(c['name'] == 'external_id' for c in inspector.get_columns(table))
+
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            if not has_column:
+                batch_op.add_column(sa.Column('external_id', sa.String(length=64), nullable=True))
+            batch_op.create_index(index, ['user_id', 'external_id'], unique=True, if_not_exists=True)
+
+
+def downgrade():
+    for table, index in TABLES.items():
+        # Dropping the column makes SQLite recreate the table, and the batch
+        # recreate does not accept if_exists, so drop the index on its own first
+        op.drop_index(index, table_name=table, if_exists=True)
+
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('external_id')
@@ -0,0 +1,49 @@
+"""Add compressed chat archive table
+
+Revision ID: d7e3a5c1f920
+Revises: b52d0e6f4a18
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7e3a5c1f920'
+down_revision = 'b52d0e6f4a18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # db.create_all() may already have created the (empty) table
+    if 'chat_archives' in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table('chat_archives',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('period', sa.String(length=7), nullable=False),
+    sa.Column('message_count', sa.Integer(), nullable=False),
+    sa.Column('first_created_at', sa.DateTime(), nullable=False),
+    sa.Column('last_created_at', sa.DateTime(), nullable=False),
+    sa.Column('first_message_id', sa.Integer(), nullable=False),
+    sa.Column('last_message_id', sa.Integer(), nullable=False),
+    sa.Column('codec', sa.String(length=10), nullable=False),
+    sa.Column('payload', sa.LargeBinary(), nullable=False),
+    sa.Column('raw_bytes', sa.Integer(), nullable=False),
+    sa.Column('compressed_bytes', sa.Integer(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('chat_archives', schema=None) as batch_op:
+        batch_op.create_index('ix_chat_archives_user_last', ['user_id', 'last_created_at', 'last_message_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('chat_archives', schema=None) as batch_op:
+        batch_op.drop_index('ix_chat_archives_user_last')
+
+    op.drop_table('chat_archives')
@@ -0,0 +1,44 @@
+"""Add updated_at to workouts and progress logs for conditional GET validators
+
+Revision ID: e4b8c2f6a703
+Revises: d7e3a5c1f920
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b8c2f6a703'
+down_revision = 'd7e3a5c1f920'
+branch_labels = None
+depends_on = None
+
+# table -> (index, expression existing rows are backfilled from)
+TABLES = {
+    'workouts': ('ix_workouts_user_updated', 'COALESCE(completed_at, created_at)'),
+    'progress_logs': ('ix_progress_logs_user_updated', 'logged_at'),
+}
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    for table, (index, backfill) in TABLES.items():
+        # db.create_all() may already have created the column on a fresh database
+        has_column = any(c['name'] == 'updated_at' for c in inspector.get_columns(table))
+
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            if not has_column:
+                batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+            batch_op.create_index(index, ['user_id', 'updated_at'], unique=False, if_not_exists=True)
+
+        op.execute(f'UPDATE {table} SET updated_at = {backfill} WHERE updated_at IS NULL')
+
+
+def downgrade():
+    for table, (index, _backfill) in TABLES.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(index)
+            batch_op.drop_column('updated_at')
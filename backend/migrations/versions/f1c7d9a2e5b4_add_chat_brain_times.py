@@ -0,0 +1,32 @@
+"""Add per-brain execution times to chat messages
+
+Revision ID: f1c7d9a2e5b4
+Revises: e4b8c2f6a703
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c7d9a2e5b4'
+down_revision = 'e4b8c2f6a703'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    # db.create_all() may already have created the column on a fresh database
+    if any(c['name'] == 'brain_times_ms' for c in inspector.get_columns('chat_messages')):
+        return
+
+    with op.batch_alter_table('chat_messages', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('brain_times_ms', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('chat_messages', schema=None) as batch_op:
+        batch_op.drop_column('brain_times_ms')
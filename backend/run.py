@@ -4,10 +4,11 @@ Flask Application Entry Point
 import os
 from app import create_app
 
-# Create Flask app
-app = create_app()
-
 if __name__ == '__main__':
+    # Created here, not at import: hashing pool processes import this module
+    # as __mp_main__. `flask` (FLASK_APP=run.py) finds create_app() instead.
+    app = create_app()
+    
     host = os.getenv('HOST', '0.0.0.0')
     port = int(os.getenv('PORT', 5000))
     debug = os.getenv('FLASK_ENV') == 'development'
@@ -24,6 +25,7 @@ if __name__ == '__main__':
 
 📋 Available endpoints:
    - GET  /health              Health check
+   - GET  /ready               Readiness (AI brains loaded)
    - POST /api/auth/register   Register user
    - POST /api/auth/login      Login user
    - GET  /api/auth/me         Get current user
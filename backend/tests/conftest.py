@@ -0,0 +1,84 @@
+"""
+Shared fixtures: an app on an in-memory SQLite database and a registered user
+"""
+import os
+import sys
+import threading
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, BACKEND_DIR)
+
+# Read at import time by the services, so set before the app is imported.
+# Hash inline with a cheap method; the tests do not exercise the pool.
+os.environ.setdefault('AI_WARMUP', 'lazy')
+os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+os.environ.setdefault('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:1000')
+
+import pytest  # noqa: E402
+from app import create_app, db  # noqa: E402
+from app.services.ai_service import EXECUTION_SEQUENTIAL, ai_coach  # noqa: E402
+
+TEST_CONFIG = {
+    'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+    'AI_WARMUP': 'lazy',
+    'ACTIVITY_FLUSH_SECONDS': 0,
+    'COMPRESSION_ENABLED': False,
+}
+
+
+@pytest.fixture
+def make_app():
+    """Build apps with TEST_CONFIG plus overrides; their tables are dropped afterwards"""
+    apps = []
+
+    def factory(**overrides):
+        app = create_app({**TEST_CONFIG, **overrides})
+        apps.append(app)
+        return app
+
+    yield factory
+
+    for app in apps:
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+            for engine in db.engines.values():
+                engine.dispose()
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(client):
+    response = client.post('/api/auth/register', json={
+        'email': 'test@example.com', 'username': 'tester', 'password': 'password'
+    })
+    assert response.status_code == 201, response.get_json()
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+
+@pytest.fixture
+def cold_coach(monkeypatch):
+    """The global AI coach, reset to its not-yet-loaded state for one test"""
+    monkeypatch.setattr(ai_coach, 'status', 'cold')
+    monkeypatch.setattr(ai_coach, 'warmup_error', None)
+    monkeypatch.setattr(ai_coach, 'warmup_time_ms', None)
+    monkeypatch.setattr(ai_coach, '_controller', None)
+    monkeypatch.setattr(ai_coach, '_brains_loaded', False)
+    monkeypatch.setattr(ai_coach, '_ready', threading.Event())
+    monkeypatch.setattr(ai_coach, '_warmup_thread', None)
+    monkeypatch.setattr(ai_coach, 'execution_mode', EXECUTION_SEQUENTIAL)
+    monkeypatch.setattr(ai_coach, 'execution_error', None)
+    monkeypatch.setattr(ai_coach, '_runner', None)
+    monkeypatch.setattr(ai_coach, '_ml_batching', None)
+    monkeypatch.setattr(ai_coach, '_ml_batching_error', None)
+    ai_coach.cache.clear()
+    return ai_coach
@@ -0,0 +1,65 @@
+"""
+Bulk ingest: duplicates reported once, oversized requests rejected whole, single-row validation
+"""
+import json
+from app import db
+from app.models import Workout
+from app.services import bulk_ingest
+from app.services.bulk_ingest import BulkIngest
+
+
+def _workouts(*external_ids):
+    return [{'external_id': external_id, 'workout_type': 'cardio', 'duration_minutes': 30}
+            for external_id in external_ids]
+
+
+def test_retried_chunk_counts_duplicates_once(app, client, auth_headers, monkeypatch):
+    first = client.post('/api/workouts/bulk', headers=auth_headers, json=_workouts('a', 'b'))
+    assert first.status_code == 200
+    assert first.get_json()['inserted'] == 2
+
+    # The first look-up misses 'b', as if a concurrent request committed it
+    # in between; the insert then fails on the unique index and is retried
+    lookup = BulkIngest._existing_external_ids
+    calls = []
+
+    def racing_lookup(self, external_ids):
+        calls.append(external_ids)
+        existing = lookup(self, external_ids)
+        return existing - {'b'} if len(calls) == 1 else existing
+
+    monkeypatch.setattr(BulkIngest, '_existing_external_ids', racing_lookup)
+
+    second = client.post('/api/workouts/bulk', headers=auth_headers, json=_workouts('a', 'b', 'c'))
+    assert second.status_code == 200
+    report = second.get_json()
+    assert len(calls) == 2
+    assert report['inserted'] == 1
+    assert report['duplicates'] == 2
+    assert sorted(report['duplicate_external_ids']) == ['a', 'b']
+
+    with app.app_context():
+        assert db.session.query(Workout).count() == 3
+
+
+def test_oversized_ndjson_is_rejected_before_any_chunk_is_written(app, client, auth_headers, monkeypatch):
+    monkeypatch.setattr(bulk_ingest, 'BULK_MAX_RECORDS', 3)
+    body = '\n'.join(json.dumps(record) for record in _workouts('a', 'b', 'c', 'd'))
+
+    response = client.post('/api/workouts/bulk?chunk_size=1', headers=auth_headers,
+                           data=body, content_type='application/x-ndjson')
+
+    assert response.status_code == 413
+    assert response.get_json()['inserted'] == 0
+    with app.app_context():
+        assert db.session.query(Workout).count() == 0
+
+
+def test_bulk_accepts_the_intensities_single_rows_accept(client, auth_headers):
+    single = client.post('/api/workouts/', headers=auth_headers, json={'workout_type': 'yoga', 'intensity': 'moderate'})
+    assert single.status_code == 201
+
+    records = [{'external_id': 'a', 'workout_type': 'yoga', 'intensity': 'moderate'}]
+    report = client.post('/api/workouts/bulk', headers=auth_headers, json=records).get_json()
+    assert report['inserted'] == 1
+    assert report['failed'] == 0
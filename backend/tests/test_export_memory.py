@@ -0,0 +1,82 @@
+"""
+/api/export streams: peak Python memory stays flat as the history doubles
+
+benchmarks/export_memory.py measures the same thing at production sizes.
+"""
+import tracemalloc
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import insert
+from app import db
+from app.models import ChatMessage, ProgressLog, Workout
+
+ROWS_PER_TYPE = 5000
+# Doubling the history adds about 6 MB (NDJSON) and 2.5 MB (CSV) to the body.
+# A buffered export's peak grows by about twice that; a streamed one's stays
+# flat, so any growth above a fraction of the body means rows are held.
+MAX_PEAK_GROWTH_RATIO = 0.2
+
+
+@pytest.fixture
+def add_history(app, client, auth_headers):
+    user_id = client.get('/api/auth/me', headers=auth_headers).get_json()['user']['id']
+    added = []
+
+    def add():
+        start = datetime(2024, 1, 1) + timedelta(minutes=len(added) * ROWS_PER_TYPE)
+        stamps = [start + timedelta(minutes=i) for i in range(ROWS_PER_TYPE)]
+        added.append(stamps)
+
+        with app.app_context():
+            db.session.execute(insert(Workout), [
+                {'user_id': user_id, 'workout_type': 'cardio', 'duration_minutes': 30, 'calories_burned': 250,
+                 'intensity': 'medium', 'status': 'completed', 'notes': 'Morning run', 'created_at': t}
+                for t in stamps
+            ])
+            db.session.execute(insert(ChatMessage), [
+                {'user_id': user_id, 'message': 'What should I train today?',
+                 'response': 'Try a 30 minute run followed by mobility work. ' * 4, 'created_at': t}
+                for t in stamps
+            ])
+            db.session.execute(insert(ProgressLog), [
+                {'user_id': user_id, 'weight': 75.0, 'body_fat_percentage': 18.5, 'logged_at': t}
+                for t in stamps
+            ])
+            db.session.commit()
+
+    return add
+
+
+def _export_peak(client, auth_headers, fmt):
+    """(body size, line count, peak traced bytes) of one export"""
+    tracemalloc.start()
+    try:
+        response = client.get(f'/api/export?format={fmt}', headers=auth_headers, buffered=False)
+        assert response.status_code == 200
+        size = lines = 0
+        for chunk in response.response:
+            size += len(chunk)
+            lines += chunk.count(b'\n')
+        response.close()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return size, lines, peak
+
+
+@pytest.mark.parametrize('fmt', ['ndjson', 'csv'])
+def test_export_peak_memory_does_not_grow_with_history(client, auth_headers, add_history, fmt):
+    add_history()
+    # One-off allocations (imports, compiled statements) are not part of the export
+    _export_peak(client, auth_headers, fmt)
+    size, lines, peak = _export_peak(client, auth_headers, fmt)
+
+    add_history()
+    doubled_size, doubled_lines, doubled_peak = _export_peak(client, auth_headers, fmt)
+
+    assert lines >= 3 * ROWS_PER_TYPE
+    assert doubled_lines >= 6 * ROWS_PER_TYPE
+    growth = doubled_size - size
+    assert doubled_peak - peak < MAX_PEAK_GROWTH_RATIO * growth, (
+        f'{fmt} export peak went from {peak} to {doubled_peak} bytes as the body grew by {growth} bytes'
+    )
@@ -0,0 +1,55 @@
+"""
+/metrics: optional bearer token, SQL timing survives failed statements, streamed bodies are counted
+"""
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from app import db
+from app.services.metrics import request_queries
+
+
+def test_metrics_are_open_without_a_token(client):
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert b'http_requests_total' in response.data
+
+
+def test_metrics_token_is_required_when_set(make_app):
+    client = make_app(METRICS_TOKEN='s3cret').test_client()
+
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+
+    response = client.get('/metrics', headers={'Authorization': 'Bearer s3cret'})
+    assert response.status_code == 200
+    assert b'db_queries_per_request' in response.data
+
+
+def test_failed_statement_does_not_leak_its_start_time(app):
+    with app.app_context():
+        with db.engine.connect() as connection:
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    connection.execute(text('SELECT * FROM no_such_table'))
+            connection.execute(text('SELECT 1'))
+            assert connection.info.get('query_started') == []
+
+
+def test_streamed_body_is_measured_when_the_response_closes(client, auth_headers):
+    client.post('/api/workouts/', headers=auth_headers, json={'workout_type': 'cardio', 'duration_minutes': 30})
+    labels = ('export', 'export.export_history', 'GET')
+
+    def observed():
+        series = request_queries._series.get(labels)
+        return (sum(series[:-1]), series[-1]) if series else (0, 0)
+
+    before = observed()
+    response = client.get('/api/export?format=ndjson', headers=auth_headers, buffered=False)
+    assert b''.join(response.response)
+    assert observed() == before
+
+    response.close()
+    requests, queries = observed()
+    assert requests == before[0] + 1
+    # One read per resource happens while the body is generated
+    assert queries - before[1] >= 3
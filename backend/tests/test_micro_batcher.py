@@ -0,0 +1,61 @@
+"""
+ML micro-batching: the model attribute is explicit, and a stuck batch never holds a request
+"""
+import threading
+import time
+import numpy as np
+import pytest
+from app.services.micro_batcher import BatchedModel, install_batching
+
+
+class Model:
+    def __init__(self, stuck=None):
+        self.stuck = stuck
+        self.batches = []
+
+    def predict(self, X):
+        self.batches.append(len(X))
+        if self.stuck is not None and len(self.batches) == 1:
+            self.stuck.wait()
+        return X.sum(axis=1)
+
+
+class Integration:
+    def __init__(self, **attributes):
+        self.model_path = 'models/xgb.json'
+        self.__dict__.update(attributes)
+
+
+def test_the_only_model_is_batched_without_configuration():
+    integration = Integration(classifier=Model())
+    batched = install_batching(integration)
+
+    assert integration.classifier is batched
+    assert batched.get_stats()['attribute'] == 'classifier'
+    assert batched.predict(np.array([[1, 2]])).tolist() == [3]
+
+
+def test_missing_or_ambiguous_model_fails_loudly():
+    with pytest.raises(ValueError, match=r'\(none\)'):
+        install_batching(Integration())
+    with pytest.raises(ValueError, match='AI_BATCH_MODEL_ATTRIBUTE'):
+        install_batching(Integration(first=Model(), second=Model()))
+    with pytest.raises(ValueError, match='Integration.model is not a model'):
+        install_batching(Integration(classifier=Model()), attribute='model')
+
+    integration = Integration(first=Model(), second=Model())
+    assert install_batching(integration, attribute='second') is integration.second
+
+
+def test_stuck_batch_falls_back_to_a_direct_predict():
+    stuck = threading.Event()
+    model = Model(stuck=stuck)
+    batched = BatchedModel(model, max_wait_ms=1, timeout_ms=100)
+
+    try:
+        started = time.perf_counter()
+        assert batched.predict(np.array([[1, 2]])).tolist() == [3]
+        assert time.perf_counter() - started < 1.0
+        assert batched.get_stats()['predict']['timeouts'] == 1
+    finally:
+        stuck.set()
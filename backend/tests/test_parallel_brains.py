@@ -0,0 +1,254 @@
+"""
+Parallel execution mode: NLP first, then ML and Logic concurrently, each within its deadline
+"""
+import json
+import sys
+import threading
+import time
+import types
+from types import SimpleNamespace
+import pytest
+from app.services.ai_service import (
+    EXECUTION_PARALLEL, EXECUTION_SEQUENTIAL, FALLBACK_RESPONSE, SAFETY_FALLBACK_RESPONSE
+)
+
+BRAIN_SECONDS = 0.3
+
+
+class Brains:
+    """Stub brains with a configurable delay and output (or output factory) each, counting calls"""
+
+    def __init__(self):
+        self.delay = {'NLP': 0.05, 'ML': BRAIN_SECONDS, 'Logic': BRAIN_SECONDS, 'Personality': 0.05}
+        self.output = {
+            'NLP': {'emotion': 'motivated', 'intent': 'plan_workout', 'energy_level': 80},
+            'ML': {'workout_recommendation': 'HIIT', 'confidence': 0.8},
+            'Logic': {'safety_status': 'safe'},
+            'Personality': {'response': 'Let us do some intervals!'},
+        }
+        self.failing = set()
+        self.calls = []
+        self.release = threading.Event()
+
+    def run(self, name):
+        self.calls.append(name)
+        self.release.wait(self.delay[name])
+        if name in self.failing:
+            raise RuntimeError(f'{name} failed')
+        output = self.output[name]
+        return output() if callable(output) else output
+
+
+class StubController:
+    def __init__(self, **_brains):
+        pass
+
+    def process(self, user_message, user_data, context):
+        return SimpleNamespace(
+            final_response='Sequential reply', workout_recommendation='REST', safety_status='safe',
+            confidence_score=1.0, nlp_output=None, ml_output=None, decision_path=['NLP'],
+            total_execution_time_ms=0.0, brains_used=['NLP']
+        )
+
+    def get_stats(self):
+        return {}
+
+
+def _install_brains(monkeypatch, brains, ml_keywords=True):
+    class NLPPipeline:
+        def process(self, message):
+            return brains.run('NLP')
+
+    class MLIntegration:
+        def __init__(self, **_kwargs):
+            pass
+
+        if ml_keywords:
+            def process(self, message, user_data=None, nlp_result=None):
+                return brains.run('ML')
+        else:
+            def process(self, message):
+                return brains.run('ML')
+
+    class PrologIntegration:
+        def __init__(self, **_kwargs):
+            pass
+
+        def process(self, message, user_data=None, nlp_result=None):
+            return brains.run('Logic')
+
+    class CoachPipeline:
+        def __init__(self, **_kwargs):
+            pass
+
+        def process(self, message, user_data=None, context=None):
+            return brains.run('Personality')
+
+    modules = {
+        'central_controller': {'CentralController': StubController},
+        'nlp': {},
+        'nlp.nlp_pipeline': {'NLPPipeline': NLPPipeline},
+        'nlp.integration': {},
+        'nlp.integration.nlp_ml_integration': {'NLPMLIntegration': MLIntegration},
+        'nlp.integration.nlp_prolog_integration': {'NLPPrologIntegration': PrologIntegration},
+        'dialogue': {},
+        'dialogue.coach_pipeline': {'CoachPipeline': CoachPipeline},
+    }
+    for name, attributes in modules.items():
+        module = types.ModuleType(name)
+        module.__dict__.update(attributes)
+        monkeypatch.setitem(sys.modules, name, module)
+
+
+@pytest.fixture
+def brains(monkeypatch):
+    brains = Brains()
+    _install_brains(monkeypatch, brains)
+    yield brains
+    # Let timed-out stub calls finish instead of sleeping on in the pool
+    brains.release.set()
+
+
+@pytest.fixture
+def parallel_coach(cold_coach, brains, monkeypatch):
+    monkeypatch.setattr(cold_coach, 'execution_mode', EXECUTION_PARALLEL)
+    monkeypatch.setenv('AI_BRAIN_DEADLINES_MS', 'nlp=1000,ml=1000,logic=1000,personality=1000')
+
+    def warm_up():
+        cold_coach.warm_up()
+        assert cold_coach.active_execution_mode == EXECUTION_PARALLEL, cold_coach.execution_error
+        return cold_coach
+
+    yield warm_up
+    if cold_coach._runner is not None:
+        cold_coach._runner.shutdown()
+
+
+def _chat(coach, message='Plan my workout'):
+    started = time.perf_counter()
+    result = coach.chat(message, {'fitness_level': 'intermediate'})
+    return result, time.perf_counter() - started
+
+
+def test_ml_and_logic_run_concurrently(parallel_coach, brains):
+    coach = parallel_coach()
+    result, elapsed = _chat(coach)
+
+    assert result['response'] == 'Let us do some intervals!'
+    assert result['workout_recommendation'] == 'HIIT'
+    assert result['safety_status'] == 'safe'
+    assert result['emotion_detected'] == 'motivated'
+    assert sorted(result['brains_used']) == ['Logic', 'ML', 'NLP', 'Personality']
+    assert result['metadata']['timed_out'] == []
+    # NLP + max(ML, Logic) + Personality, not the sum of all four
+    assert elapsed < 0.05 + 2 * BRAIN_SECONDS + 0.05 - 0.1
+    assert brains.calls[0] == 'NLP' and brains.calls[-1] == 'Personality'
+
+
+def test_slow_ml_times_out_without_stalling_the_reply(parallel_coach, brains, monkeypatch):
+    brains.delay['ML'] = 10
+    monkeypatch.setenv('AI_BRAIN_DEADLINES_MS', 'ml=100')
+    coach = parallel_coach()
+    result, elapsed = _chat(coach)
+
+    assert elapsed < 1.0
+    assert result['metadata']['timed_out'] == ['ML']
+    assert result['metadata']['brain_status']['ML'] == 'timeout'
+    assert 'ML' not in result['brains_used']
+    assert result['workout_recommendation'] == 'REST'
+    assert result['response'] == 'Let us do some intervals!'
+    assert coach.get_stats()['execution']['brain_timeouts'] == {'ML': 1}
+
+    # A degraded reply is not cached
+    assert coach.cache.get_stats()['size'] == 0
+
+
+def test_missing_safety_verdict_sends_a_cautious_reply(parallel_coach, brains, monkeypatch):
+    brains.delay['Logic'] = 10
+    monkeypatch.setenv('AI_BRAIN_DEADLINES_MS', 'logic=100')
+    coach = parallel_coach()
+    result, elapsed = _chat(coach)
+
+    assert elapsed < 1.0
+    assert result['metadata']['timed_out'] == ['Logic']
+    assert result['response'] == SAFETY_FALLBACK_RESPONSE
+    assert result['safety_status'] == 'caution'
+    assert result['workout_recommendation'] == 'REST'
+    assert 'Personality' not in brains.calls
+
+
+def test_unsafe_verdict_withholds_the_recommendation(parallel_coach, brains):
+    brains.output['Logic'] = {'safety_status': 'caution'}
+    result, _ = _chat(parallel_coach())
+
+    assert result['safety_status'] == 'caution'
+    assert result['workout_recommendation'] == 'REST'
+
+
+def test_failing_personality_falls_back_to_a_generic_reply(parallel_coach, brains):
+    brains.failing.add('Personality')
+    result, _ = _chat(parallel_coach())
+
+    assert result['response'] == FALLBACK_RESPONSE
+    assert result['metadata']['brain_status']['Personality'] == 'error'
+    assert result['safety_status'] == 'safe'
+
+
+def test_brains_without_the_stage_calls_stay_sequential(cold_coach, monkeypatch):
+    brains = Brains()
+    _install_brains(monkeypatch, brains, ml_keywords=False)
+    monkeypatch.setattr(cold_coach, 'execution_mode', EXECUTION_PARALLEL)
+
+    cold_coach.warm_up()
+
+    assert cold_coach.active_execution_mode == EXECUTION_SEQUENTIAL
+    assert 'ml.process()' in cold_coach.execution_error
+    assert cold_coach.get_status()['execution_error'] == cold_coach.execution_error
+    assert cold_coach.chat('Plan my workout', {})['response'] == 'Sequential reply'
+    assert brains.calls == []
+
+
+def _read_events(response, started):
+    """(event, data, seconds since `started`) for each SSE event, as it arrives"""
+    events = []
+    for chunk in response.response:
+        for block in chunk.decode().strip().split('\n\n'):
+            fields = dict(line.split(': ', 1) for line in block.splitlines())
+            events.append((fields['event'], json.loads(fields['data']), time.perf_counter() - started))
+    return events
+
+
+def test_stream_sends_brain_results_and_tokens_as_they_arrive(parallel_coach, brains, client, auth_headers):
+    def words():
+        for word in ('Let ', 'us ', 'train!'):
+            time.sleep(0.1)
+            yield word
+
+    brains.output['Personality'] = words
+    parallel_coach()
+
+    started = time.perf_counter()
+    response = client.post('/api/chat/message?stream=1', headers=auth_headers,
+                           json={'message': 'Plan my workout'}, buffered=False)
+    events = _read_events(response, started)
+    response.close()
+
+    names = [event for event, _, _ in events]
+    assert names == ['start', 'metadata', 'metadata', 'metadata', 'token', 'token', 'token', 'done']
+
+    # NLP is reported before the slower ML and Logic brains finish
+    assert events[1][1]['brain'] == 'NLP'
+    assert events[1][2] < BRAIN_SECONDS
+    assert {events[2][1]['brain'], events[3][1]['brain']} == {'ML', 'Logic'}
+
+    # Tokens arrive as Personality generates them
+    tokens = [(data['text'], at) for event, data, at in events if event == 'token']
+    assert [text for text, _ in tokens] == ['Let ', 'us ', 'train!']
+    assert tokens[-1][1] - tokens[0][1] >= 0.15
+
+    done = events[-1][1]
+    assert done['response'] == 'Let us train!'
+    assert done['message_id']
+    # Measured at the first coach event (NLP metadata), not at `start`
+    assert 40 <= done['time_to_first_byte_ms'] < BRAIN_SECONDS * 1000
+    assert done['time_to_first_token_ms'] >= BRAIN_SECONDS * 1000
@@ -0,0 +1,110 @@
+"""
+Listing and stats endpoints must be served by the per-user indexes
+
+Every SELECT a route issues is captured and run through EXPLAIN QUERY PLAN;
+each table it reads has to be searched through an index, never scanned.
+"""
+import re
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event
+from app import db
+from app.models import ChatMessage, ProgressLog, Workout
+
+INDEXED_ACCESS = re.compile(r'^SEARCH \S+ USING (COVERING INDEX|INDEX|INTEGER PRIMARY KEY)')
+TABLE_SCAN = re.compile(r'^SCAN (\w+)')
+
+ENDPOINTS = [
+    '/api/workouts/',
+    '/api/workouts/?status=completed',
+    '/api/workouts/?offset=2&limit=2',
+    '/api/workouts/?cursor={workouts_cursor}&limit=2',
+    '/api/workouts/stats',
+    '/api/workouts/analytics',
+    '/api/profile/progress',
+    '/api/profile/progress?include_total=1',
+    '/api/profile/progress?cursor={progress_cursor}&limit=2',
+    '/api/profile/progress/series',
+    '/api/profile/statistics',
+    '/api/chat/history',
+    '/api/chat/history?offset=2&limit=2',
+    '/api/chat/history?cursor={chat_cursor}&limit=2',
+    '/api/export/?resources=workout,chat_message,progress_log',
+]
+
+
+@pytest.fixture
+def history(app, client, auth_headers):
+    """A few weeks of history for the test user and for a second user"""
+    other = client.post('/api/auth/register', json={
+        'email': 'other@example.com', 'username': 'other', 'password': 'password'
+    }).get_json()['user']['id']
+    me = client.get('/api/auth/me', headers=auth_headers).get_json()['user']['id']
+
+    now = datetime.utcnow()
+    with app.app_context():
+        for user_id in (me, other):
+            for day in range(20):
+                when = now - timedelta(days=day)
+                db.session.add(Workout(
+                    user_id=user_id, workout_type=('cardio', 'strength')[day % 2], duration_minutes=30,
+                    calories_burned=200, intensity='moderate', status=('completed', 'planned')[day % 3 == 0],
+                    created_at=when, completed_at=when
+                ))
+                db.session.add(ChatMessage(user_id=user_id, message=f'message {day}', response='ok', created_at=when))
+                db.session.add(ProgressLog(user_id=user_id, weight=80 - day * 0.1, logged_at=when))
+        db.session.commit()
+
+    from app.services.workout_stats import rebuild_user_stats
+    with app.app_context():
+        rebuild_user_stats()
+
+    def next_cursor(url, key='next_cursor'):
+        return client.get(url, headers=auth_headers).get_json()[key]
+
+    return {
+        'workouts_cursor': next_cursor('/api/workouts/?limit=2'),
+        'progress_cursor': next_cursor('/api/profile/progress?limit=2'),
+        'chat_cursor': next_cursor('/api/chat/history?limit=2'),
+    }
+
+
+def query_plan(connection, statement, parameters):
+    cursor = connection.cursor()
+    try:
+        return [row[3] for row in cursor.execute('EXPLAIN QUERY PLAN ' + statement, parameters)]
+    finally:
+        cursor.close()
+
+
+@pytest.mark.parametrize('endpoint', ENDPOINTS)
+def test_endpoint_queries_use_indexes(app, client, auth_headers, history, endpoint):
+    url = endpoint.format(**history)
+    statements = []
+
+    def capture(_conn, _cursor, statement, parameters, _context, _executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        response = client.get(url, headers=auth_headers)
+        response.get_data()  # exports stream their rows while the body is read
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+
+    assert response.status_code == 200, response.get_data(as_text=True)
+    assert statements, f'{url} issued no SELECT'
+
+    tables = set(db.metadata.tables)
+    connection = engine.raw_connection()
+    try:
+        for statement, parameters in statements:
+            plan = query_plan(connection, statement, parameters)
+            scans = [step for step in plan if (m := TABLE_SCAN.match(step)) and m.group(1) in tables]
+            assert not scans, f'{url}: {scans} in plan of\n{statement}'
+            assert any(INDEXED_ACCESS.match(step) for step in plan), f'{url}: no index used by\n{statement}\n{plan}'
+    finally:
+        connection.close()
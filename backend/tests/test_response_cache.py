@@ -0,0 +1,28 @@
+"""
+Response cache: only symptom phrases bypass it, not the training words they share
+"""
+import pytest
+from app.services.response_cache import is_safety_sensitive
+
+
+@pytest.mark.parametrize('message', [
+    'Best chest workout for beginners?',
+    'Chest and triceps day ideas',
+    'What heart rate zone burns the most fat?',
+    'Breathing cues for heavy squats',
+])
+def test_training_questions_are_cacheable(message):
+    assert not is_safety_sensitive(message)
+
+
+@pytest.mark.parametrize('message', [
+    'I have chest pain when I run',
+    'My chest feels tight after sprints',
+    'Chest tightness during intervals',
+    'Tightness in my chest on the bike',
+    'My heart is racing after HIIT',
+    'I get shortness of breath on stairs',
+    "I can't breathe properly when lifting",
+])
+def test_symptoms_always_skip_the_cache(message):
+    assert is_safety_sensitive(message)
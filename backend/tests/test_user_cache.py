@@ -0,0 +1,32 @@
+"""
+Cached users: a write made by another worker is not hidden behind a 304
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from app import db
+from app.models import User
+from app.services.user_cache import user_cache
+
+
+def test_profile_etag_follows_the_row_not_the_cached_snapshot(app, client, auth_headers):
+    first = client.get('/api/profile/', headers=auth_headers)
+    assert first.status_code == 200
+    user_id = first.get_json()['user']['id']
+    assert user_cache.get(user_id) is not None
+
+    # Another worker's write: a plain UPDATE fires no ORM events, so this
+    # process keeps its snapshot
+    with app.app_context():
+        db.session.execute(update(User).where(User.id == user_id).values(
+            full_name='Renamed Elsewhere', updated_at=datetime.utcnow() + timedelta(seconds=5)
+        ))
+        db.session.commit()
+    assert user_cache.get(user_id)['full_name'] != 'Renamed Elsewhere'
+
+    second = client.get('/api/profile/', headers={**auth_headers, 'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 200
+    assert second.get_json()['user']['full_name'] == 'Renamed Elsewhere'
+    assert user_cache.get(user_id)['full_name'] == 'Renamed Elsewhere'
+
+    third = client.get('/api/profile/', headers={**auth_headers, 'If-None-Match': second.headers['ETag']})
+    assert third.status_code == 304
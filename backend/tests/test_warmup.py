@@ -0,0 +1,130 @@
+"""
+Cold start: the API answers while the AI brains are still loading
+"""
+import sys
+import threading
+import time
+import types
+from types import SimpleNamespace
+from app.services.ai_service import STATUS_FAILED
+
+# Generous for a test client round trip, far below the stubbed load time
+FAST_RESPONSE_SECONDS = 0.5
+
+
+class StubController:
+    def __init__(self, **_brains):
+        pass
+
+    def process(self, user_message, user_data, context):
+        return SimpleNamespace(
+            final_response='Stubbed reply', workout_recommendation='REST', safety_status='safe',
+            confidence_score=1.0, nlp_output=None, ml_output=None, decision_path=['NLP'],
+            total_execution_time_ms=0.0, brains_used=['NLP']
+        )
+
+    def get_stats(self):
+        return {}
+
+
+def _install_brains(monkeypatch, load):
+    """Stub modules for the ai/ package; `load` runs when the NLP pipeline is built"""
+    class NLPPipeline:
+        def __init__(self):
+            load()
+
+    class Integration:
+        def __init__(self, **_kwargs):
+            pass
+
+    modules = {
+        'central_controller': {'CentralController': StubController},
+        'nlp': {},
+        'nlp.nlp_pipeline': {'NLPPipeline': NLPPipeline},
+        'nlp.integration': {},
+        'nlp.integration.nlp_ml_integration': {'NLPMLIntegration': Integration},
+        'nlp.integration.nlp_prolog_integration': {'NLPPrologIntegration': Integration},
+        'dialogue': {},
+        'dialogue.coach_pipeline': {'CoachPipeline': Integration},
+    }
+    for name, attributes in modules.items():
+        module = types.ModuleType(name)
+        module.__dict__.update(attributes)
+        monkeypatch.setitem(sys.modules, name, module)
+
+
+def _register(client):
+    response = client.post('/api/auth/register', json={
+        'email': 'warmup@example.com', 'username': 'warmup', 'password': 'password'
+    })
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+
+def test_background_warmup_serves_requests_while_loading(make_app, cold_coach, monkeypatch):
+    loading = threading.Event()
+    release = threading.Event()
+
+    def slow_load():
+        loading.set()
+        release.wait(30)
+
+    _install_brains(monkeypatch, slow_load)
+    app = make_app(AI_WARMUP='background')
+    client = app.test_client()
+
+    try:
+        assert loading.wait(5)
+
+        started = time.perf_counter()
+        health = client.get('/health')
+        assert health.status_code == 200
+        assert time.perf_counter() - started < FAST_RESPONSE_SECONDS
+
+        started = time.perf_counter()
+        headers = _register(client)
+        login = client.post('/api/auth/login', json={'email': 'warmup@example.com', 'password': 'password'})
+        assert login.status_code == 200
+        assert time.perf_counter() - started < FAST_RESPONSE_SECONDS
+
+        ready = client.get('/ready')
+        assert ready.status_code == 503
+        assert ready.get_json()['status'] == 'warming'
+
+        chat = client.post('/api/chat/message', headers=headers, json={'message': 'hello'})
+        assert chat.status_code == 503
+        assert chat.headers['Retry-After']
+    finally:
+        release.set()
+
+    assert cold_coach.wait_until_ready(5)
+    assert client.get('/ready').status_code == 200
+    chat = client.post('/api/chat/message', headers=headers, json={'message': 'hello'})
+    assert chat.status_code == 200
+    assert chat.get_json()['response'] == 'Stubbed reply'
+
+
+def test_eager_warmup_is_ready_once_the_app_exists(make_app, cold_coach, monkeypatch):
+    _install_brains(monkeypatch, lambda: time.sleep(0.2))
+
+    started = time.perf_counter()
+    app = make_app(AI_WARMUP='eager')
+    assert time.perf_counter() - started >= 0.2
+
+    assert app.test_client().get('/ready').status_code == 200
+
+
+def test_failed_warmup_is_reported_without_retry_after(make_app, cold_coach, monkeypatch):
+    # An unimportable ai/ package
+    monkeypatch.setitem(sys.modules, 'central_controller', None)
+    app = make_app(AI_WARMUP='eager')
+    client = app.test_client()
+    assert cold_coach.status == STATUS_FAILED
+
+    ready = client.get('/ready')
+    assert ready.status_code == 503
+    assert ready.get_json()['status'] == STATUS_FAILED
+
+    chat = client.post('/api/chat/message', headers=_register(client), json={'message': 'hello'})
+    assert chat.status_code == 503
+    assert 'Retry-After' not in chat.headers
+    assert 'try again' not in chat.get_json()['error']
@@ -0,0 +1,75 @@
+"""
+Workout summaries: a request that loses the race to create a user's row still counts
+"""
+from sqlalchemy import Update
+from app import db
+from app.models import UserWorkoutStats
+from app.services.database import READ_BIND
+from app.services import workout_stats
+
+
+def test_concurrent_first_write_applies_its_delta(app, client, auth_headers, monkeypatch):
+    first = client.post('/api/workouts/', headers=auth_headers, json={
+        'workout_type': 'cardio', 'duration_minutes': 30, 'status': 'completed'
+    })
+    assert first.status_code == 201
+
+    # Replay the race: the UPDATE and the rebuild's DELETE ran before the
+    # other request committed its row, and the INSERT then collides with it
+    execute = db.session.execute
+    raced = []
+
+    def missed_update(statement, *args, **kwargs):
+        if isinstance(statement, Update) and not raced:
+            raced.append(statement)
+            return type('Result', (), {'rowcount': 0})()
+        return execute(statement, *args, **kwargs)
+
+    def colliding_rebuild(user_id=None):
+        db.session.add(UserWorkoutStats(user_id=user_id, week_start=workout_stats.start_of_week()))
+        db.session.flush()
+
+    monkeypatch.setattr(db.session, 'execute', missed_update)
+    monkeypatch.setattr(workout_stats, 'rebuild_user_stats', colliding_rebuild)
+    second = client.post('/api/workouts/', headers=auth_headers, json={
+        'workout_type': 'cardio', 'duration_minutes': 45, 'status': 'completed'
+    })
+    monkeypatch.undo()
+
+    assert second.status_code == 201, second.get_json()
+    assert raced
+
+    stats = client.get('/api/workouts/stats', headers=auth_headers).get_json()
+    assert stats['total_workouts'] == 2
+    assert stats['total_minutes_exercised'] == 75
+
+    with app.app_context():
+        assert db.session.query(UserWorkoutStats).count() == 1
+
+
+def test_missing_summary_is_rebuilt_from_the_primary_in_read_bind_views(make_app, tmp_path):
+    # The replica is an empty copy of the schema: it has not seen any workouts yet
+    app = make_app(DATABASE_READ_URL=f'sqlite:///{tmp_path / "replica.db"}')
+    with app.app_context():
+        db.metadata.create_all(db.engines[READ_BIND])
+
+    client = app.test_client()
+    token = client.post('/api/auth/register', json={
+        'email': 'replica@example.com', 'username': 'replica', 'password': 'password'
+    }).get_json()['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+    for minutes in (30, 45):
+        client.post('/api/workouts/', headers=headers, json={
+            'workout_type': 'cardio', 'duration_minutes': minutes, 'status': 'completed'
+        })
+
+    with app.app_context():
+        db.session.query(UserWorkoutStats).delete()
+        db.session.commit()
+
+    stats = client.get('/api/workouts/stats', headers=headers).get_json()
+    assert stats['total_workouts'] == 2
+    assert stats['total_minutes_exercised'] == 75
+
+    with app.app_context():
+        assert db.session.query(UserWorkoutStats).one().total_workouts == 2